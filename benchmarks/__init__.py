@@ -0,0 +1,9 @@
+"""
+karas的性能基准, 不随包发布
+
+    python -m benchmarks --output result.json
+    python -m benchmarks --compare last-release.json --tolerance 0.15
+    python -m benchmarks -k replay --capture traffic.log.gz
+
+结果为json, 每一项按名称与参数区分, 便于在版本之间比较
+"""
@@ -0,0 +1,50 @@
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from benchmarks import bench_chain, bench_events, bench_keywords, bench_replay, bench_rtt
+from benchmarks._harness import Suite, compare, load
+
+MODULES = (bench_events, bench_chain, bench_keywords, bench_rtt, bench_replay)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    _parser = argparse.ArgumentParser(prog="python -m benchmarks", description="run karas benchmarks")
+    _parser.add_argument("-o", "--output", help="write the json report to this file instead of stdout")
+    _parser.add_argument("-k", "--filter", help="only run benchmarks whose name contains this string")
+    _parser.add_argument("--quick", action="store_true", help="shorter runs, for smoke testing")
+    _parser.add_argument("--capture", help="also replay this capture file (see Yurine capture) at max speed")
+    _parser.add_argument("--compare", metavar="BASELINE", help="compare against a previous json report")
+    _parser.add_argument("--tolerance", type=float, default=.1,
+                         help="slowdown ratio over the baseline reported as a regression, default 0.1")
+    _args = _parser.parse_args(argv)
+
+    _baseline = _args.compare and load(_args.compare)
+    _suite = Suite(quick=_args.quick, pattern=_args.filter, capture=_args.capture)
+    for _module in MODULES:
+        for _bench in _module.BENCHMARKS:
+            _bench(_suite)
+    _report = _suite.report()
+    if _baseline:
+        _report["comparison"] = {"baseline": _baseline["environment"], "tolerance": _args.tolerance,
+                                 "results": compare(_baseline, _report, _args.tolerance)}
+
+    _text = json.dumps(_report, indent=2, ensure_ascii=False)
+    if _args.output:
+        with open(_args.output, "w", encoding="utf-8") as _file:
+            _file.write(_text + "\n")
+    else:
+        print(_text)
+
+    if not _baseline:
+        return 0
+    _regressed = [_result for _result in _report["comparison"]["results"] if _result["regressed"]]
+    for _result in _regressed:
+        print(f"regression {_result['key']}: {_result['baseline'] * 1e6:.2f} -> {_result['current'] * 1e6:.2f} "
+              f"us/op (x{_result['ratio']:.2f})", file=sys.stderr)
+    return 1 if _regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+from typing import Dict, List
+
+from karas.mock import MockMiraiServer
+
+ACCOUNT = 1
+EVENT_TYPES = (
+    "GroupMessage",
+    "FriendMessage",
+    "TempMessage",
+    "MemberJoinEvent",
+    "MemberLeaveEventQuit",
+    "NudgeEvent",
+    "BotOnlineEvent"
+)
+
+
+def rich_chain() -> List[Dict]:
+    """一条较长的群消息, 包含引用, at, 表情与图片"""
+    return [
+        {"type": "Source", "id": 1, "time": 1650000000},
+        {
+            "type": "Quote", "id": 2, "groupId": 100000, "senderId": 10002, "targetId": 100000,
+            "origin": [{"type": "Plain", "text": "quoted message"}]
+        },
+        {"type": "At", "target": 10003, "display": "@mock"},
+        *({"type": "Plain", "text": f" segment {_i} "} for _i in range(8)),
+        {"type": "Face", "faceId": 178, "name": "斜眼笑"},
+        {
+            "type": "Image", "imageId": "{01E9451B-70ED-EAE3-B37C-101F1EEBF5B5}.jpg",
+            "url": "https://example.com/mock.jpg", "path": None, "base64": None
+        }
+    ]
+
+
+def events() -> Dict[str, Dict]:
+    """各类型的事件数据, GroupMessage:rich为带长消息链的群消息"""
+    _server = MockMiraiServer(seed=0)
+    _events = {_type: _server.make_event(_type, ACCOUNT) for _type in EVENT_TYPES}
+    _events["GroupMessage:rich"] = {**_events["GroupMessage"], "messageChain": rich_chain()}
+    return _events
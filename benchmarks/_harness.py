@@ -0,0 +1,189 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tracemalloc
+from time import perf_counter, time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import karas
+
+SCHEMA = 1
+
+
+class Suite:
+    """
+    Suite:
+        收集一次运行中的所有结果, quick为True时缩短每项的测量时间, capture为回放使用的录制文件
+    """
+
+    def __init__(self, quick: bool = False, pattern: Optional[str] = None, capture: Optional[str] = None) -> None:
+        self.quick = quick
+        self.pattern = pattern
+        self.capture = capture
+        self.results: List[Dict] = []
+
+    @property
+    def minTime(self) -> float:
+        return .05 if self.quick else .2
+
+    @property
+    def repeat(self) -> int:
+        return 3 if self.quick else 7
+
+    def selected(self, name: str) -> bool:
+        return self.pattern is None or self.pattern in name
+
+    def measure(self, name: str, run: Callable[[int], None], params: Optional[Dict] = None) -> Optional[Dict]:
+        """测量run(number)中每次操作的耗时
+
+        Args:
+            name (str): 结果的名称
+            run (Callable[[int], None]): 执行number次被测操作的函数
+            params (Optional[Dict]): 区分同名结果的参数
+        """
+        if not self.selected(name):
+            return None
+        _number = _calibrate(run, self.minTime)
+        _samples = []
+        for _ in range(self.repeat):
+            _start = perf_counter()
+            run(_number)
+            _samples.append((perf_counter() - _start) / _number)
+        return self.add(name, params, {
+            "number": _number,
+            "repeat": self.repeat,
+            "best": min(_samples),
+            "median": statistics.median(_samples),
+            "mean": statistics.mean(_samples),
+            "stdev": statistics.stdev(_samples) if len(_samples) > 1 else 0.,
+            "opsPerSec": 1 / min(_samples)
+        })
+
+    def latency(self, name: str, samples: Iterable[float], elapsed: float, params: Optional[Dict] = None) -> Dict:
+        """记录一组单次操作的延迟, best为中位数, 便于与measure的结果一起比较"""
+        _samples = sorted(samples)
+        return self.add(name, params, {
+            "number": len(_samples),
+            "repeat": 1,
+            "best": percentile(_samples, 50),
+            "median": percentile(_samples, 50),
+            "mean": statistics.mean(_samples),
+            "stdev": statistics.stdev(_samples) if len(_samples) > 1 else 0.,
+            "p90": percentile(_samples, 90),
+            "p99": percentile(_samples, 99),
+            "max": _samples[-1],
+            "opsPerSec": len(_samples) / elapsed
+        })
+
+    def memory(self, name: str, build: Callable[[], object], params: Optional[Dict] = None,
+               number: int = 1000) -> Optional[Dict]:
+        """测量build生成的每个对象(包括其引用的对象)占用的内存, best的单位为字节"""
+        if not self.selected(name):
+            return None
+        gc.collect()
+        tracemalloc.start()
+        try:
+            _before = tracemalloc.get_traced_memory()[0]
+            _objects = [build() for _ in range(number)]
+            _size = tracemalloc.get_traced_memory()[0] - _before
+        finally:
+            tracemalloc.stop()
+        del _objects
+        return self.add(name, params, {"unit": "B", "number": number, "repeat": 1, "best": _size / number})
+
+    def add(self, name: str, params: Optional[Dict], result: Dict) -> Dict:
+        _result = {"name": name, "params": params or {}, "unit": "s", **result}
+        self.results.append(_result)
+        if _result["unit"] == "B":
+            print(f"{key(_result):<48} {_result['best']:>12,.0f} B/obj", file=sys.stderr)
+        else:
+            print(f"{key(_result):<48} {_result['best'] * 1e6:>12.2f} us/op {_result['opsPerSec']:>14,.0f} op/s",
+                  file=sys.stderr)
+        return _result
+
+    def report(self) -> Dict:
+        return {"schema": SCHEMA, "environment": environment(self.quick), "results": self.results}
+
+
+def _calibrate(run: Callable[[int], None], minTime: float) -> int:
+    """找到耗时不少于minTime的执行次数"""
+    _number = 1
+    while True:
+        _start = perf_counter()
+        run(_number)
+        _elapsed = perf_counter() - _start
+        if _elapsed >= minTime:
+            return _number
+        _number = _number * 10 if _elapsed < minTime / 10 else int(_number * minTime / max(_elapsed, 1e-9)) + 1
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """已排序样本的百分位数"""
+    _index = (len(samples) - 1) * pct / 100
+    _low = int(_index)
+    _high = min(_low + 1, len(samples) - 1)
+    return samples[_low] + (samples[_high] - samples[_low]) * (_index - _low)
+
+
+def key(result: Dict) -> str:
+    _params = ",".join(f"{_k}={_v}" for _k, _v in sorted(result["params"].items()))
+    return f"{result['name']}[{_params}]" if _params else result["name"]
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(quick: bool) -> Dict:
+    return {
+        "karas": karas.__version__,
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpuCount": os.cpu_count(),
+        "timestamp": time(),
+        "quick": quick
+    }
+
+
+def compare(baseline: Dict, current: Dict, tolerance: float) -> List[Dict]:
+    """比较两次运行中同名同参数的结果
+
+    Returns:
+        List[Dict]: 每一项的比较结果, ratio为当前耗时与基线耗时之比, 超过1 + tolerance视为退化
+    """
+    _baseline = {key(_result): _result for _result in baseline["results"]}
+    _compared = []
+    for _result in current["results"]:
+        _old = _baseline.get(key(_result))
+        if _old is None:
+            continue
+        _ratio = _result["best"] / _old["best"]
+        _compared.append({
+            "key": key(_result),
+            "baseline": _old["best"],
+            "current": _result["best"],
+            "ratio": _ratio,
+            "regressed": _ratio > 1 + tolerance
+        })
+    return _compared
+
+
+def load(path: str) -> Dict:
+    with open(path, encoding="utf-8") as _file:
+        _report = json.load(_file)
+    if _report.get("schema") != SCHEMA:
+        raise ValueError(f"{path} is not a schema {SCHEMA} benchmark report")
+    return _report
@@ -0,0 +1,65 @@
+from karas.chain import MessageChain
+
+from benchmarks._fixtures import rich_chain
+from benchmarks._harness import Suite
+
+CHAIN_SIZES = (1, 10, 100)
+
+
+def _chain(size: int):
+    """Source之后跟size个元素, 以Plain为主, 混有At与Face"""
+    _kinds = (
+        lambda _i: {"type": "Plain", "text": f"segment {_i}"},
+        lambda _i: {"type": "At", "target": 10000 + _i, "display": "@mock"},
+        lambda _i: {"type": "Plain", "text": f"segment {_i}"},
+        lambda _i: {"type": "Face", "faceId": _i % 200, "name": "face"},
+    )
+    return [{"type": "Source", "id": 1, "time": 1650000000}] + [_kinds[_i % 4](_i) for _i in range(size)]
+
+
+def _chains():
+    _chains = {f"mixed:{_size}": _chain(_size) for _size in CHAIN_SIZES}
+    _chains["rich"] = rich_chain()
+    return _chains
+
+
+def bench_chain(suite: Suite) -> None:
+    """MessageChain的构造, parse_to_json, to_str, 按类型查找与原样转发"""
+    for _name, _elements in _chains().items():
+        _params = {"chain": _name}
+        _built = MessageChain(*_elements)
+
+        def construct(number, _elements=_elements):
+            for _ in range(number):
+                MessageChain(*_elements)
+
+        def parse_to_json(number, _built=_built):
+            for _ in range(number):
+                _built.parse_to_json()
+
+        def to_str(number, _built=_built):
+            for _ in range(number):
+                _built.to_str()
+
+        def lookup(number, _elements=_elements):
+            # 构造一条收到的消息链, 再按类型查找几次
+            for _ in range(number):
+                _chain = MessageChain(*_elements)
+                _chain.has("At")
+                _chain.fetchone("Plain")
+                _chain.fetchone("Image")
+
+        suite.measure("chain.construct", construct, _params)
+        suite.measure("chain.parse_to_json", parse_to_json, _params)
+        suite.measure("chain.to_str", to_str, _params)
+        suite.measure("chain.lookup", lookup, _params)
+
+        def passthrough(number, _elements=_elements):
+            # 复读: 构造一条收到的消息链, 再转换成发送的数组
+            for _ in range(number):
+                MessageChain(*_elements).parse_to_json()
+
+        suite.measure("chain.passthrough", passthrough, _params)
+
+
+BENCHMARKS = (bench_chain,)
@@ -0,0 +1,220 @@
+import asyncio
+import json
+
+from karas import Karas, Yurine
+from karas.chain import MessageChain
+from karas.event import Auto_Switch_Event
+from karas.messages import GroupMessage
+from karas.sender import Group, Member
+from karas.util import BaseModel
+from karas.util.command import Command, CommandRouter
+from karas.util.identity import IDENTITY_MAP, IdentityMap
+from karas.util.Listener import Listener
+from karas.util.Logger import Logging
+
+from benchmarks._fixtures import ACCOUNT, events
+from benchmarks._harness import Suite
+
+LISTENER_COUNTS = (1, 10, 1000)
+COMMAND_COUNT = 400
+
+
+def bench_parse(suite: Suite) -> None:
+    """Auto_Switch_Event.parse_json按事件类型的吞吐"""
+    _parse = Auto_Switch_Event.parse_json
+    for _type, _event in events().items():
+        def run(number, _event=_event):
+            for _ in range(number):
+                _parse(**_event)
+
+        suite.measure("event.parse_json", run, {"type": _type})
+
+
+def materialize(text: str):
+    """从json解码并解析一个事件, 访问所有字段使其全部转换"""
+    _message = Auto_Switch_Event.parse_json(**json.loads(text))
+    # 非消息事件被包装在Event中
+    for _model in (_message, getattr(_message, "event", None)):
+        for _k, _ in list(_model._field_types()) if _model is not None else ():
+            getattr(_model, _k)
+    return _message
+
+
+def bench_materialize(suite: Suite) -> None:
+    """解码并解析事件, 访问所有字段使其全部转换, 即有监听函数使用全部参数时的开销"""
+    for _type, _event in events().items():
+        _text = json.dumps(_event)
+
+        def run(number, _text=_text):
+            for _ in range(number):
+                materialize(_text)
+
+        suite.measure("event.materialize", run, {"type": _type})
+
+    # internReceptors: 同一个成员的消息复用Member与Group
+    _text = json.dumps(events()["GroupMessage"])
+    _token = IDENTITY_MAP.set(IdentityMap())
+    try:
+        suite.measure("event.materialize", lambda number: [materialize(_text) for _ in range(number)],
+                      {"type": "GroupMessage", "intern": True})
+    finally:
+        IDENTITY_MAP.reset(_token)
+
+
+def _karas(count: int, asynchronous: bool, loop: asyncio.AbstractEventLoop):
+    _karas = type("Karas", (Karas,), {"listeners": {}, "commands": {}, "loop": loop})
+    if asynchronous:
+        async def listener(group: Group, member: Member, message: MessageChain):
+            pass
+    else:
+        def listener(group: Group, member: Member, message: MessageChain):
+            pass
+    _karas.listeners[GroupMessage.type] = [Listener(listener, GroupMessage.type)] * count
+    return _karas
+
+
+def bench_dispatch(suite: Suite) -> None:
+    """Karas._executor分发一条群消息的耗时, 包括按注解取参数与运行监听函数"""
+    _message = Auto_Switch_Event.parse_json(**events()["GroupMessage"])
+    _loop = asyncio.new_event_loop()
+    try:
+        for _asynchronous in (True, False):
+            for _count in LISTENER_COUNTS:
+                _k = _karas(_count, _asynchronous, _loop)
+
+                async def dispatch(number, _k=_k):
+                    _tasks = []
+                    for _ in range(number):
+                        _tasks += await _k._executor(_message)
+                    if _tasks:
+                        await asyncio.gather(*_tasks)
+
+                suite.measure(
+                    "karas.executor",
+                    lambda number, dispatch=dispatch: _loop.run_until_complete(dispatch(number)),
+                    {"listeners": _count, "listener": "async" if _asynchronous else "sync"}
+                )
+    finally:
+        _loop.close()
+
+
+def _command_karas(router: bool, loop: asyncio.AbstractEventLoop):
+    """注册COMMAND_COUNT个命令, router为False时每个命令是一个检查to_text前缀的监听函数"""
+    _karas = type("Karas", (Karas,), {"listeners": {}, "commands": {}, "loop": loop})
+    if router:
+        _router = _karas.commands[GroupMessage.type] = CommandRouter(GroupMessage.type)
+        for _i in range(COMMAND_COUNT):
+            async def handler(group: Group, command: Command):
+                pass
+
+            _router.add(f"cmd{_i}", handler, prefix="/")
+        return _karas
+    _listeners = _karas.listeners[GroupMessage.type] = []
+    for _i in range(COMMAND_COUNT):
+        async def handler(group: Group, message: MessageChain, _trigger=f"/cmd{_i}"):
+            _text = message.to_text()
+            if _text and _text.startswith(_trigger):
+                pass
+
+        _listeners.append(Listener(handler, GroupMessage.type))
+    return _karas
+
+
+def bench_command(suite: Suite) -> None:
+    """COMMAND_COUNT个命令时分发一条群消息的耗时, 命中最后一个命令或者不是命令"""
+    _loop = asyncio.new_event_loop()
+    _texts = {"match": f"/cmd{COMMAND_COUNT - 1} arg", "miss": "hello world"}
+    try:
+        for _router in (True, False):
+            _k = _command_karas(_router, _loop)
+            for _name, _text in _texts.items():
+                _event = dict(events()["GroupMessage"], messageChain=[
+                    {"type": "Source", "id": 1, "time": 1650000000}, {"type": "Plain", "text": _text}
+                ])
+
+                async def dispatch(number, _k=_k, _event=_event):
+                    _tasks = []
+                    for _ in range(number):
+                        _tasks += await _k._executor(Auto_Switch_Event.parse_json(**_event))
+                    if _tasks:
+                        await asyncio.gather(*_tasks)
+
+                suite.measure(
+                    "karas.command",
+                    lambda number, dispatch=dispatch: _loop.run_until_complete(dispatch(number)),
+                    {"commands": COMMAND_COUNT, "text": _name, "router": "trie" if _router else "listeners"}
+                )
+    finally:
+        _loop.close()
+
+
+def bench_event_parse(suite: Suite) -> None:
+    """Karas.event_parse的完整流程: 解析, 记录日志与分发到一个监听函数"""
+    _loop = asyncio.new_event_loop()
+    _logger = Logging("ERROR", ACCOUNT)
+    _k = _karas(1, True, _loop)
+    _event = events()["GroupMessage"]
+
+    async def parse(number):
+        _tasks = []
+        for _ in range(number):
+            _generator = _k.event_parse(_event, _logger)
+            await _generator.__anext__()
+            _tasks += await _generator.asend(False)
+            await _generator.aclose()
+        await asyncio.gather(*_tasks)
+
+    try:
+        suite.measure("karas.event_parse", lambda number: _loop.run_until_complete(parse(number)))
+    finally:
+        _loop.close()
+
+
+def bench_receiver(suite: Suite) -> None:
+    """Yurine._receiver处理一条群消息, listeners为0时该类型没有监听函数, 事件应当不被解析"""
+    _loop = asyncio.new_event_loop()
+    _event = events()["GroupMessage"]
+    try:
+        for _count in (0, 1):
+            _k = _karas(_count, True, _loop)
+            _bot = Yurine(
+                host="127.0.0.1", port=0, account=ACCOUNT, verifyKey="", loop=_loop, karas=_k,
+                loggerLevel="ERROR", heartbeatInterval=None
+            )
+
+            async def receive(number, _bot=_bot):
+                _tasks = []
+                for _ in range(number):
+                    _tasks += await _bot._receiver(None, _event)
+                if _tasks:
+                    await asyncio.gather(*_tasks)
+
+            suite.measure(
+                "yurine.receiver",
+                lambda number, receive=receive: _loop.run_until_complete(receive(number)),
+                {"listeners": _count}
+            )
+    finally:
+        _loop.close()
+
+
+def bench_memory(suite: Suite) -> None:
+    """每个事件从json解码到访问所有字段后占用的内存, retainRaw为是否保留原始数据, intern为是否复用Member等对象"""
+    for _type in ("GroupMessage", "GroupMessage:rich", "MemberJoinEvent"):
+        _text = json.dumps(events()[_type])
+        for _retain in (True, False):
+            BaseModel.retainRaw = _retain
+            try:
+                suite.memory("event.memory", lambda _text=_text: materialize(_text),
+                             {"type": _type, "retainRaw": _retain})
+            finally:
+                BaseModel.retainRaw = True
+        _token = IDENTITY_MAP.set(IdentityMap())
+        try:
+            suite.memory("event.memory", lambda _text=_text: materialize(_text),
+                         {"type": _type, "retainRaw": True, "intern": True})
+        finally:
+            IDENTITY_MAP.reset(_token)
+
+
+BENCHMARKS = (bench_parse, bench_materialize, bench_dispatch, bench_command, bench_event_parse, bench_receiver, bench_memory)
@@ -0,0 +1,41 @@
+import random
+
+from karas.util.keywords import KeywordMatcher
+
+from benchmarks._harness import Suite
+
+RULE_COUNTS = (100, 1000, 5000)
+TEXTS = {
+    "short": "今天天气不错, 有人一起去吃饭吗",
+    "long": "这是一条比较长的群消息, 里面有很多普通的内容. " * 20,
+}
+
+
+def _keywords(count: int):
+    """count个2到6个字的随机关键词, 固定种子"""
+    _random = random.Random(0)
+    _chars = [chr(_c) for _c in range(0x4e00, 0x4e00 + 500)] + list("abcdefghijklmnopqrstuvwxyz")
+    return ["".join(_random.choice(_chars) for _ in range(_random.randint(2, 6))) for _ in range(count)]
+
+
+def bench_keywords(suite: Suite) -> None:
+    """在一条消息的文本中查找所有关键词, automaton为KeywordMatcher, naive为对每个关键词使用in"""
+    for _count in RULE_COUNTS:
+        _rules = _keywords(_count)
+        _matcher = KeywordMatcher(_rules)
+        for _name, _text in TEXTS.items():
+            def automaton(number, _text=_text, _matcher=_matcher):
+                for _ in range(number):
+                    _matcher.find_all(_text)
+
+            def naive(number, _text=_text, _rules=_rules):
+                _lower = _text.lower()
+                for _ in range(number):
+                    [_k for _k in _rules if _k in _lower]
+
+            _params = {"rules": _count, "text": _name}
+            suite.measure("keywords.match", automaton, {**_params, "matcher": "automaton"})
+            suite.measure("keywords.match", naive, {**_params, "matcher": "naive"})
+
+
+BENCHMARKS = (bench_keywords,)
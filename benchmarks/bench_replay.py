@@ -0,0 +1,54 @@
+import asyncio
+import os
+import statistics
+
+from karas import Karas, Yurine
+from karas.util.capture import INBOUND, read_capture
+from karas.util.Listener import Listener
+
+from benchmarks._fixtures import ACCOUNT
+from benchmarks._harness import Suite
+
+
+def _types(path: str, codec) -> set:
+    return {
+        _data["data"].get("type") for _data in (
+            codec.loads(_frame.text) for _frame in read_capture(path) if _frame.direction == INBOUND
+        ) if _data.get("syncId") == "-1"
+    }
+
+
+async def _replay(suite: Suite) -> None:
+    _karas = type("Karas", (Karas,), {"listeners": {}, "commands": {}})
+    _bot = Yurine(
+        host="127.0.0.1", port=0, account=ACCOUNT, verifyKey="", loop=asyncio.get_running_loop(),
+        karas=_karas, loggerLevel="ERROR", heartbeatInterval=None
+    )
+
+    async def listener():
+        pass
+
+    for _type in _types(suite.capture, _bot.codec):
+        _karas.listeners[_type] = [Listener(listener, _type)]
+    _samples = []
+    for _ in range(suite.repeat):
+        _result = await _bot.replay(suite.capture, speed=None)
+        _samples.append(_result["elapsed"] / max(_result["frames"], 1))
+    suite.add("yurine.replay", {"capture": os.path.basename(suite.capture)}, {
+        "number": _result["frames"],
+        "repeat": suite.repeat,
+        "best": min(_samples),
+        "median": statistics.median(_samples),
+        "mean": statistics.mean(_samples),
+        "stdev": statistics.stdev(_samples) if len(_samples) > 1 else 0.,
+        "opsPerSec": 1 / min(_samples)
+    })
+
+
+def bench_replay(suite: Suite) -> None:
+    """以最快速度回放--capture给出的录制文件, 每个事件类型有一个空的监听函数"""
+    if suite.capture is not None and suite.selected("yurine.replay"):
+        asyncio.run(_replay(suite))
+
+
+BENCHMARKS = (bench_replay,)
@@ -0,0 +1,57 @@
+import asyncio
+import socket
+from time import perf_counter
+
+from karas import Yurine
+from karas.elements import Plain
+from karas.mock import MockMiraiServer
+
+from benchmarks._fixtures import ACCOUNT
+from benchmarks._harness import Suite
+
+CONCURRENCY = (1, 16, 64)
+
+
+def _free_port() -> int:
+    with socket.socket() as _sock:
+        _sock.bind(("127.0.0.1", 0))
+        return _sock.getsockname()[1]
+
+
+async def _rtt(suite: Suite) -> None:
+    _port = _free_port()
+    _count = 200 if suite.quick else 2000
+    async with MockMiraiServer(port=_port) as _server:
+        _bot = Yurine(
+            host="127.0.0.1", port=_port, account=ACCOUNT, verifyKey=_server.verifyKey,
+            loop=asyncio.get_running_loop(), loggerLevel="ERROR"
+        )
+        await _bot.astart()
+        try:
+            _elements = [Plain("benchmark")]
+            for _ in range(50):
+                await _bot.sendGroup(100000, _elements)
+            for _concurrency in CONCURRENCY:
+                _samples = []
+
+                async def worker(number):
+                    for _ in range(number):
+                        _start = perf_counter()
+                        await _bot.sendGroup(100000, _elements)
+                        _samples.append(perf_counter() - _start)
+
+                _start = perf_counter()
+                await asyncio.gather(*(worker(_count // _concurrency) for _ in range(_concurrency)))
+                suite.latency("yurine.sendGroup.rtt", _samples, perf_counter() - _start,
+                              {"concurrency": _concurrency})
+        finally:
+            await _bot.stop()
+
+
+def bench_rtt(suite: Suite) -> None:
+    """对本地MockMiraiServer调用sendGroup的往返延迟, 包括编码, 发送, 响应匹配与解析"""
+    if suite.selected("yurine.sendGroup.rtt"):
+        asyncio.run(_rtt(suite))
+
+
+BENCHMARKS = (bench_rtt,)
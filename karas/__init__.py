@@ -1,6 +1,8 @@
 import asyncio
 import inspect
+import traceback
 from typing import (
+    Any,
     Coroutine,
     Awaitable,
     BinaryIO,
@@ -11,6 +13,8 @@ from typing import (
     Tuple,
     Union,
     AsyncGenerator,
+    Iterable,
+    Set,
     NoReturn
 )
 
@@ -27,12 +31,61 @@ from karas.exceptions import *
 from karas.messages import MessageBase
 from karas.sender import Friend, Group, Member, Stranger, ReceptorBase, Announcement
 from karas.util import DefaultNamespace, status_code_exception
+from karas.util.Listener import Listener
 from karas.util.Logger import Logging
-from karas.util.network import error_throw, URL_Route, wrap_data_json
+from karas.util.capture import INBOUND, OUTBOUND, CaptureWriter, replay
+from karas.util.codec import JsonCodec, get_codec
+from karas.util.ratelimit import RateLimiter, TokenBucket
+from karas.util.reconnect import Backoff
+from karas.util.channel import Channel
+from karas.util.command import Command, CommandHandler, CommandRouter
+from karas.util.correlator import merge_stats
+from karas.util.eventqueue import EventQueue
+from karas.util.identity import IDENTITY_EVENTS, IDENTITY_MAP, IdentityMap
+from karas.util.network import error_throw, URL_Route, wrap_data_json, wrap_encoded_frame
 from karas.util.sync import async_to_sync_wrap
+from karas.util.webhook import INLINE_COMMANDS, INLINE_REPLY, InlineReply, WebhookServer
 
 __version__ = "0.2.11"
 
+# 会改变bot状态的事件, 没有监听函数时也要处理
+_STATE_EVENTS = frozenset(("BotOnlineEvent", "BotOfflineEventActive"))
+# 事件队列满时也不会被丢弃的事件: bot状态, 需要回应的申请以及IdentityMap依赖的变更事件
+_KEEP_EVENTS = frozenset((
+    *_STATE_EVENTS,
+    "BotOfflineEventForce",
+    "BotOfflineEventDropped",
+    "BotReloginEvent",
+    "NewFriendRequestEvent",
+    "MemberJoinRequestEvent",
+    "BotInvitedJoinGroupRequestEvent",
+    *IDENTITY_EVENTS
+))
+
+
+def _event_types(registerEvent: Union[str, "EventBase", "MessageBase", List]) -> Tuple[str, ...]:
+    """listen的registerEvent转换为事件类型"""
+    if isinstance(registerEvent, List):
+        return tuple(_e if isinstance(_e, str) else _e.type for _e in registerEvent)
+    return (registerEvent,) if isinstance(registerEvent, str) else (registerEvent.type,)
+
+
+def _event_summary(data: Dict) -> str:
+    """日志中的事件概要, 只读取原始数据"""
+    _sender = data.get("sender") or data.get("member") or data.get("subject") or {}
+    _group = _sender.get("group") or data.get("group") or {}
+    _summary = data.get("type", "")
+    if _group.get("id") is not None:
+        _summary += f" group({_group['id']})"
+    if _sender.get("id") is not None:
+        _summary += f" {_sender['id']}"
+    return _summary
+
+
+def _chain_text(elements: Union[List, MessageChain], chain: List[Dict]) -> str:
+    """发送消息时日志中的消息内容, 发送的是MessageChain时不再重新构造"""
+    return elements.to_str() if isinstance(elements, MessageChain) else MessageChain(*chain).to_str()
+
 
 async def _build_content_json(
         _type: str,
@@ -53,18 +106,21 @@ class Karas(object):
         负责处理消息事件
     """
     listeners = {}
+    # 事件类型 -> 该类型消息的命令
+    commands: Dict[str, CommandRouter] = {}
     loop: asyncio.AbstractEventLoop = None
 
     @classmethod
-    async def event_parse(cls, original: dict, _logger: Logging = None) -> AsyncGenerator:
-        _logger.debug(original)
+    async def event_parse(cls, original: dict, _logger: Logging = None, bot: "Yurine" = None) -> AsyncGenerator:
         _event: Union[MessageBase,
                       Event] = Auto_Switch_Event.parse_json(**original)
         isBotEvent = yield _event
-        _logger.info(_event.__str__())
-        if not isBotEvent:
-            await cls._executor(_event)
-        yield
+        if _logger.debugEnabled:
+            _logger.debug(_event.__str__())
+        elif _logger.infoEnabled:
+            # 完整的内容需要构造sender, messageChain等字段, INFO只记录类型与id
+            _logger.info(_event_summary(original))
+        yield [] if isBotEvent else await cls._executor(_event, bot)
 
     @classmethod
     async def bot_event(cls, _event: dict):
@@ -73,30 +129,66 @@ class Karas(object):
         return _event
 
     @classmethod
-    async def _executor(cls, message: Union["MessageBase", "EventBase"] = None) -> Optional[str]:
+    async def _executor(
+            cls,
+            message: Union["MessageBase", "EventBase"] = None,
+            bot: "Yurine" = None
+    ) -> List[asyncio.Task]:
+        """
+        调用监听了该事件的函数, 参数按类型注解从事件中取出, 注解为Yurine的参数会传入收到该事件的bot
+        :return 为协程函数创建的任务
+        """
+        _tasks = []
         events = cls.listeners.get(message.type)
-        if events is None:
+        for listener in events or ():
+            _passed = None
+            if listener.filter is not None:
+                _passed = listener.filter(message)
+                if not _passed:
+                    continue
+            if listener.callback:
+                listener.callback(message.raw, *listener.cbArgs)
+            cls._call(listener.func, listener.bind(message, bot, _passed), _tasks, listener.isCoroutine)
+        _router = cls.commands.get(message.type)
+        if _router is not None:
+            cls._route_command(_router, message, bot, _tasks)
+        return _tasks
+
+    @classmethod
+    def _call(cls, func: Callable, kwargs: Dict, tasks: List[asyncio.Task], isCoroutine: bool = None) -> None:
+        """运行监听函数, 协程函数的任务加入tasks"""
+        if isCoroutine if isCoroutine is not None else inspect.iscoroutinefunction(func):
+            _task = cls.loop.create_task(func(**kwargs))
+            tasks.append(_task)
+            _inline = INLINE_REPLY.get()
+            if _inline is not None:
+                _inline.track(_task)
+        else:
+            func(**kwargs)
+
+    @classmethod
+    def _route_command(
+            cls,
+            router: CommandRouter,
+            message: Union["MessageBase", "EventBase"],
+            bot: Optional["Yurine"],
+            tasks: List[asyncio.Task]
+    ) -> None:
+        """将以命令开头的消息交给该命令的处理函数, 只有一个处理函数会被调用"""
+        _chain = getattr(message, "messageChain", None)
+        _text = _chain and _chain.to_text()
+        if not _text:
             return
-        for listener in events:
-            ca, cb, cb_args = listener
-            if cb:
-                cb_args = cb_args or ()
-                cb(message.raw, *cb_args)
-            _message_dict = message.__dict__
-            _func_params = ca.__annotations__
-
-            _reversed = {_v if isinstance(type, type(_v)) else type(
-                _v): _k for _k, _v in _message_dict.items()}
-            _types = [v if isinstance(type, type(v)) else type(v)
-                      for v in _message_dict.values()]
-            _o = {}
-            for k, t in _func_params.items():
-                if t in _types:
-                    _o[k] = _message_dict[_reversed[t]]
-            if inspect.iscoroutinefunction(ca):
-                cls.loop.create_task(ca(**_o))
-            else:
-                ca(**_o)
+        _matched = router.match(_text.lstrip())
+        if _matched is None:
+            return
+        _handler, _command = _matched
+        _kwargs = _handler.bind(_command, message, bot)
+        if _kwargs is None:
+            if bot is not None:
+                bot.logging.debug(f"arguments of {_command} do not match {_handler.func.__name__}")
+            return
+        cls._call(_handler.func, _kwargs, tasks, _handler.isCoroutine)
 
 
 def _get_event_loop():
@@ -129,8 +221,76 @@ class Yurine(object):
             loggerLevel: str = "INFO",
             logToFile=False,
             logFileName: str = None,
-            logRecordLevel: str = None
+            logRecordLevel: str = None,
+            codec: Union[str, JsonCodec] = "json",
+            commandTimeout: Optional[float] = 30,
+            heartbeatInterval: Optional[float] = 30,
+            heartbeatTimeout: float = 10,
+            reconnectRetries: Optional[int] = 10,
+            reconnectDelay: float = 1,
+            reconnectMaxDelay: float = 60,
+            outboxSize: int = 1000,
+            sendRate: Optional[float] = None,
+            sendBurst: int = 1,
+            groupSendRate: Optional[float] = None,
+            groupSendBurst: int = 1,
+            friendSendRate: Optional[float] = None,
+            friendSendBurst: int = 1,
+            eventChannel: str = "all",
+            commandChannel: Optional[str] = None,
+            commandPoolSize: int = 1,
+            webhook: Union[int, WebhookServer, None] = None,
+            eventQueueSize: int = 10000,
+            eventQueuePolicy: str = "drop-oldest",
+            eventDropTypes: Iterable[str] = (),
+            eventPriorities: Optional[Dict[str, int]] = None,
+            eventKeepTypes: Iterable[str] = (),
+            eventConcurrency: Optional[int] = 1000,
+            capture: Union[str, CaptureWriter, None] = None,
+            internReceptors: bool = False
     ) -> None:
+        """
+        Args:
+            codec (Union[str, JsonCodec]): websocket帧与http响应使用的json编解码器,
+                可选json, orjson, ujson, msgspec(需要安装对应的库)
+            commandTimeout (Optional[float]): 命令等待响应的默认秒数, 超时抛出CommandTimeoutException,
+                为None时一直等待. 每个命令也可以通过timeout参数单独指定
+            heartbeatInterval (Optional[float]): 连接空闲多少秒后发送心跳, 为None时不发送心跳
+            heartbeatTimeout (float): 发送心跳后等待响应的秒数, 超时则认为连接已断开并重新连接
+            reconnectRetries (Optional[int]): 断线后最多重连的次数, 为None时无限重连, 用尽后停止运行
+            reconnectDelay (float): 第一次重连前等待的秒数, 之后每次翻倍并带有随机抖动
+            reconnectMaxDelay (float): 两次重连之间等待的最长秒数
+            outboxSize (int): 断线期间最多暂存的待发送命令数, 重连成功后按顺序发出
+            sendRate (Optional[float]): 所有消息合计每秒最多发送的条数, 超出时sendXxx会等待而不是报错, 为None时不限制
+            sendBurst (int): 空闲后允许连续发送的消息条数
+            groupSendRate (Optional[float]): 每个群每秒最多发送的条数, 为None时不限制
+            groupSendBurst (int): 每个群允许连续发送的条数
+            friendSendRate (Optional[float]): 每个好友(包括临时会话)每秒最多发送的条数, 为None时不限制
+            friendSendBurst (int): 每个好友允许连续发送的条数
+            eventChannel (str): 接收事件的通道, all接收全部推送, message只接收消息, event只接收其他事件
+            commandChannel (Optional[str]): 为命令单独建立连接时使用的通道, 推送大量消息时命令的响应不会排在消息后面.
+                该连接收到的推送会被丢弃, 建议使用推送较少的event或message. 为None时命令与事件共用一条连接
+            commandPoolSize (int): 为命令建立的连接数, 每条命令发往等待中命令最少的连接, 用于大量并发的命令.
+                大于1而没有指定commandChannel时使用event通道
+            webhook (Union[int, WebhookServer, None]): 通过mirai-api-http的webhook接收事件, 不再建立接收事件的websocket.
+                可以是监听的端口或者多个bot共用的WebhookServer. 没有commandChannel时, 监听函数发出的第一条命令
+                会作为webhook请求的响应交给mirai-api-http执行(内联回复), 此时命令没有返回数据,
+                需要返回数据的命令(例如about, fetchFriendList)以及之后的命令抛出FunctionException.
+                推送与websocket一样经过事件队列
+            eventQueueSize (int): 等待分发的事件最多有多少个
+            eventQueuePolicy (str): 事件队列满时的处理方式:
+                block等待(命令与事件共用连接时可能因为读不到命令的响应而卡死, 只建议与commandChannel一起使用),
+                drop-oldest丢弃最早的事件, drop-by-type丢弃eventDropTypes中的事件, priority按eventPriorities丢弃优先级最低的事件
+            eventDropTypes (Iterable[str]): drop-by-type时允许丢弃的事件类型, 例如["GroupMessage"]
+            eventPriorities (Optional[Dict[str, int]]): priority时各事件类型的优先级, 数值越大越先分发, 未给出的为0
+            eventKeepTypes (Iterable[str]): 任何policy下都不会被丢弃的事件类型, bot上下线, 好友与入群申请,
+                以及internReceptors依赖的群名片, 退群等变更事件总是包括在内
+            eventConcurrency (Optional[int]): 同时运行的监听函数任务上限, 达到上限时暂停分发, 事件在队列中等待.
+                为None时不限制
+            capture (Union[str, CaptureWriter, None]): 将收发的每一帧追加写入该录制文件, 可以通过replay回放
+            internReceptors (bool): 复用同一个群, 群成员与好友的Group, Member与Friend对象, 再次收到时更新已有的对象,
+                群名片, 群名等变更事件也会修改对象. 对象保存在receptors中, 只有监听函数中第一次访问的字段会复用
+        """
         self._host = host
         self._port = port
         self.url = f"{protocol}://{host}:{port}"
@@ -139,7 +299,20 @@ class Yurine(object):
         self._verifyKey = verifyKey
         self.sessionKey = sessionKey
         self._session = session
-        self._ws = ws
+        # 只关闭自己创建的session, 传入的session可能被其他bot共用
+        self._ownsSession = False
+        # 由YurineCluster管理时与其他bot共用loop, 停止时不能取消其他bot的任务
+        self.cluster = None
+        self._ownsWebhook = isinstance(webhook, int)
+        self.webhook: Optional[WebhookServer] = WebhookServer(port=webhook) if self._ownsWebhook else webhook
+        self._ownsCapture = isinstance(capture, str)
+        self.capture: Optional[CaptureWriter] = CaptureWriter(capture) if self._ownsCapture else capture
+        self.codec = get_codec(codec)
+        self.commandTimeout = commandTimeout
+        self.heartbeatInterval = heartbeatInterval
+        self.heartbeatTimeout = heartbeatTimeout
+        self.outboxSize = outboxSize
+        self.reconnectPolicy = Backoff(base=reconnectDelay, maximum=reconnectMaxDelay, retries=reconnectRetries)
 
         self.route = URL_Route(self.url)
         self.logging = Logging(loggerLevel.upper(), account, filename=logFileName, logFile=logToFile,
@@ -153,7 +326,28 @@ class Yurine(object):
         self._is_running = False
         self.online = None
         self._receiver_is_running = False
-        self._receiveData = {}
+        self._events = EventQueue(
+            maxsize=eventQueueSize, policy=eventQueuePolicy, dropTypes=eventDropTypes, priorities=eventPriorities,
+            keepTypes=(*_KEEP_EVENTS, *eventKeepTypes),
+            loop=self.loop
+        )
+        self.eventConcurrency = eventConcurrency
+        self.receptors: Optional[IdentityMap] = IdentityMap() if internReceptors else None
+        self._stateEvents = _STATE_EVENTS | IDENTITY_EVENTS if internReceptors else _STATE_EVENTS
+        self._handlerTasks: Set[asyncio.Task] = set()
+        self._dispatcher_task: Optional[asyncio.Task] = None
+        self._eventChannel = Channel(self, eventChannel, onEvent=self._enqueue_event, ws=ws)
+        if commandPoolSize > 1:
+            commandChannel = commandChannel or "event"
+        self._commandChannels: List[Channel] = [
+            Channel(self, commandChannel, name=f"command-{_index}") for _index in range(max(1, commandPoolSize))
+        ] if commandChannel else []
+        self.rateLimiter = RateLimiter(
+            rate=sendRate, burst=sendBurst,
+            groupRate=groupSendRate, groupBurst=groupSendBurst,
+            friendRate=friendSendRate, friendBurst=friendSendBurst,
+            loop=self.loop
+        )
         self._tasks = {}
 
     @property
@@ -174,7 +368,19 @@ class Yurine(object):
 
     @property
     def ws(self):
-        return self._ws
+        return self._eventChannel.ws
+
+    @property
+    def channels(self) -> List[Channel]:
+        """bot持有的所有websocket连接, 不使用webhook时第一条用于接收事件"""
+        if self.webhook is not None:
+            return list(self._commandChannels)
+        return [self._eventChannel, *self._commandChannels]
+
+    @property
+    def _inlineOnly(self) -> bool:
+        """是否只能通过webhook的内联回复发出命令"""
+        return self.webhook is not None and not self._commandChannels
 
     @property
     def verifyKey(self):
@@ -188,15 +394,42 @@ class Yurine(object):
     def account(self):
         return self._account
 
-    @error_throw
+    @property
+    def requestStats(self) -> Dict:
+        """命令的统计数据: 等待中的数量, 最早未响应命令的等待时间, 各命令的耗时直方图"""
+        return merge_stats(_channel.pending.stats() for _channel in self.channels)
+
+    @property
+    def eventStats(self) -> Dict:
+        """事件队列的统计数据: 排队与丢弃的事件数量, 正在运行的监听任务数量"""
+        return {**self._events.stats(), "handlers": len(self._handlerTasks)}
+
+    @property
+    def rateLimitStats(self) -> Dict:
+        """限速的统计数据: 被延迟的消息数量与延迟时间的直方图"""
+        return self.rateLimiter.stats()
+
+    @error_throw(retryConnect=True)
     async def _initialization(self) -> int:
         """初始化"""
         self.logging.debug(f"URL:  {self.url}")
         if not self.session:
-            self._session = ClientSession(loop=self.loop)
+            if self.cluster is not None:
+                # 在cluster启动之前单独启动的账号也使用cluster共用的session
+                self._session = self.cluster._ensure_session()
+            else:
+                self._session = ClientSession(loop=self.loop, json_serialize=self.codec.dumps)
+                self._ownsSession = True
+        if any(_channel.ws is None or _channel.ws.closed for _channel in self.channels):
             await self._connect()
             self.logging.info("Account verify success")
             self.logging.debug(f"got verifyKey {self.sessionKey}")
+        # webhook的推送同样由dispatcher分发
+        self._start_receiver()
+        if self.webhook is not None:
+            self.webhook.register(self)
+            await self.webhook.start()
+            self.logging.info(f"webhook listening on {self.webhook.host}:{self.webhook.port}{self.webhook.path}")
         self.logging.info("connect success")
         self.logging.info("++++++++++++++++++++++++++++++++++++++++")
         return 0
@@ -215,102 +448,176 @@ class Yurine(object):
                 }
         ) as _release_response:
             _release_response.raise_for_status()
-            _release = await _release_response.json()
+            _release = self.codec.loads(await _release_response.read())
             self.logging.debug(f"release verifyKey {_release}")
             if _release.get("msg") == "success":
                 self.logging.info("Succeed release sessionKey")
             else:
                 self.logging.error(f"Failed release sessionKey => {_release}")
 
-    @error_throw
-    async def _ping(self) -> None:
-        """向服务端发送心跳"""
-        self.logging.info("create heartbeat service")
-        while True:
-            try:
-                await self.ws.ping()
-            except ConnectionResetError:
-                return
-            except Exception:
-                raise
-            else:
-                await asyncio.sleep(.5)
+    def _command_channel(self) -> Channel:
+        """选择发送命令的连接: 优先已连接的, 其中等待中命令最少的"""
+        if not self._commandChannels:
+            return self._eventChannel
+        if len(self._commandChannels) == 1:
+            return self._commandChannels[0]
+        return min(self._commandChannels, key=lambda _channel: (not _channel.connected, _channel.outstanding))
 
-    @error_throw
     async def _connect(self) -> Optional[int]:
         """
-        向服务器发起 WebSocket 连接
+        连接所有尚未连接的通道, 事件通道最先连接以取得sessionKey, 其余通道复用该session并同时连接
         :return 返回连接是否成功
         :raise VerifyException
+        :raise ConnectException
         """
-        self.logging.debug(f"connect websocket server {self.url}")
-        try:
-            self._ws = await self.session.ws_connect(
-                url=self.route("all"),
-                headers={
-                    "verifyKey": self.verifyKey,
-                    "qq": str(self.account)
-                }
-            )
-        except aiohttp.ClientConnectionError as exc:
-            raise ConnectException from exc
-        self.sessionKey: str = (await self._raise_status()).get("session")
-        self.loop.create_task(self._ping())
+        if self.webhook is None and (self._eventChannel.ws is None or self._eventChannel.ws.closed):
+            await self._eventChannel.connect()
+        _commands = [_channel for _channel in self._commandChannels if _channel.ws is None or _channel.ws.closed]
+        if _commands:
+            await asyncio.gather(*(_channel.connect() for _channel in _commands))
         return 0
 
-    @error_throw
-    async def _receiver(self, data: Dict = None) -> NoReturn:
-        """事件监听器"""
+    async def _send_frame(self, frame: Dict, awaited: bool = False) -> None:
+        """通过命令连接发送一帧, 断线期间暂存到该连接的outbox"""
+        if self._inlineOnly:
+            return self._inline_reply(frame)
+        await self._command_channel().send(frame, awaited)
+
+    def _inline_reply(self, frame: Dict) -> None:
+        """将命令作为正在处理的webhook请求的响应
+
+        Raises:
+            FunctionException: 命令需要返回数据, 不在监听函数中, 或者已经发出过一条命令
+        """
+        _command = f"{frame['command']}.{frame['subCommand']}" if frame.get("subCommand") else frame["command"]
+        if _command not in INLINE_COMMANDS and frame["command"] not in INLINE_COMMANDS:
+            raise FunctionException(f"webhook模式下没有命令连接, {_command}需要返回数据, 无法作为内联回复")
+        _inline = INLINE_REPLY.get()
+        if _inline is None or not _inline.claim(frame):
+            raise FunctionException("webhook模式下没有命令连接, 只能在监听函数中发出一条命令作为回复")
+
+    async def _webhook_event(self, data: Dict, timeout: float) -> Optional[Dict]:
+        """处理webhook推送的事件, 返回监听函数给出的内联回复"""
+        if self.capture is not None:
+            self.capture.record(INBOUND, "webhook", self.codec.dumps({"syncId": "-1", "data": data}))
+        _inline = InlineReply(self.loop)
+        # 与websocket的推送一样经过事件队列, 受eventConcurrency限制
+        await self._enqueue_event(None, data, _inline)
+        _reply = await _inline.wait(timeout)
+        if _reply is not None and self.capture is not None:
+            self.capture.record(OUTBOUND, "webhook", getattr(_reply, "text", None) or self.codec.dumps(_reply))
+        return _reply
+
+    async def replay(self, path: str, speed: Optional[float] = 1., channel: Optional[str] = None) -> Dict:
+        """回放录制文件中收到的推送, 监听函数与收到真实推送时一样被调用, 用于复现流量以及压测
+
+        Args:
+            path (str): capture参数录制的文件
+            speed (Optional[float]): 回放速度, 1为原速, 2为两倍速, None或0为不等待
+            channel (Optional[str]): 只回放该连接收到的推送, 例如all或webhook
+
+        Returns:
+            Dict: frames回放的推送数, elapsed回放耗时, maxLag晚于计划时间的最大秒数
+        """
+        return await replay(self, path, speed=speed, channel=channel)
+
+    def _receptor(self, type_: type, data: Dict) -> ReceptorBase:
+        """创建Group, Member或Friend, 开启internReceptors时复用已有的对象"""
+        return type_(**data) if self.receptors is None else self.receptors.intern(type_, data)
+
+    def _start_receiver(self) -> None:
+        """为每条连接创建唯一读取它的reader"""
+        if self._receiver_is_running:
+            return
         self._receiver_is_running = True
+        for _channel in self.channels:
+            _channel.start()
+        if self._dispatcher_task is None or self._dispatcher_task.done():
+            self._dispatcher_task = self.loop.create_task(self._dispatcher())
+        self.logging.info(f"receiver created")
+
+    def _wants(self, data: Dict) -> bool:
+        """只看type判断是否需要处理该推送, 没有监听函数的事件不会被解析"""
+        _type = data.get("type")
+        return _type in self._stateEvents or bool(self.karas.listeners.get(_type)) or _type in self.karas.commands
+
+    async def _enqueue_event(self, channel: Optional[Channel], data: Dict, inline: Optional[InlineReply] = None) -> None:
+        """事件通道与webhook的推送先进入事件队列, 由dispatcher分发
+
+        Args:
+            inline (Optional[InlineReply]): webhook请求的内联回复, 分发该事件时设置为INLINE_REPLY
+        """
+        if not (self._wants(data) and await self._events.put((channel, data, inline), data.get("type"))):
+            if inline is not None:
+                inline.dispatched()
+
+    async def _dispatcher(self) -> NoReturn:
+        """按顺序分发事件队列中的事件, 运行中的监听任务达到eventConcurrency时暂停分发"""
         while True:
-            _receive_data = {}
+            _channel, _data, _inline = await self._events.get()
+            _token = _inline and INLINE_REPLY.set(_inline)
             try:
-                _receive_data = data or await self.ws.receive_json()
-            except TypeError:
-                if self.online:
-                    self.logging.error(f"invalid response")
-                    continue
-                await asyncio.sleep(3)
-            except Exception:
+                _tasks = await self._receiver(_channel, _data)
+            except asyncio.CancelledError:
                 raise
-            syncId = _receive_data.get("syncId")
-            if syncId == "-1":
-                _parser = self.karas.event_parse(
-                    _receive_data["data"], self.logging)
-                _event = await _parser.__anext__()
-                if isinstance(_event, Event):
-                    if not self.online and isinstance(_event.event, BotOnlineEvent):
-                        self.logging.info("bot online")
-                        self.online = True
-                        await _parser.asend(False)
-                    if isinstance(_event.event, BotOfflineEventActive):
-                        self.logging.warning("Bot offline, waiting reload...")
-                        self.online = self.online and False
-                        await asyncio.sleep(3)
-                        try:
-                            await self._connect()
-                        except BotNotFoundException:
-                            continue
-                        await _parser.asend(False)
-                    continue
-                await _parser.asend(self.account == _event.event.fromId) \
-                    if isinstance(_event, Event) else await _parser.asend(False)
-            elif syncId:
-                self.logging.debug(f"sync Event {_receive_data}")
-                self._receiveData[syncId] = _receive_data
-            else:
-                self.logging.debug(f"Unknown event:{_receive_data}")
-            if data:
-                self.logging.debug(f"got other data {data}")
-                break
+            except Exception:
+                self.logging.error(traceback.format_exc())
+                continue
+            finally:
+                if _inline is not None:
+                    INLINE_REPLY.reset(_token)
+                    _inline.dispatched()
+            self._track_handlers(_tasks)
+            if not self.eventConcurrency:
+                continue
+            while len(self._handlerTasks) >= self.eventConcurrency:
+                await asyncio.wait(self._handlerTasks, return_when=asyncio.FIRST_COMPLETED)
+
+    def _track_handlers(self, tasks: List[asyncio.Task]) -> None:
+        """记录运行中的监听任务, 用于限制并发以及stop时取消"""
+        for _task in tasks:
+            self._handlerTasks.add(_task)
+            _task.add_done_callback(self._handlerTasks.discard)
+
+    async def _receiver(self, channel: Optional[Channel], data: Dict) -> List[asyncio.Task]:
+        """
+        事件监听器, 处理事件通道或webhook推送的事件
+        :return 监听函数的任务
+        """
+        if not self._wants(data):
+            return []
+        # 监听函数的任务会复制该上下文, 在监听函数中转换的字段也使用该bot的receptors
+        _token = IDENTITY_MAP.set(self.receptors)
+        try:
+            _parser = self.karas.event_parse(data, self.logging, self)
+            _event = await _parser.__anext__()
+            isBotEvent = False
+            if isinstance(_event, Event):
+                if not self.online and isinstance(_event.event, BotOnlineEvent):
+                    self.logging.info("bot online")
+                    self.online = True
+                if isinstance(_event.event, BotOfflineEventActive):
+                    self.logging.warning("Bot offline, waiting reload...")
+                    self.online = self.online and False
+                    if channel is not None:
+                        # 由该连接的reader重新连接
+                        await channel.drop()
+                if self.receptors is not None:
+                    self.receptors.apply(_event.event)
+                isBotEvent = self.account == _event.event.fromId
+            return await _parser.asend(isBotEvent)
+        finally:
+            IDENTITY_MAP.reset(_token)
 
     def listen(self, registerEvent: Union[str, "EventBase", "MessageBase", List], callback: Callable = None,
-               cb_args: Optional[Tuple] = None):
+               cb_args: Optional[Tuple] = None, filter: Optional[Callable[[Any], Any]] = None):
         """事件装饰器
         Args:
             registerEvent (str, Event, Message, list): 要监听的事件或者消息类型
             callback: 设定一个callback,当监听到指定事件会将该事件原始数据(Dict)作为第一个参数传入
             cb_args:传入到callback的其他参数
+            filter: 以事件为参数的函数, 返回值为假时不调用监听函数, 否则监听函数中注解为返回值类型的参数会传入返回值.
+                例如KeywordRules, 消息命中关键词时才调用监听函数, 注解为KeywordMatches的参数传入命中的关键词
 
         callback用法:
         def callback(eventData: Dict, arg1, arg2,...) -> ...: ...
@@ -323,13 +630,15 @@ class Yurine(object):
         @yurine.listen(["GroupMessage", "TempMessage"])
         async def multi_listen(message:MessageChain) -> None: ...
 
+        @yurine.listen("GroupMessage", filter=KeywordRules("rules.txt"))
+        async def moderate(group: Group, member: Member, matches: KeywordMatches) -> None: ...
+
         Note: 如果要将一个函数监听绑定多个事件类型，需要注意函数能接受的参数必须是这些消息时间类型所具有的共通的参数，例如你不能让一个带有Friend类型参数的函数监听GroupMessage
 
         Returns:
             NoReturn
         """
-        registerEvents = [(e if isinstance(e, str) else e.type) for e in registerEvent] if isinstance(
-            registerEvent, List) else (registerEvent,) if isinstance(registerEvent, str) else (registerEvent.type,)
+        registerEvents = _event_types(registerEvent)
 
         def register_decorator(func: Awaitable):
             """
@@ -342,17 +651,55 @@ class Yurine(object):
                     self.logging.debug(
                         f"register listener [{func.__name__}] for Event[{_event}]"
                     )
-                    if Karas.listeners.get(_event):
-                        Karas.listeners.get(_event).append(
-                            (func, callback, cb_args))
+                    _listener = Listener(func, _event, callback=callback, cbArgs=cb_args, filter=filter)
+                    if self.karas.listeners.get(_event):
+                        self.karas.listeners.get(_event).append(_listener)
                     else:
-                        Karas.listeners[_event] = [
-                            (func, callback, cb_args)]
+                        self.karas.listeners[_event] = [_listener]
 
             return register_wrapper()
 
         return register_decorator
 
+    def listen_command(
+            self,
+            command: str,
+            aliases: Iterable[str] = (),
+            registerEvent: Union[str, "MessageBase", List] = "GroupMessage",
+            prefix: str = ""
+    ) -> Callable:
+        """命令装饰器, 文本(去掉开头的空白)以该命令开头的消息交给被装饰的函数
+
+        Args:
+            command (str): 命令名
+            aliases (Iterable[str]): 命令的别名
+            registerEvent (str, Message, list): 要监听的消息类型, 默认为GroupMessage
+            prefix (str): 命令名与别名共同的前缀, 例如/
+
+        用法:
+        @yurine.listen_command("ban", aliases=["禁言"], prefix="/")
+        async def ban(group: Group, cmd: Command, target: int, minutes: int = 10): ...
+
+        "/ban 123 5"会调用ban, target=123, minutes=5. 注解为Command的参数传入命中的命令,
+        注解为str, int与float的参数按顺序从命令之后以空白分隔的参数中取值, 参数不足或者无法转换时不调用该函数,
+        其余参数与listen相同. 同一种消息中命令与别名不能重复, 多个命令都能匹配时使用最长的命令
+
+        Raises:
+            ValueError: 命令为空, 包含空白或者已经被注册
+        """
+        registerEvents = _event_types(registerEvent)
+
+        def register_decorator(func: Callable) -> Callable:
+            for _event in registerEvents:
+                self.logging.debug(f"register command [{prefix}{command}] -> [{func.__name__}] for Event[{_event}]")
+                _router = self.karas.commands.get(_event)
+                if _router is None:
+                    _router = self.karas.commands[_event] = CommandRouter(_event)
+                _router.add(command, func, aliases=aliases, prefix=prefix)
+            return func
+
+        return register_decorator
+
     @error_throw
     async def accept(
             self,
@@ -369,7 +716,7 @@ class Yurine(object):
             self.logging.error("非法请求")
         else:
             requestEvent.message = message
-            await self.ws.send_json(
+            await self._send_frame(
                 wrap_data_json(
                     syncId="accept",
                     command=requestEvent.command,
@@ -393,7 +740,7 @@ class Yurine(object):
             self.logging.error("非法请求")
         else:
             requestEvent.message = message
-            await self.ws.send_json(
+            await self._send_frame(
                 wrap_data_json(
                     syncId="reject",
                     command=requestEvent.command,
@@ -417,7 +764,7 @@ class Yurine(object):
             self.logging.error("非法请求")
         else:
             requestEvent.message = message
-            await self.ws.send_json(
+            await self._send_frame(
                 wrap_data_json(
                     syncId="reject",
                     command=requestEvent.command,
@@ -441,7 +788,7 @@ class Yurine(object):
             self.logging.error("非法请求")
         else:
             requestEvent.message = message
-            await self.ws.send_json(
+            await self._send_frame(
                 wrap_data_json(
                     syncId="reject",
                     command=requestEvent.command,
@@ -465,7 +812,7 @@ class Yurine(object):
             self.logging.error("非法请求")
         else:
             requestEvent.message = message
-            await self.ws.send_json(
+            await self._send_frame(
                 wrap_data_json(
                     syncId="reject",
                     command=requestEvent.command,
@@ -475,48 +822,58 @@ class Yurine(object):
 
     @error_throw
     async def uploadFile(self, group: Union[int, Group], file: Union[str, BinaryIO, bytes, None], type_: str = "group",
-                         path: str = "") -> File:
+                         path: str = "", timeout: Optional[float] = None) -> File:
         """上传群文件，返回的是上传的该文件对象
 
         args:
             group (int) :上传的群组 
             file (Union[str,BinaryIO,bytes,None]) : 要上传的文件，可以是路径或者一个已经打开了的二进制文件读取流
             path (str) :上传到群组指定的文件路径，默认为根目录
+            timeout (Optional[float]) :上传的最长秒数, 默认使用commandTimeout
 
         Returns:
             File: 上传的文件对象
         """
-        async with self.session.post(
-                self.route("/file/upload"),
-                data={
-                    "sessionKey": self.sessionKey,
-                    "type": type_,
-                    "target": str(group if isinstance(group, int) else group.id),
-                    "path": path,
-                    "file": open(file, "rb") if isinstance(file, str) else file
-                }
-        ) as _response:
-            parsed_data = await self._raise_status(await _response.json())
-            return File(**parsed_data)
+        try:
+            async with self.session.post(
+                    self.route("file", "upload"),
+                    data={
+                        "sessionKey": self.sessionKey,
+                        "type": type_,
+                        "target": str(group if isinstance(group, int) else group.id),
+                        "path": path,
+                        "file": open(file, "rb") if isinstance(file, str) else file
+                    },
+                    timeout=aiohttp.ClientTimeout(total=self._timeout(timeout))
+            ) as _response:
+                parsed_data = self._raise_status(self.codec.loads(await _response.read()))
+                return File(**parsed_data)
+        except asyncio.TimeoutError:
+            raise CommandTimeoutException(f"upload file to {group} timed out") from None
 
     @error_throw
-    async def uploadMultipart(self, obj: Union["Voice", "Image", "FlashImage"], type_: str) -> None:
+    async def uploadMultipart(self, obj: Union["Voice", "Image", "FlashImage"], type_: str,
+                              timeout: Optional[float] = None) -> None:
         """上传多媒体类型文件(语音, 图片),该方法仅作为上传方法，发送请使用sendXxxx(xxx,[Voice(file=xxx)])形式"""
         uploadType = "Image" if isinstance(obj, FlashImage) else obj.type
         if hasattr(obj, "url"):
             return
-        async with self.session.post(
-                self.route(f"upload{uploadType}"),
-                data={
-                    "sessionKey": self.sessionKey,
-                    "type": type_,
-                    obj.ftype: open(obj.file, "rb") if isinstance(
-                        obj.file, str) else obj.file
-                }
-        ) as _response:
-            parsed_data = await self._raise_status(await _response.json())
-            obj(**parsed_data)
-            obj.file = None
+        try:
+            async with self.session.post(
+                    self.route(f"upload{uploadType}"),
+                    data={
+                        "sessionKey": self.sessionKey,
+                        "type": type_,
+                        obj.ftype: open(obj.file, "rb") if isinstance(
+                            obj.file, str) else obj.file
+                    },
+                    timeout=aiohttp.ClientTimeout(total=self._timeout(timeout))
+            ) as _response:
+                parsed_data = self._raise_status(self.codec.loads(await _response.read()))
+                obj(**parsed_data)
+                obj.file = None
+        except asyncio.TimeoutError:
+            raise CommandTimeoutException(f"upload {uploadType} timed out") from None
 
     async def _element_check(self, element: "ElementBase", type_: str):
         if isinstance(element, (Image, Voice, FlashImage)):
@@ -533,16 +890,9 @@ class Yurine(object):
         return element.elements if isinstance(element, ElementBase) else element
 
     @error_throw
-    async def about(self):
+    async def about(self, timeout: Optional[float] = None):
         """获取mirai-api-http的版本"""
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="about",
-            )
-        )
-        version = await self._raise_status(syncId=syncId)
+        version = await self._request(command="about", timeout=timeout)
         return version.get("data").get("version")
 
     @error_throw
@@ -550,7 +900,8 @@ class Yurine(object):
             self,
             group: Union[int, "Group"],
             Elements: Union[List[Union[ElementBase, MessageChain]], MessageChain],
-            quote: Union[int, Source] = None
+            quote: Union[int, Source] = None,
+            timeout: Optional[float] = None
     ) -> Optional[int]:
         """发送群组消息
 
@@ -559,6 +910,7 @@ class Yurine(object):
             group (Union[int,Group]): 要发送的群组id或者对象
             Elements (list,Element): 要发送的消息类型，可以是单个类型或者一个列表
             quote (Union[int,Source]): 引用一条消息的messageId进行回复
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             int: 一个Int类型属性，标识本条消息，用于撤回和引用回复
@@ -566,16 +918,15 @@ class Yurine(object):
         _chain = [(await self._element_check(_e, type_="group")) for _e in Elements] \
             if not isinstance(Elements, MessageChain) else Elements.parse_to_json()
         content = await _build_content_json("group", group, quote, _chain)
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="sendGroupMessage",
-                content=content
-            ))
-        self.logging.info(
-            f"Group({group.name if isinstance(group, Group) else group}) <= {MessageChain(*_chain).to_str()}")
-        echo = await self._raise_status(syncId=syncId)
+        await self.rateLimiter.acquire("group", content["group"])
+        if self.logging.infoEnabled:
+            self.logging.info(
+                f"Group({group.name if isinstance(group, Group) else group}) <= {_chain_text(Elements, _chain)}")
+        echo = await self._request(
+            command="sendGroupMessage",
+            content=content,
+            timeout=timeout
+        )
         return echo.get("messageId")
 
     @error_throw
@@ -583,7 +934,8 @@ class Yurine(object):
             self,
             friend: Union[Friend, int],
             Elements: Union[List[Union[ElementBase, MessageChain]], MessageChain],
-            quote: Optional[Source] = None
+            quote: Optional[Source] = None,
+            timeout: Optional[float] = None
     ) -> Optional[int]:
 
         """发送好友消息
@@ -593,6 +945,7 @@ class Yurine(object):
             friend (Union[int,friend]): 要发送的好友id或者对象
             Elements (list,Element): 要发送的消息类型，可以是单个类型或者一个列表
             quote (Union[int,Source]): 引用一条消息的messageId进行回复
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             int: 一个Int类型属性，标识本条消息，用于撤回和引用回复
@@ -600,17 +953,15 @@ class Yurine(object):
         _chain = [(await self._element_check(_e, type_="friend")) for _e in Elements] \
             if not isinstance(Elements, MessageChain) else Elements.parse_to_json()
         content = await _build_content_json("target", friend, quote, _chain)
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="sendFriendMessage",
-                content=content
-            )
+        await self.rateLimiter.acquire("friend", content["target"])
+        if self.logging.infoEnabled:
+            self.logging.info(
+                f"Friend:{friend.nickname if isinstance(friend, Friend) else friend} <= {_chain_text(Elements, _chain)}")
+        echo = await self._request(
+            command="sendFriendMessage",
+            content=content,
+            timeout=timeout
         )
-        self.logging.info(
-            f"Friend:{friend.nickname if isinstance(friend, Friend) else friend} <= {MessageChain(*_chain).__str__()}")
-        echo = await self._raise_status(syncId=syncId)
         return echo.get("messageId")
 
     @error_throw
@@ -619,7 +970,8 @@ class Yurine(object):
             member: Union[int, Member],
             group: Union[int, Group],
             Elements: Union[List[Union[ElementBase, MessageChain]], MessageChain],
-            quote: Optional[Source] = None
+            quote: Optional[Source] = None,
+            timeout: Optional[float] = None
     ) -> Optional[int]:
 
         """发送临时会话消息
@@ -630,6 +982,7 @@ class Yurine(object):
             member (Union[int,Member]): 要发送的对象id或者成员对象
             Elements (list,Element): 要发送的消息类型，可以是单个类型或者一个列表
             quote (Union[int,Source]): 引用一条消息的messageId进行回复
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             int: 一个Int类型属性，标识本条消息，用于撤回和引用回复
@@ -642,38 +995,130 @@ class Yurine(object):
             quote: quote and quote.id,
             "messageChain": _chain
         }
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="sendTempMessage",
-                content=content
-            )
+        await self.rateLimiter.acquire("temp", content["qq"])
+        if self.logging.infoEnabled:
+            self.logging.info(
+                f"Temp{member.memberName if isinstance(member, Member) else member} <= {_chain_text(Elements, _chain)}")
+        echo = await self._request(
+            command="sendTempMessage",
+            content=content,
+            timeout=timeout
         )
-        self.logging.info(
-            f"Temp{member.memberName if isinstance(member, Member) else member} <= {MessageChain(*_chain).to_str()}")
-        echo = await self._raise_status(syncId=syncId)
         return echo.get("messageId")
 
+    async def broadcast(
+            self,
+            targets: Iterable[Union[int, Group, Friend]],
+            Elements: Union[List[Union[ElementBase, MessageChain]], MessageChain],
+            type_: str = "group",
+            concurrency: int = 10,
+            rate: Optional[float] = None,
+            timeout: Optional[float] = None
+    ) -> AsyncGenerator[Tuple[Union[int, Group, Friend], Union[int, Exception]], None]:
+        """向多个群组或好友发送同一条消息
+
+        图片语音只上传一次, 消息链只编码一次, 最多同时有concurrency条消息等待响应,
+        同时遵守rateLimiter的限速. 按完成的顺序逐个给出结果, 中途停止迭代会取消剩余的发送
+
+            async for target, result in bot.broadcast(groups, [Plain("公告")], concurrency=20, rate=5):
+                if isinstance(result, Exception):
+                    ...
+
+        broadcast是异步生成器, 不会被包装成同步方法, 在同步代码中使用broadcastAll
+
+        Args:
+            targets (Iterable[Union[int, Group, Friend]]): 要发送的群组或好友, 可以是id或者对象
+            Elements (list,Element): 要发送的消息类型，可以是单个类型或者一个列表
+            type_ (str): 发送对象的类型, group或friend. Defaults to "group".
+            concurrency (int): 同时等待响应的消息数量上限. Defaults to 10.
+            rate (Optional[float]): 本次广播每秒最多发送的条数, 为None时只受rateLimiter限制. Defaults to None.
+            timeout (Optional[float], optional): 每条消息等待响应的秒数, 默认使用commandTimeout. Defaults to None.
+
+        Yields:
+            Tuple[Union[int, Group, Friend], Union[int, Exception]]: 发送对象以及消息的messageId, 发送失败时为异常
+        """
+        if type_ == "group":
+            _command, _key = "sendGroupMessage", "group"
+        elif type_ == "friend":
+            _command, _key = "sendFriendMessage", "target"
+        else:
+            raise ValueError(f"broadcast type must be group or friend, not {type_}")
+        _chain = [(await self._element_check(_e, type_=type_)) for _e in Elements] \
+            if not isinstance(Elements, MessageChain) else Elements.parse_to_json()
+        _encoded_chain = self.codec.dumps(_chain)
+        if self.logging.infoEnabled:
+            self.logging.info(f"Broadcast({type_}) <= {_chain_text(Elements, _chain)}")
+        _bucket = rate and TokenBucket(rate, loop=self.loop)
+        _targets = iter(targets)
+        _results = asyncio.Queue()
+
+        async def _worker():
+            # 所有worker共用同一个迭代器, 每个对象只会被取出一次
+            for _target in _targets:
+                _id = _target if isinstance(_target, int) else _target.id
+                try:
+                    if _bucket:
+                        await _bucket.acquire()
+                    await self.rateLimiter.acquire(type_, _id)
+                    echo = await self._request(
+                        command=_command,
+                        encodedContent=f'{{"{_key}":{int(_id)},"messageChain":{_encoded_chain}}}',
+                        timeout=timeout
+                    )
+                    _results.put_nowait((_target, echo.get("messageId")))
+                except Exception as exc:
+                    _results.put_nowait((_target, exc))
+            _results.put_nowait(None)
+
+        _workers = [self.loop.create_task(_worker()) for _ in range(max(1, concurrency))]
+        _running = len(_workers)
+        try:
+            while _running:
+                _result = await _results.get()
+                if _result is None:
+                    _running -= 1
+                    continue
+                yield _result
+        finally:
+            for _task in _workers:
+                _task.cancel()
+
+    async def broadcastAll(
+            self,
+            targets: Iterable[Union[int, Group, Friend]],
+            Elements: Union[List[Union[ElementBase, MessageChain]], MessageChain],
+            type_: str = "group",
+            concurrency: int = 10,
+            rate: Optional[float] = None,
+            timeout: Optional[float] = None
+    ) -> List[Tuple[Union[int, Group, Friend], Union[int, Exception]]]:
+        """与broadcast相同, 全部发送完成后按完成的顺序返回所有结果, 可以在同步代码中调用
+
+            results = bot.broadcastAll(groups, [Plain("公告")], rate=5)
+
+        Returns:
+            List[Tuple[Union[int, Group, Friend], Union[int, Exception]]]: 发送对象以及消息的messageId, 发送失败时为异常
+        """
+        return [_result async for _result in self.broadcast(
+            targets, Elements, type_=type_, concurrency=concurrency, rate=rate, timeout=timeout
+        )]
+
     @error_throw
-    async def recall(self, message: Union[Source, int]):
+    async def recall(self, message: Union[Source, int], timeout: Optional[float] = None):
         """消息撤回
 
         Args:
             message (Union[Source, int]): 要撤回的消息，可以是一个Source或者消息Id
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                command="recall",
-                syncId=syncId,
-                content={
-                    "messageId": message.id if isinstance(message, Source) else message
-                }
-            )
-        )
         self.logging.info(f"BotRecall: {message.id if isinstance(message, Source) else message}")
-        echo = await self._raise_status(syncId=syncId)
+        echo = await self._request(
+            command="recall",
+            content={
+                "messageId": message.id if isinstance(message, Source) else message
+            },
+            timeout=timeout
+        )
         return echo.get("msg")
 
     @error_throw
@@ -683,6 +1128,7 @@ class Yurine(object):
             subject: Union[int, "Group", "Friend", None] = None,
             kind: Union[str, "Group", "Friend", "Stranger", None] = None,
             event_: Optional["NudgeEvent"] = None,
+            timeout: Optional[float] = None,
     ) -> None:
         """发送头像戳一戳消息，你可以只传入目标对象或者是一个事件对象
 
@@ -691,6 +1137,7 @@ class Yurine(object):
             subject (Union[int,Group,Friend]): 戳一戳接受主体(上下文), 戳一戳信息会发送至该主体, 为群号/好友QQ号
             kind (Union[str,Group,Friend,Stranger]): 上下文类型, 可选值 Friend, Group, Stranger
             event_ (NudgeEvent): 如果直接传入该参数，则对象为该事件发起人,该参数应为NudgeEvent类型
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
         Returns:
             _type_:
         """
@@ -701,172 +1148,134 @@ class Yurine(object):
             else target.group if isinstance(target, Member) else target.id
         kind = kind if kind is not None else event_.subject.kind if event_ is not None \
             else target.group.type if isinstance(target, Member) else target.type
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="sendNudge",
-                content={
-                    "target": target,
-                    "subject": subject,
-                    "kind": kind
-                }))
         self.logging.info(f"Bot <= NudgeEvent:{subject}")
-        echo = await self._raise_status(syncId=syncId)
+        echo = await self._request(
+            command="sendNudge",
+            content={
+                "target": target,
+                "subject": subject,
+                "kind": kind
+            },
+            timeout=timeout
+        )
         return echo.get("msg")
 
     @error_throw
     async def fetchMessageFromId(
             self,
-            messageId: int
+            messageId: int,
+            timeout: Optional[float] = None
     ) -> Optional[MessageChain]:
         """通过messageId获取消息
 
         Args:
             messageId (int): 获取消息的messageId
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             Optional[MessageChain]: 包含该条消息的消息链，如果该消息未被缓存返回None
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="messageFromId",
-                content={
-                    "id": messageId
-                }
-            )
+        message = await self._request(
+            command="messageFromId",
+            content={
+                "id": messageId
+            },
+            timeout=timeout
         )
-        message = await self._raise_status(syncId=syncId)
         return message and MessageChain(*message.get("messageChain"))
 
     @error_throw
-    async def fetchFriendList(self) -> Optional[List[Friend]]:
+    async def fetchFriendList(self, timeout: Optional[float] = None) -> Optional[List[Friend]]:
         """
         获取好友列表
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="friendList"
-            )
-        )
-        data = await self._raise_status(syncId=syncId)
-        return data and [Friend(**friend) for friend in data.get("data")]
+        data = await self._request(command="friendList", timeout=timeout)
+        return data and [self._receptor(Friend, friend) for friend in data.get("data")]
 
     @error_throw
     async def fetchFriendProfile(
             self,
-            friend: Union[Friend, int]
+            friend: Union[Friend, int],
+            timeout: Optional[float] = None
     ) -> Optional[Friend]:
         """
         获取好友详细资料
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="friendProfile",
-                content={
-                    "target": friend if isinstance(friend, int) else friend.id
-                }
-            )
+        friend = await self._request(
+            command="friendProfile",
+            content={
+                "target": friend if isinstance(friend, int) else friend.id
+            },
+            timeout=timeout
         )
-        friend = await self._raise_status(syncId=syncId)
         return friend and FriendProfile(**friend)
 
     @error_throw
-    async def fetchGroupList(self) -> Optional[List[Group]]:
+    async def fetchGroupList(self, timeout: Optional[float] = None) -> Optional[List[Group]]:
         """
         获取群列表
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="groupList"
-            )
-        )
-        data = await self._raise_status(syncId=syncId)
-        return data and [Group(**group) for group in data.get("data")]
+        data = await self._request(command="groupList", timeout=timeout)
+        return data and [self._receptor(Group, group) for group in data.get("data")]
 
     @error_throw
     async def fetchMemberList(
             self,
-            group: Union[Group, int]
+            group: Union[Group, int],
+            timeout: Optional[float] = None
     ) -> Optional[List[Member]]:
         """
         获取群成员列表
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="memberList",
-                content={
-                    "target": group if isinstance(group, int) else group.id
-                }
-            )
+        data = await self._request(
+            command="memberList",
+            content={
+                "target": group if isinstance(group, int) else group.id
+            },
+            timeout=timeout
         )
-        data = await self._raise_status(syncId=syncId)
-        return data and [Member(**member) for member in data.get("data")]
+        return data and [self._receptor(Member, member) for member in data.get("data")]
 
     @error_throw
     async def fetchMemberProfile(
             self,
             group: Union[Group, int],
-            member: Union[Member, int]
+            member: Union[Member, int],
+            timeout: Optional[float] = None
     ) -> Optional[MemberProfile]:
         """
         获取成员详细资料
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="memberProfile",
-                content={
-                    "target": group if isinstance(group, int) else group.id,
-                    "memberId": member if isinstance(member, int) else member.id
-                }
-            )
+        data = await self._request(
+            command="memberProfile",
+            content={
+                "target": group if isinstance(group, int) else group.id,
+                "memberId": member if isinstance(member, int) else member.id
+            },
+            timeout=timeout
         )
-        data = await self._raise_status(syncId=syncId)
         return data and MemberProfile(**data)
 
     @error_throw
-    async def fetchBotProfile(self) -> Optional[BotProfile]:
+    async def fetchBotProfile(self, timeout: Optional[float] = None) -> Optional[BotProfile]:
         """
         获取bot详细资料
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="botProfile"
-            )
-        )
-        data = await self._raise_status(syncId=syncId)
+        data = await self._request(command="botProfile", timeout=timeout)
         return data and BotProfile(**data)
 
     @error_throw
-    async def fetchUserProfile(self, target: int) -> Optional[UserProfile]:
+    async def fetchUserProfile(self, target: int, timeout: Optional[float] = None) -> Optional[UserProfile]:
         """
         获取用户详细资料
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="userProfile",
-                content={
-                    "target": target
-                }
-            )
+        data = await self._request(
+            command="userProfile",
+            content={
+                "target": target
+            },
+            timeout=timeout
         )
-        data = await self._raise_status(syncId=syncId)
         return data and UserProfile(**data)
 
     @error_throw
@@ -878,6 +1287,7 @@ class Yurine(object):
             withDownloadInfo: bool = False,
             offset: int = 1,
             size: int = 10,
+            timeout: Optional[float] = None,
     ) -> Optional[List[File]]:
         """获取文件列表
 
@@ -888,26 +1298,23 @@ class Yurine(object):
             withDownloadInfo (bool, optional): 	是否携带下载信息，额外请求，无必要不要携带. Defaults to False.
             offset (int, optional): 分页偏移. Defaults to 1.
             size (int, optional): 分页大小. Defaults to 10.
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             Optional[List[File]]: 一个文件对象列表
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="file_list",
-                content={
-                    "id": dir_id,
-                    "path": path,
-                    "target": target,
-                    "withDownloadInfo": withDownloadInfo,
-                    "offset": offset,
-                    "size": size
-                }
-            )
+        data = await self._request(
+            command="file_list",
+            content={
+                "id": dir_id,
+                "path": path,
+                "target": target,
+                "withDownloadInfo": withDownloadInfo,
+                "offset": offset,
+                "size": size
+            },
+            timeout=timeout
         )
-        data = await self._raise_status(syncId=syncId)
         return data and [File(**file) for file in data]
 
     @error_throw
@@ -916,7 +1323,8 @@ class Yurine(object):
             target: Union[int, Group, Friend] = None,
             dir_id: str = "",
             path: str = None,
-            withDownloadInfo: bool = False
+            withDownloadInfo: bool = False,
+            timeout: Optional[float] = None
     ) -> Optional[File]:
         """获取文件信息
 
@@ -925,24 +1333,21 @@ class Yurine(object):
             path (str, optional): 文件夹路径, 文件夹允许重名, 不保证准确, 准确定位使用 id. Defaults to None.
             target (Union[int,Group,Friend], optional): _description_. Defaults to None.
             withDownloadInfo (bool, optional): _description_. Defaults to False.
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             Optional[File]: 一个文件对象
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="file_info",
-                content={
-                    "id": dir_id,
-                    "path": path,
-                    "target": target,
-                    "withDownloadInfo": withDownloadInfo
-                }
-            )
+        data = await self._request(
+            command="file_info",
+            content={
+                "id": dir_id,
+                "path": path,
+                "target": target,
+                "withDownloadInfo": withDownloadInfo
+            },
+            timeout=timeout
         )
-        data = await self._raise_status(syncId=syncId)
         return data and File(**data)
 
     @error_throw
@@ -952,6 +1357,7 @@ class Yurine(object):
             directoryName: str,
             dir_id: str = "",
             path: Optional[str] = None,
+            timeout: Optional[float] = None,
     ) -> Optional[File]:
         """创建文件夹
 
@@ -960,24 +1366,21 @@ class Yurine(object):
             directoryName (str): 新建文件夹名
             dir_id (str, optional): 父目录id,空串为根目录. Defaults to "".
             path (Optional[str], optional): 文件夹路径, 文件夹允许重名, 不保证准确, 准确定位使用 id. Defaults to None.
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             Optional[File]: 一个文件对象
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="file_mkdir",
-                content={
-                    "id": dir_id,
-                    "path": path,
-                    "target": target,
-                    "directoryName": directoryName
-                }
-            )
+        return await self._request(
+            command="file_mkdir",
+            content={
+                "id": dir_id,
+                "path": path,
+                "target": target,
+                "directoryName": directoryName
+            },
+            timeout=timeout
         )
-        return await self._raise_status(syncId=syncId)
 
     @error_throw
     async def fileDelete(
@@ -985,6 +1388,7 @@ class Yurine(object):
             target: Union[int, Friend, Group],
             file_id: str = "",
             path: Optional[str] = None,
+            timeout: Optional[float] = None,
     ) -> None:
         """删除文件
 
@@ -992,23 +1396,20 @@ class Yurine(object):
             target (Union[int, Friend, Group]): 群或好友QQ
             file_id (str, optional): 删除文件id. Defaults to "".
             path (Optional[str], optional): 文件夹路径, 文件夹允许重名, 不保证准确, 准确定位使用 id. Defaults to None.
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             None
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="file_delete",
-                content={
-                    "id": file_id,
-                    "path": path,
-                    "target": target,
-                }
-            )
+        await self._request(
+            command="file_delete",
+            content={
+                "id": file_id,
+                "path": path,
+                "target": target,
+            },
+            timeout=timeout
         )
-        await self._raise_status(syncId=syncId)
         return None
 
     @error_throw
@@ -1019,6 +1420,7 @@ class Yurine(object):
             file_id: str = "",
             moveTo: str = None,
             moveToPath: str = None,
+            timeout: Optional[float] = None,
     ) -> None:
         """移动文件
 
@@ -1028,6 +1430,7 @@ class Yurine(object):
             file_id (str, optional): 移动文件id. Defaults to "".
             moveTo (str, optional): 移动目标文件夹id. Defaults to None.
             moveToPath (str, optional): 移动目标文件路径, 文件夹允许重名, 不保证准确, 准确定位使用 moveTo. Defaults to None.
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Raises:
             ValueError: moveTo和moveToPath至少要有一个
@@ -1037,21 +1440,17 @@ class Yurine(object):
         """
         if moveTo is None and moveToPath is None:
             raise ValueError("必须选择移动至目标的位置")
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="file_move",
-                content={
-                    "id": file_id,
-                    "path": path,
-                    "target": target,
-                    "moveTo": moveTo,
-                    "moveToPath": moveToPath
-                }
-            )
+        await self._request(
+            command="file_move",
+            content={
+                "id": file_id,
+                "path": path,
+                "target": target,
+                "moveTo": moveTo,
+                "moveToPath": moveToPath
+            },
+            timeout=timeout
         )
-        await self._raise_status(syncId=syncId)
         return None
 
     @error_throw
@@ -1061,6 +1460,7 @@ class Yurine(object):
             renameTo: str,
             file_id: str = "",
             path: str = None,
+            timeout: Optional[float] = None,
     ) -> None:
         """重命名文件
 
@@ -1069,20 +1469,20 @@ class Yurine(object):
             path (str): 文件夹路径, 文件夹允许重名, 不保证准确, 准确定位使用 id
             renameTo (str): 新文件名
             file_id (str, optional): 重命名文件id. Defaults to "".
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             str: 
         """
-        await self.ws.send_json(
-            wrap_data_json(
-                command="file_rename",
-                content={
-                    "id": file_id,
-                    "path": path,
-                    "target": target,
-                    "renameTo": renameTo
-                }
-            )
+        await self._request(
+            command="file_rename",
+            content={
+                "id": file_id,
+                "path": path,
+                "target": target,
+                "renameTo": renameTo
+            },
+            timeout=timeout
         )
         return None
 
@@ -1090,26 +1490,24 @@ class Yurine(object):
     async def deleteFriend(
             self,
             friend: Union[int, Friend],
+            timeout: Optional[float] = None,
     ) -> None:
         """删除好友
 
         Args:
             friend (Union[int, Friend]): 删除好友的QQ号码
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             str: 
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="deleteFriend",
-                content={
-                    "target": friend
-                }
-            )
+        await self._request(
+            command="deleteFriend",
+            content={
+                "target": friend
+            },
+            timeout=timeout
         )
-        await self._raise_status(syncId=syncId)
         return None
 
     @error_throw
@@ -1118,6 +1516,7 @@ class Yurine(object):
             group: Union[int, Group],
             member: Union[int, Member],
             time: Optional[int],
+            timeout: Optional[float] = None,
     ) -> None:
         """禁言群成员
 
@@ -1125,23 +1524,20 @@ class Yurine(object):
             group (Union[int, Group]): 指定群
             member (Union[int, Member]): 指定群员
             time (Optional[int]): 禁言时长，单位为秒，最多30天，默认为0
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             str: 
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="mute",
-                content={
-                    "target": group,
-                    "memberId": member,
-                    "time": time
-                }
-            )
+        await self._request(
+            command="mute",
+            content={
+                "target": group,
+                "memberId": member,
+                "time": time
+            },
+            timeout=timeout
         )
-        await self._raise_status(syncId=syncId)
         return None
 
     @error_throw
@@ -1149,28 +1545,26 @@ class Yurine(object):
             self,
             group: Union[int, Group],
             member: Union[int, Member],
+            timeout: Optional[float] = None,
     ) -> None:
         """解除群成员禁言
 
         Args:
             group (Union[int, Group]): 指定群
             member (Union[int, Member]): 指定群员
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             None
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="unmute",
-                content={
-                    "target": group,
-                    "memberId": member
-                }
-            )
+        await self._request(
+            command="unmute",
+            content={
+                "target": group,
+                "memberId": member
+            },
+            timeout=timeout
         )
-        await self._raise_status(syncId=syncId)
         return None
 
     @error_throw
@@ -1179,6 +1573,7 @@ class Yurine(object):
             group: Union[int, Group],
             member: Union[int, Member],
             msg: str = "",
+            timeout: Optional[float] = None,
     ) -> None:
         """移除群成员
 
@@ -1186,187 +1581,172 @@ class Yurine(object):
             group (Union[int, Group]): 指定群的群
             member (Union[int, Member]): 指定群员
             msg (str, optional): 信息. Defaults to "".
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             None
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="kick",
-                content={
-                    "target": group,
-                    "memberId": member,
-                    "msg": msg,
-                }
-            )
+        await self._request(
+            command="kick",
+            content={
+                "target": group,
+                "memberId": member,
+                "msg": msg,
+            },
+            timeout=timeout
         )
-        await self._raise_status(syncId=syncId)
         return None
 
     @error_throw
     async def quit(
             self,
-            group: Union[int, Group]
+            group: Union[int, Group],
+            timeout: Optional[float] = None
     ) -> None:
         """退出群聊
 
         Args:
             group (Union[int, Group]): 退出的群
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             None
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="quit",
-                content={
-                    "target": group
-                }
-            )
+        await self._request(
+            command="quit",
+            content={
+                "target": group
+            },
+            timeout=timeout
         )
-        await self._raise_status(syncId=syncId)
         return None
 
     @error_throw
     async def muteAll(
             self,
             group: Union[int, Group],
+            timeout: Optional[float] = None,
     ) -> None:
         """全体禁言
 
         Args:
             group (Union[int, Group]): 指定群
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             None
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="muteAll",
-                content={
-                    "target": group,
-                }
-            )
+        await self._request(
+            command="muteAll",
+            content={
+                "target": group,
+            },
+            timeout=timeout
         )
-        await self._raise_status(syncId=syncId)
         return None
 
     @error_throw
     async def unmuteAll(
             self,
-            group: Union[int, Group]
+            group: Union[int, Group],
+            timeout: Optional[float] = None
     ) -> None:
         """解除全体禁言
 
 
         Args:
             group (Union[int, Group]): 指定群
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             None
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="unmuteAll",
-                content={
-                    "target": group if isinstance(group, int) else group.id,
-                }
-            )
+        await self._request(
+            command="unmuteAll",
+            content={
+                "target": group if isinstance(group, int) else group.id,
+            },
+            timeout=timeout
         )
-        await self._raise_status(syncId=syncId)
         return None
 
     @error_throw
     async def setEssence(
             self,
-            messageId: Union[int, Source]
+            messageId: Union[int, Source],
+            timeout: Optional[float] = None
     ) -> None:
         """设置群精华消息
 
         Args:
             messageId (Union[int, Source]): 精华消息的message
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             None
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="setEssence",
-                content={
-                    "target": messageId if isinstance(messageId, int) else messageId.id
-                }
-            )
+        await self._request(
+            command="setEssence",
+            content={
+                "target": messageId if isinstance(messageId, int) else messageId.id
+            },
+            timeout=timeout
         )
-        await self._raise_status(syncId=syncId)
         return None
 
     @error_throw
     async def fetchGroupConfig(
             self,
             group: Union[int, Group],
+            timeout: Optional[float] = None,
     ) -> Optional[GroupConfig]:
         """获取群设置
 
         Args:
             group (Union[int, Group]): 指定群的群号
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             Optional[GroupConfig]: 一个群设置对象
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="groupConfig",
-                subCommand="get",
-                content={
-                    "target": group
-                }
-            )
+        config = await self._request(
+            command="groupConfig",
+            subCommand="get",
+            content={
+                "target": group
+            },
+            timeout=timeout
         )
-        config = await self._raise_status(syncId=syncId)
         return config and GroupConfig(**config)
 
     @error_throw
     async def setGroupConfig(
             self,
             group: Union[int, Group],
-            config: Union[Dict, GroupConfig] = None
+            config: Union[Dict, GroupConfig] = None,
+            timeout: Optional[float] = None
     ) -> None:
         """修改群设置
 
         Args:
             group (Union[int, Group]): 	指定群
             config (Union[Dict, GroupConfig], optional): 群设置. Defaults to None.
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             str: _description_
         """
         if isinstance(config, GroupConfig):
             config = GroupConfig.__dict__
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="groupConfig",
-                subCommand="set",
-                content={
-                    "target": group,
-                    "config": config
-                }
-            )
+        await self._request(
+            command="groupConfig",
+            subCommand="set",
+            content={
+                "target": group,
+                "config": config
+            },
+            timeout=timeout
         )
-        await self._raise_status(syncId=syncId)
         return None
 
     @error_throw
@@ -1374,37 +1754,36 @@ class Yurine(object):
             self,
             group: Union[int, Group],
             member: Union[int, Member],
+            timeout: Optional[float] = None,
     ) -> Optional[Member]:
         """获取群员设置
 
         Args:
             group (Union[int, Group]): 指定群
             member (Union[int, Member]): 指定群员
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             Optional[Member]: 一个Member对象
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="memberInfo",
-                subCommand="get",
-                content={
-                    "target": group,
-                    "memberId": member
-                }
-            )
+        info = await self._request(
+            command="memberInfo",
+            subCommand="get",
+            content={
+                "target": group,
+                "memberId": member
+            },
+            timeout=timeout
         )
-        info = await self._raise_status(syncId=syncId)
-        return info and Member(**info)
+        return info and self._receptor(Member, info)
 
     @error_throw
     async def setMemberInfo(
             self,
             group: Union[int, Group],
             member: Union[int, Member],
-            info: Union[Dict, MemberInfo]
+            info: Union[Dict, MemberInfo],
+            timeout: Optional[float] = None
     ) -> None:
         """修改群员设置
 
@@ -1412,26 +1791,23 @@ class Yurine(object):
             group (Union[int, Group]): 指定群
             member (Union[int, Member]): 指定群员
             info (Union[Dict, MemberInfo]): 群员设置对象或者字典
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             None
         """
         if isinstance(info, MemberInfo):
             info = MemberInfo.elements
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="memberInfo",
-                subCommand="update",
-                content={
-                    "target": group,
-                    "memberId": member,
-                    "info": info
-                }
-            )
+        await self._request(
+            command="memberInfo",
+            subCommand="update",
+            content={
+                "target": group,
+                "memberId": member,
+                "info": info
+            },
+            timeout=timeout
         )
-        await self._raise_status(syncId=syncId)
         return None
 
     @error_throw
@@ -1440,6 +1816,7 @@ class Yurine(object):
             group: Union[int, Group],
             member: Union[int, Member],
             assign: bool,
+            timeout: Optional[float] = None,
     ) -> None:
         """修改群员管理员
 
@@ -1447,23 +1824,20 @@ class Yurine(object):
             group (Union[int, Group]): 指定群
             member (Union[int, Member]): 指定群员
             assign (bool): 是否设置为管理员
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             None
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="memberAdmin",
-                content={
-                    "target": group,
-                    "memberId": member,
-                    "assign": assign
-                }
-            )
+        await self._request(
+            command="memberAdmin",
+            content={
+                "target": group,
+                "memberId": member,
+                "assign": assign
+            },
+            timeout=timeout
         )
-        await self._raise_status(syncId=syncId)
         return None
 
     @error_throw
@@ -1472,6 +1846,7 @@ class Yurine(object):
             group: Union[int, Group],
             offset: Optional[int] = None,
             size: Optional[int] = None,
+            timeout: Optional[float] = None,
     ) -> List[Announcement]:
         """获取群公告
 
@@ -1479,23 +1854,20 @@ class Yurine(object):
             group (Union[int, Group]): 指定群
             offset (Optional[int], optional): 分页参数. Defaults to None.
             size (Optional[int], optional): 分页参数. Defaults to None.
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             List[Announcement]: 群公告对象
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="anno_list",
-                content={
-                    "id": group,
-                    "offset": offset,
-                    "size": size
-                }
-            )
+        anno_list = await self._request(
+            command="anno_list",
+            content={
+                "id": group,
+                "offset": offset,
+                "size": size
+            },
+            timeout=timeout
         )
-        anno_list = await self._raise_status(syncId=syncId)
         return anno_list and [Announcement(**anno) for anno in anno_list]
 
     @error_throw
@@ -1509,7 +1881,8 @@ class Yurine(object):
             showPopup: bool = False,
             requireConfirmation: bool = False,
             image: Optional[Image] = None,
-            imageUrl: Optional[str] = None
+            imageUrl: Optional[str] = None,
+            timeout: Optional[float] = None
     ) -> Optional[Announcement]:
         """此方法向指定群发布群公告
         Args:
@@ -1522,6 +1895,7 @@ class Yurine(object):
             requireConfirmation	是否需要群成员确认
             image        	    公告图片对象
             imageUrl            公告图片url,本地图片请使用karas.elements.Image对象
+            timeout             等待响应的秒数, 默认使用commandTimeout
 
         Returns:
             包含群公告对象的列表
@@ -1529,92 +1903,80 @@ class Yurine(object):
         if isinstance(image, Image):
             await self.uploadMultipart(image, type_="group")
             imageUrl = image.url
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="anno_publish",
-                content={
-                    "target": group,
-                    "content": content,
-                    "sendToNewMember": sendToNewMember,
-                    "pinned": pinned,
-                    "showEditCard": showEditCard,
-                    "showPopup": showPopup,
-                    "requireConfirmation": requireConfirmation,
-                    "imageUrl": imageUrl
-                }
-            )
+        anno = await self._request(
+            command="anno_publish",
+            content={
+                "target": group,
+                "content": content,
+                "sendToNewMember": sendToNewMember,
+                "pinned": pinned,
+                "showEditCard": showEditCard,
+                "showPopup": showPopup,
+                "requireConfirmation": requireConfirmation,
+                "imageUrl": imageUrl
+            },
+            timeout=timeout
         )
-        anno = await self._raise_status(syncId=syncId)
         return anno and Announcement(**anno)
 
     @error_throw
     async def deleteAnnouncement(
             self,
             group: Union[int, Group],
-            fid: int
+            fid: int,
+            timeout: Optional[float] = None
     ) -> None:
         """删除群公告
 
         Args:
             group (Union[int, Group]): 指定群
             fid (int): 群公告id
+            timeout (Optional[float], optional): 等待响应的秒数, 默认使用commandTimeout. Defaults to None.
 
         Returns:
             None
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="anno_delete",
-                content={
-                    "id": group,
-                    "fid": fid
-                }
-            )
+        await self._request(
+            command="anno_delete",
+            content={
+                "id": group,
+                "fid": fid
+            },
+            timeout=timeout
         )
-        await self._raise_status(syncId=syncId)
         return None
 
-    async def execute_command(self, *command: Plain) -> Dict:
+    async def execute_command(self, *command: Plain, timeout: Optional[float] = None) -> Dict:
         # 执行command
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="cmd_execute",
-                content={
-                    "command": [cmd.elements for cmd in command]
-                }
-            )
+        resp = await self._request(
+            command="cmd_execute",
+            content={
+                "command": [cmd.elements for cmd in command]
+            },
+            timeout=timeout
         )
-        resp = await self._raise_status(syncId=syncId)
         return resp
 
-    async def register_command(self, name: str, usage: str, description: str, alias: Optional[List] = None) -> Dict:
+    async def register_command(self, name: str, usage: str, description: str, alias: Optional[List] = None,
+                               timeout: Optional[float] = None) -> Dict:
         """
         Args:
             name	str		指令名
             alias	Optional[list]		指令别名
             usage	str		使用说明
             description	str		命令描述
+            timeout	Optional[float]		等待响应的秒数, 默认使用commandTimeout
         """
-        syncId = self.namespace.gen()
-        await self.ws.send_json(
-            wrap_data_json(
-                syncId=syncId,
-                command="",
-                content={
-                    "name": name,
-                    "alias": [] if alias is None else alias,
-                    "usage": usage,
-                    "description": description
-                }
-            )
+        resp = await self._request(
+            command="",
+            content={
+                "name": name,
+                "alias": [] if alias is None else alias,
+                "usage": usage,
+                "description": description
+            },
+            timeout=timeout
         )
-        resp = await self._raise_status(syncId=syncId)
         return resp
 
     async def add_task(self, coro: Coroutine, name: str = None, callback: Callable = None, *_, **__) -> str:
@@ -1655,18 +2017,80 @@ class Yurine(object):
             except asyncio.CancelledError:
                 self.logging.info(f"canceled <task {_task.get_name()}>")
 
-    async def _raise_status(self, data: Optional[Dict] = None, syncId: str = None) -> Optional[Dict]:
+    async def _request(
+            self,
+            command: str,
+            subCommand: Optional[str] = None,
+            content: Optional[Dict] = None,
+            timeout: Optional[float] = None,
+            encodedContent: Optional[str] = None
+    ) -> Optional[Dict]:
+        """发送一条命令并等待其响应
+
+        Args:
+            command (str): 命令字
+            subCommand (Optional[str], optional): 子命令字. Defaults to None.
+            content (Optional[Dict], optional): 命令的数据对象. Defaults to None.
+            encodedContent (Optional[str], optional): 已经编码成json的数据对象, 给出时忽略content. Defaults to None.
+            timeout (Optional[float], optional): 从发送到收到响应的最长秒数, None使用commandTimeout,
+                小于等于0时一直等待. Defaults to None.
+
+        Returns:
+            Optional[Dict]: 经过状态码检查的响应数据
+
+        Raises:
+            CommandTimeoutException: 超时未收到响应
+        """
+        if self._inlineOnly:
+            self._inline_reply(wrap_data_json(
+                command=command,
+                subCommand=subCommand,
+                content=content
+            ) if encodedContent is None else wrap_encoded_frame(
+                syncId=None,
+                command=command,
+                subCommand=subCommand,
+                encodedContent=encodedContent,
+                dumps=self.codec.dumps
+            ))
+            # mirai-api-http不会返回内联回复的执行结果
+            return {}
+        _timeout = self._timeout(timeout)
+        _deadline = _timeout and self.loop.time() + _timeout
+        _channel = self._command_channel()
+        syncId = _channel.pending.allocate()
+        _frame = wrap_data_json(
+            syncId=syncId,
+            command=command,
+            subCommand=subCommand,
+            content=content
+        ) if encodedContent is None else wrap_encoded_frame(
+            syncId=syncId,
+            command=command,
+            subCommand=subCommand,
+            encodedContent=encodedContent,
+            dumps=self.codec.dumps
+        )
+        # 必须在发送前登记, 否则响应可能先于登记到达而被丢弃
+        _future = _channel.pending.register(syncId, command, _frame)
         try:
-            while 1:
-                await asyncio.sleep(.1)
-                _json_data = data or (syncId and self._receiveData.pop(syncId, None)) or await self.ws.receive_json()
-                if _json_data.get("syncId") and _json_data.get("syncId") == "-1":
-                    await self._receiver(_json_data)
-                    continue
-                break
-        except RuntimeError:
-            return await self._raise_status(data=data, syncId=syncId)
-        self.logging.debug(f"recv data {_json_data}")
+            await _channel.send(_frame, awaited=True)
+            _json_data = await asyncio.wait_for(_future, _deadline - self.loop.time()) \
+                if _deadline else await _future
+        except asyncio.TimeoutError:
+            _channel.pending.expire(syncId)
+            raise CommandTimeoutException(f"no response for {command}[{syncId}] in {_timeout}s") from None
+        finally:
+            _channel.pending.discard(syncId)
+        return self._raise_status(_json_data)
+
+    def _timeout(self, timeout: Optional[float]) -> Optional[float]:
+        """将调用时传入的timeout换算成实际的秒数, 返回None表示不限时"""
+        _timeout = self.commandTimeout if timeout is None else timeout
+        return _timeout if _timeout and _timeout > 0 else None
+
+    def _raise_status(self, _json_data: Dict) -> Optional[Dict]:
+        """检查响应中的状态码, 出错时抛出对应的异常"""
         _data = _json_data.get("data")
         _status_code = _json_data.get("code") or (_data and _data.get("code"))
         _exception = status_code_exception.get(_status_code or 0)
@@ -1679,9 +2103,7 @@ class Yurine(object):
         self.logging.debug("run_forever")
         if not self._is_running:
             self.start()
-        if not self._receiver_is_running:
-            self.loop.create_task(self._receiver())
-            self.logging.info(f"receiver created")
+        self._start_receiver()
         try:
             self.loop.run_forever()
         except Exception:
@@ -1737,13 +2159,35 @@ class Yurine(object):
 
     async def stop(self) -> int:
         """停止所有运行中的事件"""
-        for _task in asyncio.all_tasks(self.loop):
+        for _channel in self.channels:
+            await _channel.close()
+        self.logging.info(f"websocket closed")
+        if self._dispatcher_task is not None and self._dispatcher_task is not asyncio.current_task():
+            self._dispatcher_task.cancel()
+        if self.webhook is not None:
+            self.webhook.unregister(self)
+            if self._ownsWebhook:
+                await self.webhook.stop()
+        if self.capture is not None:
+            if self._ownsCapture:
+                self.capture.close()
+            else:
+                self.capture.flush()
+        if self.cluster is not None:
+            # loop由cluster中的所有账号共用, 只取消该账号的任务
+            _tasks = [
+                _task for _task in (*self._tasks.values(), self._dispatcher_task, *self._handlerTasks)
+                if _task is not None and not _task.done()
+            ]
+        else:
+            _tasks = asyncio.all_tasks(self.loop)
+        for _task in _tasks:
+            if _task is asyncio.current_task():
+                continue
             self.logging.debug(f"try canceling <task {id(_task)}>")
             await self._raise_task_cancel(_task)
-        if self.ws is not None and not self.ws.closed:
-            await self.ws.close()
-            self.logging.info(f"websocket closed")
-        if self.session is not None and not self.session.closed:
+        self._tasks.clear()
+        if self._ownsSession and self.session is not None and not self.session.closed:
             # await self._release()
             await self.session.close()
             self.logging.info("Session closed")
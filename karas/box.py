@@ -2,6 +2,7 @@
 可以在这里直接导入大部分需要使用的工具
 """
 from karas import Yurine
+from karas.cluster import YurineCluster
 from karas.elements import (
     At,
     AtAll,
@@ -40,6 +41,8 @@ from karas.sender import (
     Announcement,
 )
 from karas.chain import MessageChain, Quote, Forward, node
+from karas.util.command import Command
+from karas.util.keywords import KeywordMatch, KeywordMatcher, KeywordMatches, KeywordRules
 from karas.permission import AdministratorPermission, MemberPermission, OwnerPermission
 from karas.event import (
     RequestEvent,
@@ -2,32 +2,118 @@ from time import time
 from karas.util import BaseModel
 from karas.elements import ElementBase
 from karas.elements import MessageElementEnum
-from typing import List, Dict, Optional, Union, Type
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type, Union
 
 
 class MessageChain(BaseModel):
-    def __init__(self, *chain) -> None:
-        self._data = chain
+    """
+    MessageChain:
+        按原顺序保存的消息对象, 按类型查找时使用第一次查找时建立的类型 -> 下标索引
+
+        与之前一样可以通过类型名访问该类型的消息对象列表, 例如chain.Plain
+
+        从收到的数据构造时, 消息对象在第一次使用时才逐个创建, fetch, fetchone只创建返回的消息对象, 并保留收到的原始数组,
+        没有被取出(fetch, fetchone, 遍历等)的消息对象, parse_to_json直接使用原始数据, 转发消息时不必重新生成.
+        retainRaw为False时, 创建全部消息对象之后不再保留原始数组
+    """
+    __slots__ = ("_items", "_index", "_source")
+
+    def __init__(self, *chain: Union[Dict, ElementBase]) -> None:
+        if self.retainRaw:
+            self._data = chain
+        self._index: Optional[Dict[str, Tuple[int, ...]]] = None
         for _element in chain:
-            _element_type = _element.get("type")
-            _attr_obj = Quote(**_element) if _element_type == "Quote" \
-                else Forward(**_element) if _element_type == "Forward" \
-                else MessageElementEnum[_element_type].value(**_element)
-            if hasattr(self, _element_type):
-                getattr(self, _element_type).append(_attr_obj)
-            else:
-                setattr(self, _element_type, [_attr_obj])
+            if not isinstance(_element, dict):
+                self._items = tuple(_element if isinstance(_element, ElementBase) else _to_element(_element)
+                                    for _element in chain)
+                self._source = None
+                return
+        self._items = None
+        # 收到的原始数组, 消息对象可能被修改后不再使用
+        self._source = chain
+
+    @property
+    def _elements(self) -> Tuple[ElementBase, ...]:
+        _items = self._items
+        if type(_items) is tuple:
+            # 已经全部创建
+            return _items
+        _source = self._source
+        if _items is None:
+            _items = tuple(_to_element(_element) for _element in _source)
+        else:
+            _items = tuple(_to_element(_source[_i]) if _element is None else _element
+                           for _i, _element in enumerate(_items))
+        self._items = _items
+        if not self.retainRaw:
+            # 不保留原始数据时只保存消息对象
+            self._source = None
+        return _items
+
+    def _element(self, index: int) -> ElementBase:
+        """只创建下标为index的消息对象, 每个位置只创建一次, 部分创建时_items是list"""
+        _items = self._items
+        if _items is None:
+            _items = self._items = [None] * len(self._source)
+        _element = _items[index]
+        if _element is None:
+            _element = _items[index] = _to_element(self._source[index])
+        return _element
+
+    def _expose(self, indices: Optional[Iterable[int]] = None) -> Sequence[ElementBase]:
+        """消息对象交给调用者之后可能被修改, 这些位置不再直接发送原始数据
+
+        Args:
+            indices (Optional[Iterable[int]]): 交出的消息对象的下标, 为None时交出全部
+        """
+        if indices is None:
+            _elements = self._elements
+            self._source = None
+            return _elements
+        _elements = [self._element(_i) for _i in indices]
+        _source = self._source
+        if _source is not None:
+            if not isinstance(_source, list):
+                _source = self._source = list(_source)
+            for _i in indices:
+                _source[_i] = None
+        return _elements
+
+    def _indices(self, element: Union[str, Type[ElementBase]]) -> Tuple[int, ...]:
+        """该类型的消息对象在消息链中的下标"""
+        _index = self._index
+        if _index is None:
+            _source = self._source
+            _items = self._items
+            _types = (_element.type for _element in _items) if _source is None \
+                else (_items[_i].type if _element is None else _element.get("type")
+                      for _i, _element in enumerate(_source))
+            _lists: Dict[str, List[int]] = {}
+            for _i, _type in enumerate(_types):
+                _lists.setdefault(_type, []).append(_i)
+            _index = self._index = {_k: tuple(_v) for _k, _v in _lists.items()}
+        return _index.get(element if isinstance(element, str) else element.type, ())
 
     def parse_to_json(self) -> list:
         """
-        将消息链内部的消息对象转换成可发送的数组形式
+        将消息链内部的消息对象按原顺序转换成可发送的数组形式, 不包括Source
         """
-        _elements = []
-        for attr in self.__dict__.keys():
-            if attr == "Source" or attr.startswith("_"):
-                continue
-            _elements += [_e.elements for _e in self.fetch(attr)]
-        return _elements
+        _source = self._source
+        if _source is None:
+            return [_e.elements for _e in self._items if _e.type != "Source"]
+        if not isinstance(_source, list):
+            return [_e for _e in _source if _e.get("type") != "Source"]
+        # 已经交出的消息对象重新生成, 其余的直接使用原始数据
+        _items = self._items
+        _json = []
+        for _i, _e in enumerate(_source):
+            if _e is None:
+                _e = _items[_i]
+                if _e.type != "Source":
+                    _json.append(_e.elements)
+            elif _e.get("type") != "Source":
+                _json.append(_e)
+        return _json
 
     def fetch(self, element: Union[str, Type[ElementBase]]) -> Optional[List["ElementBase"]]:
         """从消息链中取出指定类型的消息对象列表
@@ -38,7 +124,10 @@ class MessageChain(BaseModel):
         Returns:
             List[ElementBase]: 一个包含了指定消息类型的消息对象列表,如果不存在则返回None
         """
-        return getattr(self, element if isinstance(element, str) else element.type, None)
+        _indices = self._indices(element)
+        if not _indices:
+            return None
+        return self._expose(_indices)
 
     def fetchone(self, element: Union[Type[ElementBase], str]) -> Optional["ElementBase"]:
         """从消息链中取出指定类型的第一个消息对象
@@ -49,8 +138,8 @@ class MessageChain(BaseModel):
         Returns:
             Optional[ElementBase]: 消息链中的第一个指定消息对象，不存在则返回None
         """
-        _element = element if isinstance(element, str) else element.type
-        return (self.has(_element) or None) and getattr(self, _element, None)[0]
+        _indices = self._indices(element)
+        return self._expose(_indices[:1])[0] if _indices else None
 
     def has(self, element: Union[str, Type[ElementBase]]) -> bool:
         """判断消息链中是否存在该类型的消息对象
@@ -61,7 +150,7 @@ class MessageChain(BaseModel):
         Returns:
             bool: 一个普通的Boolean
         """
-        return hasattr(self, element if isinstance(element, str) else element.type)
+        return bool(self._indices(element))
 
     def has_all(self, *element: Union[Type[ElementBase], str, List]) -> bool:
         """判断消息链中是否包含所有指定消息类型
@@ -85,7 +174,7 @@ class MessageChain(BaseModel):
         Returns:
             str: 一个表示消息链的字符串
         """
-        return "".join([str(_e) for _e in self._get_elements() if _e.type != "Source"])
+        return "".join([str(_e) for _e in self._elements if _e.type != "Source"])
 
     def to_text(self) -> str:
         """获取消息链中的文本消息
@@ -93,18 +182,32 @@ class MessageChain(BaseModel):
         Returns:
             _type_: 一个只有文本消息类型的str
         """
-        return self.fetch("Plain") and "".join([_plain.text for _plain in self.fetch("Plain")])
+        _indices = self._indices("Plain")
+        _items = self._items
+        _source = self._source
+        if _items is None:
+            # 消息对象还没有创建时直接读取原始数据
+            _texts = [_source[_i].get("text", "") for _i in _indices]
+        else:
+            _texts = [_source[_i].get("text", "") if _items[_i] is None else _items[_i].text for _i in _indices]
+        return "".join(_texts) if _texts else None
 
     def _get_elements(self) -> List[ElementBase]:
-        _elements = []
-        _chain = (_V for _K, _V in self.__dict__.items()
-                  if not _K.startswith("_"))
-        for _e in _chain:
-            _elements += _e
-        return _elements
+        return list(self._expose())
+
+    def __iter__(self) -> Iterator[ElementBase]:
+        return iter(self._expose())
+
+    def __getattr__(self, item: str) -> Any:
+        # 按类型名访问, 例如chain.Plain
+        if item[:1] != "_":
+            _elements = self.fetch(item)
+            if _elements is not None:
+                return _elements
+        return super().__getattr__(item)
 
     def __str__(self) -> str:
-        return f"".join([_e.__str__() for _e in self._get_elements()])
+        return f"".join([_e.__str__() for _e in self._elements])
 
 
 class Quote(ElementBase):
@@ -116,7 +219,6 @@ class Quote(ElementBase):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.type = "Quote"
 
 
 class node(ElementBase):
@@ -134,10 +236,10 @@ class Forward(ElementBase):
     nodeList: List[node]
 
     def __init__(self, **kws):
-        self._data = kws
+        if self.retainRaw:
+            self._data = kws
         self.nodeList = list(node(**content)
                              for content in kws.get("nodeList"))
-        self.type = "Forward"
 
     # @property
     # def elements(self) -> Dict[Any, Any]:
@@ -179,3 +281,13 @@ class Forward(ElementBase):
             sender = senders.pop()
             senders = [sender.copy() for _ in range(len(messages))]
         return cls(**{"nodeList": cls._build(senders, messages)})
+
+
+# 消息类型 -> 消息类
+_ELEMENT_CLASSES: Dict[str, Type[ElementBase]] = {
+    **{_e.name: _e.value for _e in MessageElementEnum}, "Quote": Quote, "Forward": Forward
+}
+
+
+def _to_element(element: Dict) -> ElementBase:
+    return _ELEMENT_CLASSES[element.get("type")](**element)
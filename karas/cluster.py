@@ -0,0 +1,226 @@
+import asyncio
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import aiohttp
+
+from karas import Karas, Yurine, _get_event_loop
+from karas.event import EventBase
+from karas.messages import MessageBase
+from karas.util.codec import JsonCodec, get_codec
+
+
+class YurineCluster:
+    """
+    YurineCluster:
+        在同一个loop中管理多个账号的Yurine, 所有账号共用一个ClientSession与连接池
+
+        每个账号有独立的Karas监听表与命令表, 监听函数中注解为Yurine的参数会传入收到该事件的bot:
+
+            cluster = YurineCluster(host="localhost", port=8080)
+            cluster.add(114514, "verifyKey")
+            cluster.add(1919810, "verifyKey")
+
+            @cluster.listen("GroupMessage")
+            async def repeat(bot: Yurine, group: Group, message: MessageChain):
+                await bot.sendGroup(group, message)
+
+            cluster.run_forever()
+    """
+
+    def __init__(
+            self,
+            host: str,
+            port: int,
+            loop: asyncio.AbstractEventLoop = None,
+            protocol: str = "ws",
+            codec: Union[str, JsonCodec] = "json",
+            startConcurrency: int = 16,
+            **options
+    ) -> None:
+        """
+        Args:
+            host (str): 默认的mirai-api-http地址, 单个账号可以在add时另外指定
+            port (int): 默认的mirai-api-http端口
+            codec (Union[str, JsonCodec]): 所有账号共用的json编解码器
+            startConcurrency (int): 启动时同时进行握手的账号数量
+            options: 传给每个Yurine的其他参数, 例如commandTimeout, loggerLevel
+        """
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self._loop = loop or _get_event_loop()
+        self.codec = get_codec(codec)
+        self.startConcurrency = max(1, startConcurrency)
+        self._options = options
+        self._bots: Dict[int, Yurine] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._is_running = False
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    @property
+    def session(self) -> Optional[aiohttp.ClientSession]:
+        return self._session
+
+    @property
+    def bots(self) -> List[Yurine]:
+        return list(self._bots.values())
+
+    def add(self, account: int, verifyKey: str, **options) -> Yurine:
+        """添加一个账号
+
+        Args:
+            account (int): bot的qq号
+            verifyKey (str): mirai-api-http的verifyKey
+            options: 只用于该账号的Yurine参数, 覆盖创建cluster时给出的参数
+
+        Returns:
+            Yurine: 该账号的bot, 也可以通过cluster[account]取得, cluster已经启动时需要再次调用astart或者该bot的astart
+        """
+        if account in self._bots:
+            raise ValueError(f"account {account} already in cluster")
+        _options = {
+            "host": self.host,
+            "port": self.port,
+            "protocol": self.protocol,
+            "codec": self.codec,
+            **self._options,
+            **options
+        }
+        _bot = Yurine(
+            account=account,
+            verifyKey=verifyKey,
+            loop=self.loop,
+            # 每个账号独立的监听表与命令表
+            karas=type("Karas", (Karas,), {"listeners": {}, "commands": {}}),
+            # cluster已经启动时直接使用共用的session, 否则在astart时注入
+            session=self._ensure_session() if self._is_running else self._session,
+            **_options
+        )
+        _bot.cluster = self
+        self._bots[account] = _bot
+        return _bot
+
+    async def remove(self, account: int) -> Optional[Yurine]:
+        """停止并移除一个账号"""
+        _bot = self._bots.pop(account, None)
+        if _bot is not None and _bot.is_running:
+            await _bot.stop()
+        return _bot
+
+    def listen(
+            self,
+            registerEvent: Union[str, "EventBase", "MessageBase", List],
+            accounts: Optional[Iterable[int]] = None,
+            callback: Callable = None,
+            cb_args: Optional[Tuple] = None,
+            filter: Optional[Callable[[Any], Any]] = None
+    ):
+        """事件装饰器, 为多个账号注册同一个监听函数
+
+        Args:
+            registerEvent (str, Event, Message, list): 要监听的事件或者消息类型
+            accounts (Optional[Iterable[int]]): 要监听的账号, 为None时为当前已经添加的所有账号
+            callback, cb_args, filter: 与Yurine.listen相同, filter为所有账号共用, 例如同一份KeywordRules
+        """
+        _bots = self.bots if accounts is None else [self._bots[_account] for _account in accounts]
+
+        def register_decorator(func):
+            for _bot in _bots:
+                _bot.listen(registerEvent, callback=callback, cb_args=cb_args, filter=filter)(func)
+            return func
+
+        return register_decorator
+
+    def listen_command(
+            self,
+            command: str,
+            aliases: Iterable[str] = (),
+            registerEvent: Union[str, "MessageBase", List] = "GroupMessage",
+            prefix: str = "",
+            accounts: Optional[Iterable[int]] = None
+    ) -> Callable:
+        """命令装饰器, 为多个账号注册同一个命令
+
+        Args:
+            command, aliases, registerEvent, prefix: 与Yurine.listen_command相同
+            accounts (Optional[Iterable[int]]): 要注册的账号, 为None时为当前已经添加的所有账号
+        """
+        _bots = self.bots if accounts is None else [self._bots[_account] for _account in accounts]
+
+        def register_decorator(func: Callable) -> Callable:
+            for _bot in _bots:
+                _bot.listen_command(command, aliases=aliases, registerEvent=registerEvent, prefix=prefix)(func)
+            return func
+
+        return register_decorator
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                # 每个账号至少占用一条常驻的websocket连接, 不能限制连接数
+                connector=aiohttp.TCPConnector(limit=0),
+                loop=self.loop,
+                json_serialize=self.codec.dumps
+            )
+        for _bot in self._bots.values():
+            _bot._session = self._session
+        return self._session
+
+    async def astart(self) -> "YurineCluster":
+        """连接所有账号, 同时进行握手的账号数量不超过startConcurrency"""
+        self._ensure_session()
+        _semaphore = asyncio.Semaphore(self.startConcurrency)
+
+        async def _start(bot: Yurine):
+            async with _semaphore:
+                await bot.astart()
+
+        await asyncio.gather(*(_start(_bot) for _bot in self._bots.values() if not _bot.is_running))
+        self._is_running = True
+        return self
+
+    def start(self) -> "YurineCluster":
+        return self.loop.run_until_complete(self.astart())
+
+    def run_forever(self) -> None:
+        """启动所有账号并挂起"""
+        if not self._is_running:
+            self.start()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.close()
+
+    async def stop(self) -> None:
+        """停止所有账号并关闭共用的session"""
+        await asyncio.gather(*(_bot.stop() for _bot in self._bots.values()))
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._is_running = False
+
+    def close(self) -> None:
+        if self.loop.is_closed():
+            return
+        self.loop.run_until_complete(self.stop())
+        self.loop.close()
+
+    def __getitem__(self, account: int) -> Yurine:
+        return self._bots[account]
+
+    def __contains__(self, account: int) -> bool:
+        return account in self._bots
+
+    def __iter__(self) -> Iterator[Yurine]:
+        return iter(self.bots)
+
+    def __len__(self) -> int:
+        return len(self._bots)
+
+    async def __aenter__(self) -> "YurineCluster":
+        return await self.astart()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
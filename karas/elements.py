@@ -11,7 +11,7 @@ class ElementBase(BaseModel):
 
     @property
     def elements(self) -> Dict[Any, Any]:
-        return {_K: _V for _K, _V in self.__dict__.items() if _V is not None and not _K.startswith("_")}
+        return self._asdict(dropNone=True)
 
     def __str__(self) -> str:
         return f" [{self.type}] "
@@ -22,14 +22,12 @@ class At(ElementBase):
     display: str
 
     def __init__(self, target: int, **kwargs):
-        self.type: str = "At"
         self.target = target
         super().__init__(**kwargs)
 
 
 class AtAll(ElementBase):
     def __init__(self, **kwargs):
-        self.type: str = "AtAll"
         super().__init__(**kwargs)
 
 
@@ -38,7 +36,6 @@ class Face(ElementBase):
     name: str
 
     def __init__(self, **kwargs):
-        self.type: str = "Face"
         super().__init__(**kwargs)
 
 
@@ -47,7 +44,6 @@ class Plain(ElementBase):
 
     def __init__(self, text, **kwargs):
         super().__init__(**kwargs)
-        self.type: str = "Plain"
         self.text = text
 
     def __str__(self) -> str:
@@ -59,11 +55,11 @@ class Source(ElementBase):
     time: int
 
     def __init__(self, **kwargs):
-        self.type: str = "Source"
         super().__init__(**kwargs)
 
 
 class Image(ElementBase):
+    __slots__ = ("ftype", "file")
     imageId: str
     url: str
     path: str
@@ -71,7 +67,6 @@ class Image(ElementBase):
 
     def __init__(self, file: Union[str, BinaryIO, bytes, None] = None, *args, **kwargs) -> None:
         super().__init__(**kwargs)
-        self.type: str = "Image"
         self.ftype = "img"
         self.file = file
 
@@ -101,10 +96,10 @@ class FlashImage(Image):
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        self.type: str = "FlashImage"
 
 
 class Voice(ElementBase):
+    __slots__ = ("ftype", "file")
     voiceId: str
     url: str
     path: Optional[str]
@@ -113,9 +108,7 @@ class Voice(ElementBase):
 
     def __init__(self, file: Union[str, BinaryIO, bytes, None] = None, *_, **kwargs) -> None:
         super().__init__(**kwargs)
-        self.type: str = "Voice"
         self.ftype = "voice"
-        self.type = "Voice"
         self.file = file
 
     def __str__(self) -> str:
@@ -130,7 +123,6 @@ class Xml(ElementBase):
     xml: str
 
     def __init__(self, xml: str, **kwargs):
-        self.type: str = "Xml"
         self.xml = xml
         super().__init__(**kwargs)
 
@@ -139,7 +131,6 @@ class Json(ElementBase):
     json: str
 
     def __init__(self, json: str, **kwargs):
-        self.type: str = "Json"
         self.json = json
         super().__init__(**kwargs)
 
@@ -148,7 +139,6 @@ class App(ElementBase):
     content: str
 
     def __init__(self, content: str, **kwargs):
-        self.type: str = "App"
         self.content = content
         super().__init__(**kwargs)
 
@@ -168,7 +158,6 @@ class Poke(ElementBase):
     name: str
 
     def __init__(self, name: str, **kwargs):
-        self.type: str = "Poke"
         self.name = name
         super().__init__(**kwargs)
 
@@ -177,7 +166,6 @@ class Dice(ElementBase):
     value: int
 
     def __init__(self, value: int, **kwargs):
-        self.type: str = "Dice"
         self.value = value
         super().__init__(**kwargs)
 
@@ -189,7 +177,6 @@ class MarketFace(ElementBase):
     name: str
 
     def __init__(self, **kwargs):
-        self.type: str = "MarketFace"
         super().__init__(**kwargs)
 
 
@@ -226,7 +213,6 @@ class MusicShare(ElementBase):
             brief: str,
             **kwargs
     ):
-        self.type: str = "MusicShare"
         self.kind = kind
         self.title = title
         self.summary = summary
@@ -269,6 +255,7 @@ class File(ElementBase):
     isDictionary	bool	是否文件夹(弃用)  
     isDirectory	    bool    	是否文件夹  
     """
+    __slots__ = ("file",)
     id: str
     name: str
     size: int
@@ -281,7 +268,6 @@ class File(ElementBase):
     downloadInfo: FileDownloadInfo
 
     def __init__(self, file: Union[str, bytes, BinaryIO, None] = None, path: str = "", parent=None, **kwargs):
-        self.type: str = "File"
         self.file = file
         self.path = path
         self.parent = parent and File(**parent)
@@ -293,7 +279,6 @@ class File(ElementBase):
 
 class MiraiCode(ElementBase):
     def __init__(self, **kwargs):
-        self.type: str = "MiraiCode"
         super().__init__(**kwargs)
 
     code: str
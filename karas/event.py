@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Union
+from typing import Optional, Tuple, Union
 
 from karas.sender import Client, Friend, Group, Member, Operator, Subject
 from karas.messages import MessageBase, MessageEnum
@@ -24,6 +24,7 @@ __events__ = {
 
 
 class EventBase(BaseModel):
+    _deferred: bool = True
     type: str
     selfEvent: bool = False
     fromId: int = 0
@@ -72,6 +73,7 @@ class GroupEventBase(EventBase):
 
 class RequestEvent(EventBase):
     """申请事件"""
+    __slots__ = ("operate",)
     command: str
     eventId: int
     fromId: int
@@ -86,12 +88,12 @@ class RequestEvent(EventBase):
     @property
     def accept(self):
         self.operate = 0
-        return self.__dict__
+        return self._asdict()
 
     @property
     def reject(self):
         self.operate = 1
-        return self.__dict__
+        return self._asdict()
 
 
 class BotOnlineEvent(BotEventBase):
@@ -418,7 +420,7 @@ class NewFriendRequestEvent(RequestEvent):
     @property
     def reject_block(self):
         self.operate = 2
-        return __dict__
+        return self._asdict()
 
     def __str__(self) -> str:
         return super().__str__() + f":{self.nick}[{self.fromId}]"
@@ -433,17 +435,17 @@ class MemberJoinRequestEvent(RequestEvent):
     @property
     def ignore(self):
         self.operate = 2
-        return self.__dict__
+        return self._asdict()
 
     @property
     def reject_block(self):
         self.operate = 3
-        return self.__dict__
+        return self._asdict()
 
     @property
     def ignore_block(self):
         self.operate = 4
-        return self.__dict__
+        return self._asdict()
 
     def __str__(self) -> str:
         return super().__str__() + f":{self.groupName}[{self.groupId}]"
@@ -534,9 +536,20 @@ class Auto_Switch_Event(object):
             Event: 一个已经被自动解析完成的事件对象
         """
         _type = kwargs.get("type")
-        if _type in __events__.get("messageEvent"):
-            _messageEvent = MessageEnum[_type].value
+        _messageEvent = _MESSAGE_CLASSES.get(_type)
+        if _messageEvent is not None:
             return _messageEvent(**kwargs)
-        else:
-            _event = EventEnum[_type].value
-            return Event(_event(**kwargs))
+        return Event(_EVENT_CLASSES[_type](**kwargs))
+
+
+# 事件类型 -> 事件类, 避免每次解析都查找Enum
+_MESSAGE_CLASSES = {_m.name: _m.value for _m in MessageEnum if _m.name in __events__["messageEvent"]}
+_EVENT_CLASSES = {_e.name: _e.value for _e in EventEnum}
+
+
+def event_class(type_: str) -> Tuple[Optional[type], bool]:
+    """事件类型对应的类, 以及是否为消息(其他事件解析后包装在Event中), 未知的类型为None"""
+    _message = _MESSAGE_CLASSES.get(type_)
+    if _message is not None:
+        return _message, True
+    return _EVENT_CLASSES.get(type_), False
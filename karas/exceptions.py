@@ -21,7 +21,10 @@ __all__: Tuple[str] = (
     "VerifyException",
     "FunctionException",
     "UnknownException",
-    "ConnectException"
+    "ConnectException",
+    "CommandTimeoutException",
+    "OutboxOverflowException",
+    "ConnectionLostException"
 )
 
 
@@ -44,6 +47,21 @@ class ConnectException(BotBaseException):
     pass
 
 
+class CommandTimeoutException(BotBaseException):
+    """在限定时间内没有收到命令的响应"""
+    pass
+
+
+class OutboxOverflowException(BotBaseException):
+    """断线期间暂存的待发送命令过多"""
+    pass
+
+
+class ConnectionLostException(BotBaseException):
+    """连接在收到命令的响应之前断开, 命令可能已经被执行"""
+    pass
+
+
 class BotNotFoundException(BotBaseException):
     """指定的Bot不存在"""
     pass
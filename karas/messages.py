@@ -1,17 +1,46 @@
 from enum import Enum
-from typing import Union
+from typing import Any, Callable, Union
 from karas.util import BaseModel
 from karas.sender import Client, Member, Sender, Friend, Subject, Stranger, Group
 from karas.chain import MessageChain
 from karas.elements import ElementBase
 
 
+class _SharedSender:
+    """延迟构造的sender, sender与group字段从同一个对象取得, 不引用消息本身"""
+    __slots__ = ("_factory", "_sender")
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self._factory = factory
+        self._sender = None
+
+    def sender(self) -> Any:
+        if self._factory is not None:
+            self._sender = self._factory()
+            self._factory = None
+        return self._sender
+
+    def group(self) -> Group:
+        return self.sender().group
+
+
 class MessageBase(BaseModel):
     """event base"""
+    _deferred: bool = True
     type: str
     sender: Union["ElementBase", "Sender", "Member", "Friend", "Subject"]
     messageChain: MessageChain
 
+    def _defer_group(self, sender: Any) -> None:
+        """group为sender.group, sender尚未转换时一起延迟"""
+        _lazy = self._lazy and self._lazy.get("sender")
+        if _lazy is None:
+            self.group = sender and self.sender.group
+            return
+        _shared = _SharedSender(_lazy[1])
+        self._defer("sender", _lazy[0], _shared.sender)
+        self._defer("group", Group, _shared.group)
+
     def __str__(self) -> str:
         return self.messageChain.to_str()
 
@@ -21,10 +50,11 @@ class GroupMessage(MessageBase):
     type: str = "GroupMessage"
     sender: Member
     messageChain: MessageChain
+    group: Group
 
     def __init__(self, **kws) -> None:
         super().__init__(**kws)
-        self.group = kws.get("sender") and self.sender.group
+        self._defer_group(kws.get("sender"))
 
     def __str__(self) -> str:
         return f"GroupMessage:[{self.sender.group.name}({self.sender.group.id})]" \
@@ -46,10 +76,11 @@ class TempMessage(MessageBase):
     type: str = "TempMessage"
     sender: Member
     messageChain: MessageChain
+    group: Group
 
     def __init__(self, **kws) -> None:
         super().__init__(**kws)
-        self.group = kws.get("sender") and self.sender.group
+        self._defer_group(kws.get("sender"))
 
     def __str__(self) -> str:
         return f"TempMessage:[{self.sender.memberName}({self.sender.id})]" + super().__str__()
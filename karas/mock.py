@@ -0,0 +1,382 @@
+"""
+用于测试与压测的mirai-api-http替身, 不需要真实的qq账号
+
+    python -m karas.mock --port 8080 --verify-key 1919810 --event-rate 100
+
+实现了websocket适配器的all, message, event通道(verifyKey与sessionKey握手), Yurine会发出的所有命令都有固定的响应,
+以及uploadImage, uploadVoice, file/upload三个http接口. 每条连接可以按照给定的速率推送合成的事件
+"""
+import argparse
+import asyncio
+import json
+import random
+import secrets
+from itertools import count
+from time import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aiohttp import web
+
+_MESSAGE_TYPES = frozenset(("FriendMessage", "GroupMessage", "TempMessage", "StrangerMessage", "OtherClientMessage"))
+
+_GROUP = {"id": 100000, "name": "mock group", "permission": "MEMBER"}
+
+
+def _member(memberId: int = 10001, group: Optional[Dict] = None) -> Dict:
+    return {
+        "id": memberId,
+        "memberName": f"member{memberId}",
+        "specialTitle": "",
+        "permission": "MEMBER",
+        "joinTimestamp": 0,
+        "lastSpeakTimestamp": 0,
+        "muteTimeRemaining": 0,
+        "group": group or _GROUP
+    }
+
+
+def _friend(friendId: int = 20001) -> Dict:
+    return {"id": friendId, "nickname": f"friend{friendId}", "remark": ""}
+
+
+def _profile() -> Dict:
+    return {"nickname": "mock", "email": "", "age": 0, "level": 1, "sign": "", "sex": "UNKNOWN"}
+
+
+def _file(name: str = "mock.txt", isFile: bool = True) -> Dict:
+    return {
+        "name": name,
+        "id": f"/{name}",
+        "path": f"/{name}",
+        "parent": None,
+        "contact": _GROUP,
+        "isFile": isFile,
+        "isDirectory": not isFile,
+        "downloadInfo": None
+    }
+
+
+def _announcement() -> Dict:
+    return {
+        "group": _GROUP,
+        "content": "mock announcement",
+        "senderId": 10001,
+        "fid": "mock",
+        "allConfirmed": False,
+        "confirmedMembersCount": 0,
+        "publicationTime": 0
+    }
+
+
+def _ok(**data) -> Dict:
+    return {"code": 0, "msg": "success", **data}
+
+
+class MockMiraiServer:
+    """
+    MockMiraiServer:
+        mirai-api-http的替身, 所有账号共用同一个verifyKey, 每次握手都会分配新的session
+
+            async with MockMiraiServer(port=8080, eventRate=1000) as server:
+                bot = Yurine(host="127.0.0.1", port=8080, account=1, verifyKey=server.verifyKey)
+                ...
+                print(server.commands)
+
+        可以通过responses覆盖或添加命令的响应, 键为命令字或者"命令字.子命令字", 值为响应数据或者接受请求内容返回响应数据的函数
+    """
+
+    def __init__(
+            self,
+            host: str = "127.0.0.1",
+            port: int = 8080,
+            verifyKey: str = "mock",
+            latency: float = 0.,
+            eventRate: float = 0.,
+            eventTypes: Optional[Dict[str, float]] = None,
+            responses: Optional[Dict[str, Any]] = None,
+            seed: Optional[int] = None
+    ) -> None:
+        """
+        Args:
+            host (str): 监听的地址
+            port (int): 监听的端口
+            verifyKey (str): 握手时要求的verifyKey
+            latency (float): 每条命令响应前等待的秒数, 各命令之间互不阻塞
+            eventRate (float): 每条连接每秒推送的合成事件数, 0为不推送
+            eventTypes (Optional[Dict[str, float]]): 推送的事件类型及其权重, 默认只推送GroupMessage
+            responses (Optional[Dict[str, Any]]): 覆盖默认的命令响应
+            seed (Optional[int]): 生成事件使用的随机数种子
+        """
+        self.host = host
+        self.port = port
+        self.verifyKey = verifyKey
+        self.latency = latency
+        self.eventRate = eventRate
+        self.eventTypes = eventTypes or {"GroupMessage": 1.}
+        self._random = random.Random(seed)
+        self._responses: Dict[str, Any] = {**self.default_responses(), **(responses or {})}
+        self._sessions: Dict[str, int] = {}
+        self._connections: Set[Tuple[int, str, web.WebSocketResponse]] = set()
+        self._messageId = count(1)
+        self._runner: Optional[web.AppRunner] = None
+        self.commands: Dict[str, int] = {}
+        self.uploads: Dict[str, int] = {}
+        self.handshakes = 0
+        self.eventsPushed = 0
+
+    @staticmethod
+    def default_responses() -> Dict[str, Any]:
+        """所有命令的默认响应"""
+        return {
+            "about": _ok(data={"version": "2.5.0"}),
+            "botProfile": _profile(),
+            "friendProfile": _profile(),
+            "memberProfile": _profile(),
+            "userProfile": _profile(),
+            "friendList": _ok(data=[_friend()]),
+            "groupList": _ok(data=[_GROUP]),
+            "memberList": _ok(data=[_member(10000 + _i) for _i in range(1, 11)]),
+            "messageFromId": _ok(data={
+                "type": "GroupMessage",
+                "messageChain": [{"type": "Source", "id": 1, "time": 0}, {"type": "Plain", "text": "mock"}],
+                "sender": _member()
+            }),
+            "file_list": _ok(data=[_file(), _file("mock", isFile=False)]),
+            "file_info": _ok(data=_file()),
+            "file_mkdir": _ok(data=_file("mock", isFile=False)),
+            "anno_list": _ok(data=[_announcement()]),
+            "anno_publish": _ok(data=_announcement()),
+            "groupConfig.get": {
+                "name": _GROUP["name"],
+                "confessTalk": False,
+                "allowMemberInvite": False,
+                "autoApprove": False,
+                "anonymousChat": False,
+                "muteAll": False
+            },
+            "memberInfo.get": _member(),
+        }
+
+    def _response(self, command: str, subCommand: Optional[str], content: Optional[Dict]) -> Dict:
+        _response = self._responses.get(f"{command}.{subCommand}") if subCommand else None
+        if _response is None:
+            _response = self._responses.get(command)
+        if callable(_response):
+            return _response(content)
+        if _response is not None:
+            return _response
+        if command in ("sendGroupMessage", "sendFriendMessage", "sendTempMessage"):
+            return _ok(messageId=next(self._messageId))
+        return _ok()
+
+    # ---------- 合成事件 ----------
+
+    def make_event(self, type_: str, account: int) -> Dict:
+        """生成一个指定类型的事件"""
+        _rand = self._random.randint
+        _chain = [
+            {"type": "Source", "id": next(self._messageId), "time": int(time())},
+            {"type": "Plain", "text": f"mock message {_rand(0, 1 << 16)}"}
+        ]
+        if type_ == "GroupMessage":
+            return {"type": type_, "messageChain": _chain, "sender": _member(_rand(10000, 19999))}
+        if type_ == "FriendMessage":
+            return {"type": type_, "messageChain": _chain, "sender": _friend(_rand(20000, 29999))}
+        if type_ == "TempMessage":
+            return {"type": type_, "messageChain": _chain, "sender": _member(_rand(10000, 19999))}
+        if type_ == "MemberJoinEvent":
+            return {"type": type_, "member": _member(_rand(10000, 19999)), "invitor": None}
+        if type_ == "MemberLeaveEventQuit":
+            return {"type": type_, "member": _member(_rand(10000, 19999))}
+        if type_ == "NudgeEvent":
+            return {
+                "type": type_,
+                "fromId": _rand(10000, 19999),
+                "subject": {"id": _GROUP["id"], "kind": "Group"},
+                "action": "戳了戳",
+                "suffix": "",
+                "target": account
+            }
+        if type_ == "BotOnlineEvent":
+            return {"type": type_, "qq": account}
+        raise ValueError(f"mock server cannot generate {type_}")
+
+    def _accepts(self, channel: str, type_: str) -> bool:
+        if channel == "all":
+            return True
+        return (type_ in _MESSAGE_TYPES) == (channel == "message")
+
+    async def push(self, account: int, event: Dict) -> int:
+        """向该账号的所有连接推送一个事件, 返回推送到的连接数"""
+        _frame = json.dumps({"syncId": "-1", "data": event}, ensure_ascii=False)
+        _pushed = 0
+        for _account, _channel, _ws in list(self._connections):
+            if _account == account and self._accepts(_channel, event["type"]) and not _ws.closed:
+                await _ws.send_str(_frame)
+                _pushed += 1
+        self.eventsPushed += _pushed
+        return _pushed
+
+    async def _event_stream(self, ws: web.WebSocketResponse, channel: str, account: int) -> None:
+        """按照eventRate推送合成事件, 每个tick补发到期的事件, 高速率时不受sleep精度影响"""
+        _types = [_type for _type in self.eventTypes if self._accepts(channel, _type)]
+        if not _types:
+            return
+        _weights = [self.eventTypes[_type] for _type in _types]
+        _start = time()
+        _sent = 0
+        while not ws.closed:
+            await asyncio.sleep(min(.01, 1 / self.eventRate))
+            _due = int((time() - _start) * self.eventRate) - _sent
+            for _type in self._random.choices(_types, _weights, k=_due):
+                if ws.closed:
+                    return
+                await ws.send_str(json.dumps({"syncId": "-1", "data": self.make_event(_type, account)},
+                                             ensure_ascii=False))
+            _sent += _due
+            self.eventsPushed += _due
+
+    # ---------- websocket ----------
+
+    async def _handshake(self, request: web.Request) -> Tuple[Optional[int], Dict]:
+        if request.headers.get("verifyKey") != self.verifyKey:
+            return None, {"code": 1, "msg": "Auth Key错误"}
+        try:
+            _account = int(request.headers.get("qq", ""))
+        except ValueError:
+            return None, {"code": 2, "msg": "指定Bot不存在"}
+        _session = request.headers.get("sessionKey")
+        if _session:
+            if self._sessions.get(_session) != _account:
+                return None, {"code": 3, "msg": "Session失效或不存在"}
+        else:
+            _session = secrets.token_hex(8)
+            self._sessions[_session] = _account
+        self.handshakes += 1
+        return _account, {"code": 0, "session": _session}
+
+    async def _reply(self, ws: web.WebSocketResponse, frame: Dict) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        _command = frame.get("command", "")
+        self.commands[_command] = self.commands.get(_command, 0) + 1
+        _data = self._response(_command, frame.get("subCommand"), frame.get("content"))
+        if not ws.closed:
+            await ws.send_str(json.dumps({"syncId": frame.get("syncId"), "data": _data}, ensure_ascii=False))
+
+    async def _websocket(self, request: web.Request) -> web.WebSocketResponse:
+        _channel = request.match_info["channel"]
+        _ws = web.WebSocketResponse()
+        await _ws.prepare(request)
+        _account, _result = await self._handshake(request)
+        await _ws.send_str(json.dumps({"syncId": "", "data": _result}, ensure_ascii=False))
+        if _account is None:
+            await _ws.close()
+            return _ws
+        _connection = (_account, _channel, _ws)
+        self._connections.add(_connection)
+        _tasks = set()
+        if self.eventRate > 0:
+            _tasks.add(asyncio.ensure_future(self._event_stream(_ws, _channel, _account)))
+        try:
+            async for _message in _ws:
+                if _message.type is not web.WSMsgType.TEXT:
+                    continue
+                # 每条命令单独处理, latency不会让后面的命令排队
+                _task = asyncio.ensure_future(self._reply(_ws, json.loads(_message.data)))
+                _tasks.add(_task)
+                _task.add_done_callback(_tasks.discard)
+        finally:
+            self._connections.discard(_connection)
+            for _task in _tasks:
+                _task.cancel()
+        return _ws
+
+    # ---------- http ----------
+
+    async def _upload(self, request: web.Request) -> web.Response:
+        _kind = request.match_info["kind"]
+        await request.post()
+        self.uploads[_kind] = self.uploads.get(_kind, 0) + 1
+        _id = secrets.token_hex(8)
+        if _kind == "Voice":
+            return web.json_response({"voiceId": f"{{{_id}}}.amr", "url": f"http://mock/{_id}", "path": ""})
+        return web.json_response({"imageId": f"{{{_id}}}.jpg", "url": f"http://mock/{_id}", "path": ""})
+
+    async def _upload_file(self, request: web.Request) -> web.Response:
+        _form = await request.post()
+        self.uploads["File"] = self.uploads.get("File", 0) + 1
+        _upload = _form.get("file")
+        return web.json_response(_ok(data=_file(getattr(_upload, "filename", None) or "mock.txt")))
+
+    # ---------- 运行 ----------
+
+    def make_app(self) -> web.Application:
+        _app = web.Application(client_max_size=64 * 1024 ** 2)
+        _app.router.add_get("/{channel:all|message|event}", self._websocket)
+        _app.router.add_post("/upload{kind:Image|Voice}", self._upload)
+        _app.router.add_post("/file/upload", self._upload_file)
+        return _app
+
+    async def start(self) -> "MockMiraiServer":
+        if self._runner is None:
+            self._runner = web.AppRunner(self.make_app(), access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, self.host, self.port).start()
+        return self
+
+    async def stop(self) -> None:
+        for _, _, _ws in list(self._connections):
+            await _ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "MockMiraiServer":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
+
+
+def _parse_event_types(value: str) -> Dict[str, float]:
+    """GroupMessage=9,MemberJoinEvent=1"""
+    _types = {}
+    for _item in value.split(","):
+        _type, _, _weight = _item.partition("=")
+        _types[_type.strip()] = float(_weight or 1)
+    return _types
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    _parser = argparse.ArgumentParser(prog="python -m karas.mock", description="mirai-api-http mock server")
+    _parser.add_argument("--host", default="127.0.0.1")
+    _parser.add_argument("--port", type=int, default=8080)
+    _parser.add_argument("--verify-key", default="mock")
+    _parser.add_argument("--latency", type=float, default=0., help="每条命令响应前等待的秒数")
+    _parser.add_argument("--event-rate", type=float, default=0., help="每条连接每秒推送的事件数")
+    _parser.add_argument("--event-types", type=_parse_event_types, default=None,
+                         help="推送的事件类型及权重, 例如GroupMessage=9,MemberJoinEvent=1")
+    _args = _parser.parse_args(argv)
+    _server = MockMiraiServer(
+        host=_args.host,
+        port=_args.port,
+        verifyKey=_args.verify_key,
+        latency=_args.latency,
+        eventRate=_args.event_rate,
+        eventTypes=_args.event_types
+    )
+
+    async def _serve() -> None:
+        await _server.start()
+        print(f"mock mirai-api-http listening on {_server.host}:{_server.port}, verifyKey={_server.verifyKey}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 from enum import Enum
-from karas.util import BaseModel
+from typing import Dict
+from karas.util import _MISSING, BaseModel
 from karas.chain import MessageChain
-from karas.permission import Permission, PermissionEnum
+from karas.permission import Permission
 
 """
 由于api统一发送者为sender，所以需要在事件里对sender进行区分
@@ -10,13 +11,35 @@ from karas.permission import Permission, PermissionEnum
 
 
 class ReceptorBase(BaseModel):
+    # 被IdentityMap复用的对象上可以由监听器保存自己的状态
+    __slots__ = ("__dict__",)
     id: int
-
-    def __init__(self, **kws) -> None:
-        _permission = kws.get("permission")
-        if _permission:
-            kws["permission"] = PermissionEnum[_permission].value()
-        super().__init__(**kws)
+    # 为True时可以被IdentityMap复用
+    _interned: bool = False
+
+    def _update(self, data: Dict) -> None:
+        """用再次收到的数据更新该对象"""
+        if self.retainRaw:
+            self._data = data
+        _converters = self._converters
+        for _k, _v in data.items():
+            _field = _converters.get(_k, _MISSING)
+            if _field is None:
+                setattr(self, _k, _v)
+                continue
+            if _field is _MISSING:
+                self._set_extra(_k, _v)
+                continue
+            _name, _type, _convert, _ = _field
+            if _convert is None:
+                continue
+            if _v is not None and not isinstance(_v, _type):
+                _old = getattr(self, _name, None)
+                # 权限没有变化时不必重新创建
+                if isinstance(_old, Permission) and _old.type == _v:
+                    continue
+                _v = _convert(_v)
+            setattr(self, _name, _v)
 
 
 class Group(ReceptorBase):
@@ -25,6 +48,7 @@ class Group(ReceptorBase):
     permission: bot在群组中的权限
     """
     type: str = "Group"
+    _interned: bool = True
     id: int
     name: str
     permission: Permission
@@ -45,6 +69,7 @@ class Sender(ReceptorBase):
 
 class Friend(ReceptorBase):
     type: str = "Friend"
+    _interned: bool = True
     id: int
     nickname: str
     remark: str
@@ -88,6 +113,7 @@ class Member(ReceptorBase):
     """
     """
     type: str = "Member"
+    _interned: bool = True
     id: int
     memberName: str
     specialTitle: str
@@ -1,8 +1,118 @@
-from typing import Type, List
+import inspect
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+# 参数的取值方式
+_FIELD = 0
+# 按isinstance匹配收到事件的bot或者filter的返回值
+_INSTANCE = 1
+
+_MISSING = object()
+
+
+def _field_names(type_: str) -> Optional[Dict[Any, str]]:
+    """
+    事件类型的字段类型 -> 字段名, 与分发时按字段值的类型查找的结果相同, 同一类型有多个字段时使用最后一个
+    未知的事件类型返回None
+    """
+    from karas.event import event_class
+    _class, _isMessage = event_class(type_)
+    if _class is None:
+        return None
+    if not _isMessage:
+        # 其他事件包装在Event中, 只能取得事件本身
+        return {str: "type", _class: "event"}
+    _names: Dict[Any, str] = {dict: "raw"}
+    for _klass in reversed(_class.__mro__):
+        for _k, _type in _klass.__dict__.get("__annotations__", {}).items():
+            if not _k.startswith("_") and inspect.isclass(_type):
+                _names[_type] = _k
+    return _names
 
 
 class Listener:
-    type: str
+    """
+    Listener:
+        注册到一种事件的监听函数, 参数在注册时按注解解析为字段名, 分发时只需要取出字段并调用
+
+        事件类型未知(例如自定义的事件)时, 在分发时按字段值的类型查找参数
+    """
+    __slots__ = ("func", "type", "callback", "cbArgs", "filter", "isCoroutine", "_binds")
+
+    def __init__(
+            self,
+            func: Callable,
+            type_: str,
+            callback: Optional[Callable] = None,
+            cbArgs: Optional[Tuple] = None,
+            filter: Optional[Callable[[Any], Any]] = None
+    ) -> None:
+        """
+        Args:
+            func (Callable): 监听函数
+            type_ (str): 监听的事件类型
+            callback (Optional[Callable]): 调用监听函数之前以事件的原始数据与cbArgs调用
+            cbArgs (Optional[Tuple]): 传入callback的其他参数
+            filter (Optional[Callable]): 以事件为参数, 返回值为假时不调用监听函数
+        """
+        self.func = func
+        self.type = type_
+        self.callback = callback
+        self.cbArgs = cbArgs or ()
+        self.filter = filter
+        self.isCoroutine = inspect.iscoroutinefunction(func)
+        self._binds = self._compile(_field_names(type_))
+
+    def _compile(self, names: Optional[Dict[Any, str]]) -> Optional[List[Tuple[str, int, Any]]]:
+        """(参数名, 取值方式, 字段名或者类)"""
+        if names is None:
+            return None
+        _binds = []
+        for _k, _t in self.func.__annotations__.items():
+            if _k == "return":
+                continue
+            if _t in names:
+                _binds.append((_k, _FIELD, names[_t]))
+            elif inspect.isclass(_t):
+                _binds.append((_k, _INSTANCE, _t))
+        return _binds
+
+    def bind(self, message: Any, bot: Any = None, passed: Any = None) -> Dict[str, Any]:
+        """取得调用监听函数的参数
+
+        Args:
+            message: 收到的事件
+            bot: 收到该事件的bot, 注解为其类型的参数会传入bot
+            passed: filter的返回值, 注解为其类型的参数会传入该值
+        """
+        if self._binds is None:
+            return self._bind_dynamic(message, bot, passed)
+        _o = {}
+        for _k, _kind, _arg in self._binds:
+            if _kind is _FIELD:
+                _v = getattr(message, _arg, _MISSING)
+                if _v is not _MISSING:
+                    _o[_k] = _v
+            elif bot is not None and isinstance(bot, _arg):
+                _o[_k] = bot
+            elif passed is not None and passed is not True and isinstance(passed, _arg):
+                _o[_k] = passed
+        return _o
+
+    def _bind_dynamic(self, message: Any, bot: Any, passed: Any) -> Dict[str, Any]:
+        # 类型 -> 字段名, 只有监听函数需要的字段才会被转换
+        _reversed = {_t: _k for _k, _t in message._field_types()}
+        _o = {}
+        for k, t in self.func.__annotations__.items():
+            if t in _reversed:
+                _o[k] = getattr(message, _reversed[t])
+            elif bot is not None and inspect.isclass(t) and isinstance(bot, t):
+                _o[k] = bot
+            elif passed is not None and passed is not True and inspect.isclass(t) and isinstance(passed, t):
+                _o[k] = passed
+        return _o
+
+    def __repr__(self) -> str:
+        return f"<Listener {self.func.__name__} for {self.type}>"
 
 
 class Listeners:
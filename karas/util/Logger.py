@@ -66,6 +66,8 @@ def os_check(color):
 
 
 class Logging:
+    # 所有bot共用一个输出到终端的handler, 否则同一进程中每多一个bot每条日志就会多输出一次
+    _handle: Optional[logging.Handler] = None
 
     def __init__(
             self,
@@ -81,7 +83,10 @@ class Logging:
         self.level = level.upper() if isinstance(level, str) else level
         self.logging.setLevel(level=self.level)
         self.botId = botId
-        self.handle = logging.StreamHandler()
+        if Logging._handle is None:
+            Logging._handle = logging.StreamHandler()
+            self.logging.addHandler(hdlr=Logging._handle)
+        self.handle = Logging._handle
         self.handle.setLevel(level=self.level)
         self._logFile = logFile
         self.filename = filename
@@ -90,7 +95,6 @@ class Logging:
         if logFile:
             if self.filename is None and not os.path.exists("logs"):
                 os.mkdir("logs")
-        self.logging.addHandler(hdlr=self.handle)
         self._level = {
             "INFO": 0,
             "DEBUG": 1,
@@ -99,6 +103,17 @@ class Logging:
         }
         self._logLv = self._level[self._recordLevel]
 
+    @property
+    def debugEnabled(self) -> bool:
+        """debug日志是否会被输出、记录或者交给callback, 用于跳过开销较大的日志格式化"""
+        return self.logging.isEnabledFor(logging.DEBUG) or bool(self._callbacks) \
+            or (self._logFile and self._level["DEBUG"] <= self._logLv)
+
+    @property
+    def infoEnabled(self) -> bool:
+        """info日志是否会被输出、记录或者交给callback"""
+        return self.logging.isEnabledFor(logging.INFO) or bool(self._callbacks) or self._logFile
+
     @property
     def callbacks(self) -> List:
         return list(self._callbacks.keys())
@@ -1,32 +1,189 @@
 import hashlib
+from functools import partial
 from time import time
+from types import MemberDescriptorType
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 from karas.exceptions import *
-from karas.permission import PermissionEnum
+from karas.permission import Permission, PermissionEnum
+from karas.util.identity import IDENTITY_MAP
 
 
 class MetaBase(type):
+    """
+    MetaBase:
+        由类的注解生成__slots__, 实例不再为每个字段保存在__dict__中
+
+        有默认值的字段仍然是类属性, 基类中已经生成的字段不会重复生成, 注解以外的属性可以在类中另外写__slots__,
+        type是实例的slot, 类中写的type保存为_type, 原始数据中没有对应slot的键存放在按需创建的_extra中
+    """
+
     def __new__(mcs, name, bases, namespace):
-        if not namespace.get("type"):
-            namespace["type"] = name
-        return super().__new__(mcs, name, bases, namespace)
+        namespace["_type"] = namespace.pop("type", None) or name
+        _annotations = namespace.get("__annotations__", {})
+        _inherited = set().union(*(getattr(_base, "_slots", ()) for _base in bases))
+        _slots = [_k for _k in (*namespace.get("__slots__", ()), *_annotations)
+                  if _k not in namespace and _k not in _inherited]
+        namespace["__slots__"] = tuple(dict.fromkeys(_slots))
+        _defaults = {}
+        for _base in reversed(bases):
+            _defaults.update(getattr(_base, "_defaults", {}))
+        _defaults.update({_k: namespace[_k] for _k in _annotations
+                          if _k in namespace and not hasattr(namespace[_k], "__get__")})
+        # 没有调用BaseModel.__init__的子类(例如MessageChain)的type
+        _defaults["type"] = namespace["_type"]
+        cls = super().__new__(mcs, name, bases, namespace)
+        cls._slots = frozenset(_inherited.union(_slots))
+        # 没有被子类的类属性覆盖的字段, 按MRO顺序排列
+        cls._fields = tuple(dict.fromkeys(
+            _k for _klass in reversed(cls.__mro__) for _k in _klass.__dict__.get("__slots__", ())
+            if not _k.startswith("_") and isinstance(getattr(cls, _k, None), MemberDescriptorType)
+        ))
+        # 基类中有默认值而在子类中生成了slot的字段, 未赋值时通过__getattr__取得默认值
+        cls._defaults = _defaults
+        cls._converters = _compile_converters(cls)
+        return cls
+
+    @property
+    def type(cls) -> str:
+        """类的type, 例如Plain.type"""
+        return cls._type
+
+
+_MISSING = object()
+# 这些类型的字段原样保存, 不做转换
+_PLAIN_TYPES = (str, int, float, bool, bytes, dict, list, tuple)
+
+
+def _converter(key: str, type_: type) -> Callable[[Any], Any]:
+    """字段值不是type_的实例时使用的转换函数"""
+    if key in ("origin", "current"):
+        # 权限变更事件的原权限与现权限
+        return lambda value: PermissionEnum[value].value if isinstance(value, str) else type_(*value)
+    if key == "messageChain":
+        return lambda value: type_(*value)
+    if getattr(type_, "_interned", False):
+        # 有IdentityMap时复用已有的对象
+        def convert(value):
+            _map = IDENTITY_MAP.get()
+            return type_(**value) if _map is None else _map._intern(type_, value)
+        return convert
+    if issubclass(type_, Permission):
+        return lambda value: PermissionEnum[value].value() if isinstance(value, str) else type_(**value)
+    return lambda value: type_(**value)
+
+
+def _compile_converters(cls: type) -> Dict[str, Tuple[str, Any, Optional[Callable[[Any], Any]], bool]]:
+    """
+    生成cls的转换表: 原始数据的键 -> (字段名, 类型, 转换函数, 是否延迟转换)
+    只包括需要转换成模型的字段以及type, from, 其余的slot字段为None直接赋值, 不在表中的键存放在_extra中
+    字段按MRO中最近的一个有注解的类确定
+    """
+    _annotations = next((_klass.__dict__["__annotations__"] for _klass in cls.__mro__
+                         if "__annotations__" in _klass.__dict__), {})
+    _converters = dict.fromkeys((*cls._fields, "type"))
+    if "From" in cls._fields:
+        _converters["from"] = ("From", None, None, False)
+    for _k, _type in _annotations.items():
+        if _k not in cls._fields or not isinstance(_type, type) or issubclass(_type, _PLAIN_TYPES):
+            continue
+        # 只有slot字段可以延迟, 否则访问时会取到类属性
+        _converters[_k] = (_k, _type, _converter(_k, _type), cls._deferred)
+    return _converters
 
 
 class BaseModel(metaclass=MetaBase):
+    __slots__ = ("_data", "_lazy", "_extra")
     type: str
+    # 为True时需要转换成模型的字段在第一次访问时才转换, 用于事件与消息
+    _deferred: bool = False
+    # 是否保留构造时传入的原始数据(raw), 可以对单个类或者BaseModel整体关闭以减少内存, 关闭后raw为None
+    retainRaw: bool = True
 
     def __init__(self, *args, **kws) -> None:
-        self._data = kws or args
+        self._lazy = self._extra = None
+        if "type" not in kws:
+            self.type = self._type
+        if self.retainRaw:
+            self._data = kws or args
+        _converters = self._converters
         for _k, _v in kws.items():
-            _k = _k if _k != "from" else "From"
-            _type = self.__annotations__.get(_k)
-            try:
-                if _type and _v is not None and not isinstance(_v, _type):
-                    _v = PermissionEnum[_v].value \
-                        if _k in ("origin", "current") and isinstance(_v, str) else _type(*_v) \
-                        if _k in ("origin", "current", "messageChain") else _type(**_v)
-            except Exception as e:
-                raise e
-            setattr(self, _k, _v)
+            _field = _converters.get(_k, _MISSING)
+            if _field is None:
+                setattr(self, _k, _v)
+                continue
+            if _field is _MISSING:
+                self._set_extra(_k, _v)
+                continue
+            _name, _type, _convert, _deferred = _field
+            if _convert is not None and _v is not None and not isinstance(_v, _type):
+                if _deferred:
+                    self._defer(_name, _type, partial(_convert, _v))
+                    continue
+                _v = _convert(_v)
+            setattr(self, _name, _v)
+
+    def _defer(self, key: str, type_: Any, factory: Callable[[], Any]) -> None:
+        """登记一个在第一次访问时才由factory生成的字段, type_为生成的对象的类型"""
+        if self._lazy is None:
+            self._lazy = {}
+        self._lazy[key] = (type_, factory)
+
+    def _set_extra(self, key: str, value: Any) -> None:
+        """保存没有对应slot的键, 与类属性同名时读取的仍然是类属性"""
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __getattr__(self, item: str) -> Any:
+        # 只有正常的属性查找失败时才会调用, 未赋值的slot也会到这里
+        if item not in ("_lazy", "_extra"):
+            _lazy = getattr(self, "_lazy", None)
+            if _lazy and item in _lazy:
+                _value = _lazy.pop(item)[1]()
+                setattr(self, item, _value)
+                if not _lazy:
+                    self._lazy = None
+                return _value
+            _extra = getattr(self, "_extra", None)
+            if _extra and item in _extra:
+                return _extra[item]
+            if item in self._defaults:
+                return self._defaults[item]
+        raise AttributeError(f"{self.__class__.__name__!r} object has no attribute {item!r}")
+
+    def _asdict(self, dropNone: bool = False) -> Dict[str, Any]:
+        """已经赋值的公开字段, 第一项总是type, 尚未转换的字段不包括在内
+
+        Args:
+            dropNone (bool): 是否去掉值为None的字段
+        """
+        _lazy = getattr(self, "_lazy", None)
+        _skip = None if dropNone else _MISSING
+        _dict = {"type": self.type}
+        for _k in self._fields:
+            if _lazy and _k in _lazy:
+                continue
+            _v = getattr(self, _k, _MISSING)
+            if _v is not _MISSING and _v is not _skip:
+                _dict[_k] = _v
+        _extra = getattr(self, "_extra", None)
+        if _extra:
+            for _k, _v in _extra.items():
+                if _v is not _skip and not _k.startswith("_"):
+                    _dict[_k] = _v
+        return _dict
+
+    def _field_types(self) -> Iterator[Tuple[str, Any]]:
+        """所有字段的名称与类型, 尚未转换的字段按注解给出类型而不转换"""
+        _raw = self.raw
+        if _raw is not None:
+            yield "_data", type(_raw)
+        for _k, _v in self._asdict().items():
+            yield _k, _v if isinstance(type, type(_v)) else type(_v)
+        _lazy = getattr(self, "_lazy", None)
+        if _lazy:
+            for _k, (_type, _) in _lazy.items():
+                yield _k, _type
 
     @classmethod
     def parse(cls, *_, **kwargs) -> "BaseModel":
@@ -38,10 +195,10 @@ class BaseModel(metaclass=MetaBase):
         _obj = cls(**_filter)
         return _obj
 
-    raw = property(lambda self: self._data, ..., ...)
+    raw = property(lambda self: getattr(self, "_data", None), ..., ...)
 
     def __str__(self) -> str:
-        return self.__dict__.__str__()
+        return self._asdict().__str__()
 
 
 status_code_exception = {
@@ -0,0 +1,150 @@
+"""
+websocket流量的录制与回放
+
+录制文件为追加写入的文本, 每次开始录制时写入一行头部, 之后每帧一行:
+
+    #karas-capture 1 <开始录制的unix时间>
+    <距开始录制的毫秒数>\t<方向>\t<连接名>\t<帧的原文>
+
+方向为<(收到)或>(发出), 文件名以.gz结尾时使用gzip压缩
+"""
+import asyncio
+import gzip
+from time import time
+from typing import TYPE_CHECKING, Dict, Iterator, NamedTuple, Optional, Set, Union
+
+if TYPE_CHECKING:
+    from karas import Yurine
+
+INBOUND = "<"
+OUTBOUND = ">"
+_HEADER = "#karas-capture 1 "
+
+
+class CapturedFrame(NamedTuple):
+    time: float
+    direction: str
+    channel: str
+    text: str
+
+
+class CaptureWriter:
+    """
+    CaptureWriter:
+        将bot收发的每一帧追加到录制文件, 写入有缓冲, 每隔flushInterval秒或者关闭时落盘
+    """
+
+    def __init__(self, path: str, flushInterval: float = 1.) -> None:
+        """
+        Args:
+            path (str): 录制文件的路径, 已存在时在末尾追加
+            flushInterval (float): 缓冲写入磁盘的最长间隔秒数
+        """
+        self.path = path
+        self.flushInterval = flushInterval
+        self._file = gzip.open(path, "at", encoding="utf-8") if path.endswith(".gz") \
+            else open(path, "a", encoding="utf-8", newline="\n")
+        self._start = time()
+        self._flushed = self._start
+        self.frames = 0
+        self._file.write(f"{_HEADER}{self._start:.3f}\n")
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def record(self, direction: str, channel: str, data: Union[str, bytes]) -> None:
+        """记录一帧
+
+        Args:
+            direction (str): INBOUND或者OUTBOUND
+            channel (str): 收发该帧的连接名
+            data (Union[str, bytes]): 帧的原文
+        """
+        if self._file.closed:
+            return
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        _now = time()
+        # json在字符串之外的换行等同于空格, 替换后每帧仍是一行
+        self._file.write(f"{int((_now - self._start) * 1000)}\t{direction}\t{channel}\t"
+                         f"{data.replace(chr(13), ' ').replace(chr(10), ' ')}\n")
+        self.frames += 1
+        if _now - self._flushed >= self.flushInterval:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._file.closed:
+            self._file.flush()
+            self._flushed = time()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+def read_capture(path: str) -> Iterator[CapturedFrame]:
+    """按顺序读取录制文件中的帧, 多次录制追加在同一文件时时间连续递增
+
+    Returns:
+        Iterator[CapturedFrame]: 帧的time为其录制时的unix时间
+    """
+    _file = gzip.open(path, "rt", encoding="utf-8") if path.endswith(".gz") \
+        else open(path, encoding="utf-8", newline="\n")
+    with _file:
+        _start = 0.
+        for _line in _file:
+            if _line.startswith(_HEADER):
+                _start = float(_line[len(_HEADER):])
+                continue
+            _offset, _direction, _channel, _text = _line.rstrip("\n").split("\t", 3)
+            yield CapturedFrame(_start + int(_offset) / 1000, _direction, _channel, _text)
+
+
+async def replay(
+        bot: "Yurine",
+        path: str,
+        speed: Optional[float] = 1.,
+        channel: Optional[str] = None
+) -> Dict:
+    """将录制文件中收到的推送按录制时的间隔交给bot的_receiver, 不需要连接mirai-api-http
+
+    Args:
+        bot (Yurine): 处理推送的bot
+        path (str): 录制文件的路径
+        speed (Optional[float]): 回放速度, 1为原速, 2为两倍速, None或0为不等待
+        channel (Optional[str]): 只回放该连接收到的推送
+
+    Returns:
+        Dict: frames回放的推送数, elapsed回放耗时, maxLag晚于计划时间的最大秒数
+    """
+    _loop = bot.loop
+    _tasks: Set[asyncio.Task] = set()
+    _first: Optional[float] = None
+    _begin = _loop.time()
+    _frames = 0
+    _maxLag = 0.
+    for _frame in read_capture(path):
+        if _frame.direction != INBOUND or (channel is not None and _frame.channel != channel):
+            continue
+        _data = bot.codec.loads(_frame.text)
+        if _data.get("syncId") != "-1":
+            continue
+        if speed:
+            if _first is None:
+                _first = _frame.time
+            _delay = _begin + (_frame.time - _first) / speed - _loop.time()
+            if _delay > 0:
+                await asyncio.sleep(_delay)
+            else:
+                _maxLag = max(_maxLag, -_delay)
+        for _task in await bot._receiver(None, _data["data"]):
+            _tasks.add(_task)
+            _task.add_done_callback(_tasks.discard)
+        _frames += 1
+        # 与dispatcher一样限制同时运行的监听任务
+        while bot.eventConcurrency and len(_tasks) >= bot.eventConcurrency:
+            await asyncio.wait(_tasks, return_when=asyncio.FIRST_COMPLETED)
+    if _tasks:
+        await asyncio.wait(_tasks)
+    return {"frames": _frames, "elapsed": _loop.time() - _begin, "maxLag": _maxLag}
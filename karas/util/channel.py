@@ -0,0 +1,314 @@
+import asyncio
+import traceback
+from collections import deque
+from typing import TYPE_CHECKING, Awaitable, Callable, Deque, Dict, NoReturn, Optional, Tuple
+
+import aiohttp
+
+from karas.exceptions import BotNotFoundException, ConnectException, ConnectionLostException, \
+    OutboxOverflowException, SessionInvalidationException, SessionUnauthorizedException
+from karas.util.capture import INBOUND, OUTBOUND
+from karas.util.correlator import SyncCorrelator
+from karas.util.heartbeat import Heartbeat
+from karas.util.network import EncodedFrame
+
+if TYPE_CHECKING:
+    from karas import Yurine
+
+# 只读取数据的命令, 断线时已发出但未收到响应的这些命令会在重连后重发, 其余命令重发可能导致重复执行
+REPLAYABLE_COMMANDS = frozenset((
+    "about",
+    "messageFromId",
+    "friendList",
+    "groupList",
+    "memberList",
+    "botProfile",
+    "friendProfile",
+    "memberProfile",
+    "userProfile",
+    "file_list",
+    "file_info",
+    "anno_list",
+))
+
+_WS_CLOSED_TYPES = (
+    aiohttp.WSMsgType.CLOSE,
+    aiohttp.WSMsgType.CLOSING,
+    aiohttp.WSMsgType.CLOSED,
+    aiohttp.WSMsgType.ERROR
+)
+
+
+class Channel:
+    """
+    Channel:
+        bot与mirai-api-http之间的一条websocket连接, 可以是all, message或event通道
+
+        负责握手, 读取, 心跳, 断线重连以及断线期间的outbox, 每条连接有独立的syncId纪元,
+        命令的响应按syncId交给等待的调用者, 推送(syncId为-1)交给onEvent, 没有onEvent时丢弃
+    """
+
+    def __init__(
+            self,
+            bot: "Yurine",
+            route: str = "all",
+            name: Optional[str] = None,
+            onEvent: Optional[Callable[["Channel", Dict], Awaitable]] = None,
+            ws: Optional[aiohttp.ClientWebSocketResponse] = None
+    ) -> None:
+        """
+        Args:
+            bot (Yurine): 连接所属的bot
+            route (str): mirai-api-http的通道, all, message或event
+            name (Optional[str]): 用于日志的名称, 默认与route相同
+            onEvent: 收到推送时调用的协程函数, 参数为(channel, 推送的数据)
+            ws (Optional[ClientWebSocketResponse]): 已经完成握手的连接
+        """
+        self.bot = bot
+        self.route = route
+        self.name = name or route
+        self._onEvent = onEvent
+        self.ws = ws
+        self.connected = ws is not None and not ws.closed
+        self.pending = SyncCorrelator(bot.loop)
+        # 断线期间暂存的(帧, 是否有调用者等待响应)
+        self._outbox: Deque[Tuple[Dict, bool]] = deque()
+        self.heartbeat = bot.heartbeatInterval and Heartbeat(
+            self.ping, self._heartbeat_timeout, interval=bot.heartbeatInterval, pongTimeout=bot.heartbeatTimeout,
+            loop=bot.loop
+        )
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._reader_task: Optional[asyncio.Task] = None
+
+    @property
+    def logging(self):
+        return self.bot.logging
+
+    @property
+    def outstanding(self) -> int:
+        """等待响应以及等待发送的命令数量"""
+        return len(self.pending) + len(self._outbox)
+
+    async def connect(self) -> None:
+        """
+        向服务器发起 WebSocket 连接, bot持有sessionKey时会先尝试恢复该session
+        :raise VerifyException
+        :raise ConnectException
+        """
+        self.logging.debug(f"connect websocket server {self.bot.route(self.route)}")
+        _headers = {
+            "verifyKey": self.bot.verifyKey,
+            "qq": str(self.bot.account)
+        }
+        if self.bot.sessionKey:
+            _headers["sessionKey"] = self.bot.sessionKey
+        try:
+            self.ws = await self.bot.session.ws_connect(
+                url=self.bot.route(self.route),
+                headers=_headers,
+                # pong由reader处理, 用于心跳检测
+                autoping=False
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            # 包括握手失败(例如mirai重启期间的503)与超时, 均可以重试
+            raise ConnectException(f"{exc.__class__.__name__}: {exc}") from exc
+        self.pending.renew()
+        # 此时reader尚未读取该连接, 握手的响应直接从ws读取
+        try:
+            self.bot.sessionKey = self.bot._raise_status(await self.receive_frame()).get("session")
+        except (SessionInvalidationException, SessionUnauthorizedException):
+            await self.ws.close()
+            if "sessionKey" not in _headers:
+                raise
+            self.logging.info(f"[{self.name}] session expired, verify again")
+            self.bot.sessionKey = None
+            return await self.connect()
+        except (ConnectionResetError, TypeError, aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            await self.ws.close()
+            raise ConnectException(f"{exc.__class__.__name__}: {exc}") from exc
+        except BaseException:
+            # 验证失败时不保留半开的连接
+            await self.ws.close()
+            raise
+        await self._flush_outbox()
+        self.connected = True
+        self._start_heartbeat()
+
+    async def reconnect(self) -> None:
+        """
+        断线重连, 按照bot的reconnectPolicy退避重试, 次数用尽后停止bot
+        重连期间发送的命令会暂存在outbox中, 重连成功后按顺序发出
+        """
+        self.logging.warning(f"[{self.name}] connection lost, reconnecting...")
+        self.connected = False
+        if self.ws is not None and not self.ws.closed:
+            await self.ws.close()
+        self._requeue_inflight()
+        _policy = self.bot.reconnectPolicy
+        for step, delay in enumerate(_policy.delays(), 1):
+            try:
+                await self.connect()
+            except (ConnectException, BotNotFoundException) as exc:
+                self.logging.warning(
+                    f"[{self.name}] reconnect {self.bot.host} failed({exc.__class__.__name__}) "
+                    f"{step}/{_policy.retries or '-'}, retry in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+            else:
+                self.logging.info(f"[{self.name}] reconnect success")
+                return
+        self.logging.error("reconnect fail, closing...")
+        await self.bot.stop()
+        raise ConnectException(f"cannot reconnect {self.bot.host}")
+
+    def _requeue_inflight(self) -> None:
+        """
+        处理断线时已经发出但还没有收到响应的命令:
+            只读命令放回outbox在重连后重发, 其余命令无法确定是否已被执行, 直接以ConnectionLostException结束
+        """
+        _queued = {_frame["syncId"] for _frame, _ in self._outbox}
+        _replay = []
+        for syncId, _command, _frame in self.pending.entries():
+            if _frame is None or syncId in _queued:
+                continue
+            if _command in REPLAYABLE_COMMANDS:
+                _replay.append((_frame, True))
+            else:
+                self.pending.fail(syncId, ConnectionLostException(f"connection lost before {_command} response"))
+        self._outbox.extendleft(reversed(_replay))
+
+    async def _flush_outbox(self) -> None:
+        """按顺序发出断线期间暂存的帧, 已经超时的命令不再发送"""
+        while self._outbox:
+            _frame, _awaited = self._outbox.popleft()
+            if _awaited and _frame["syncId"] not in self.pending:
+                continue
+            await self.write(_frame)
+
+    async def receive_frame(self) -> Dict:
+        """从websocket读取一帧并解码
+
+        :raise ConnectionResetError 连接已关闭
+        :raise TypeError 收到的不是数据帧
+        """
+        while True:
+            _message = await self.ws.receive()
+            if self.heartbeat:
+                self.heartbeat.feed()
+            if _message.type is aiohttp.WSMsgType.PING:
+                await self.ws.pong(_message.data)
+                continue
+            if _message.type is not aiohttp.WSMsgType.PONG:
+                break
+        if _message.type in _WS_CLOSED_TYPES:
+            raise ConnectionResetError(f"websocket closed: {_message.data!r}")
+        if _message.type is not aiohttp.WSMsgType.TEXT and _message.type is not aiohttp.WSMsgType.BINARY:
+            raise TypeError(f"Received message {_message.type}:{_message.data!r} is not TEXT")
+        if self.bot.capture is not None:
+            self.bot.capture.record(INBOUND, self.name, _message.data)
+        if self.logging.debugEnabled:
+            self.logging.debug(f"[{self.name}] recv frame {_message.data}")
+        return self.bot.codec.loads(_message.data)
+
+    async def send(self, frame: Dict, awaited: bool = False) -> None:
+        """发送一帧, 断线期间暂存到outbox
+
+        Args:
+            frame (Dict): 要发送的帧
+            awaited (bool): 是否有调用者在等待该帧的响应
+
+        Raises:
+            OutboxOverflowException: 断线期间暂存的帧已达到outboxSize
+        """
+        if self.connected:
+            try:
+                return await self.write(frame)
+            except ConnectionResetError:
+                # 由reader负责重连
+                self.connected = False
+        if len(self._outbox) >= self.bot.outboxSize:
+            raise OutboxOverflowException(f"{len(self._outbox)} frames are waiting for reconnection")
+        self._outbox.append((frame, awaited))
+
+    async def write(self, frame: Dict) -> None:
+        """编码并发送一帧"""
+        _data = frame.text if isinstance(frame, EncodedFrame) else self.bot.codec.dumps(frame)
+        if self.logging.debugEnabled:
+            self.logging.debug(f"[{self.name}] send frame {_data}")
+        await self.ws.send_str(_data)
+        if self.bot.capture is not None:
+            self.bot.capture.record(OUTBOUND, self.name, _data)
+
+    async def ping(self) -> None:
+        """向服务端发送心跳"""
+        if self.ws is None or self.ws.closed:
+            raise ConnectionResetError("websocket closed")
+        await self.ws.ping()
+
+    async def drop(self) -> None:
+        """关闭当前连接, 由reader重新连接"""
+        if self.ws is not None and not self.ws.closed:
+            await self.ws.close()
+
+    async def _heartbeat_timeout(self) -> None:
+        """心跳超时, 关闭连接后由reader重新连接"""
+        self.logging.warning(f"[{self.name}] no pong in {self.heartbeat.pongTimeout}s, closing connection")
+        await self.drop()
+
+    def _start_heartbeat(self) -> None:
+        if not self.heartbeat:
+            return
+        self.heartbeat.feed()
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self.logging.debug(f"[{self.name}] create heartbeat service")
+            self._heartbeat_task = self.bot.loop.create_task(self.heartbeat.run())
+
+    def start(self) -> None:
+        """创建唯一读取该连接的reader"""
+        if self._reader_task is None or self._reader_task.done():
+            self._reader_task = self.bot.loop.create_task(self._reader())
+            self.logging.debug(f"[{self.name}] reader created")
+
+    async def _reader(self) -> NoReturn:
+        try:
+            while True:
+                try:
+                    _receive_data = await self.receive_frame()
+                except ConnectionResetError:
+                    await self.reconnect()
+                    continue
+                except TypeError:
+                    if self.bot.online:
+                        self.logging.error(f"[{self.name}] invalid response")
+                        continue
+                    await asyncio.sleep(3)
+                    continue
+                syncId = _receive_data.get("syncId")
+                if syncId == "-1":
+                    if self._onEvent is not None:
+                        await self._onEvent(self, _receive_data["data"])
+                elif syncId:
+                    if not self.pending.resolve(syncId, _receive_data):
+                        self.logging.debug(f"[{self.name}] drop unawaited response {syncId}")
+                elif self.logging.debugEnabled:
+                    self.logging.debug(f"[{self.name}] Unknown event:{_receive_data}")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.logging.error(traceback.format_exc())
+            raise
+
+    async def close(self, exc: Optional[BaseException] = None) -> None:
+        """关闭连接, 等待中的调用者会收到exc"""
+        self.connected = False
+        # 命令可能已经被执行, 不能当作连接失败重试
+        self.pending.fail_all(exc or ConnectionLostException("connection closed before response"))
+        self._outbox.clear()
+        for _task in (self._reader_task, self._heartbeat_task):
+            if _task is not None and _task is not asyncio.current_task():
+                _task.cancel()
+        if self.ws is not None and not self.ws.closed:
+            await self.ws.close()
+
+    def __repr__(self) -> str:
+        return f"<Channel {self.name} connected={self.connected} outstanding={self.outstanding}>"
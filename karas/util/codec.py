@@ -0,0 +1,93 @@
+"""
+websocket帧与http响应使用的json编解码器
+loads统一接受str或bytes, 对于bytes会直接解码而不先构造中间的str
+"""
+import json
+from typing import Any, Dict, Type, Union
+
+
+class JsonCodec:
+    """基于标准库json的编解码器"""
+    name: str = "json"
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name: str = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+
+    def dumps(self, obj: Any) -> str:
+        return self._dumps(obj).decode()
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    name: str = "ujson"
+
+    def __init__(self) -> None:
+        import ujson
+        self._dumps = ujson.dumps
+        self._loads = ujson.loads
+
+    def dumps(self, obj: Any) -> str:
+        return self._dumps(obj, ensure_ascii=False)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    name: str = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> str:
+        return self._encoder.encode(obj).decode()
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._decoder.decode(data)
+
+
+codecs: Dict[str, Type[JsonCodec]] = {
+    "json": JsonCodec,
+    "stdlib": JsonCodec,
+    "orjson": OrjsonCodec,
+    "ujson": UjsonCodec,
+    "msgspec": MsgspecCodec,
+}
+
+
+def get_codec(codec: Union[str, JsonCodec, None] = None) -> JsonCodec:
+    """根据名称获取编解码器
+
+    Args:
+        codec (Union[str, JsonCodec, None]): 编解码器名称(json, orjson, ujson, msgspec)或者编解码器对象,
+            为None时使用标准库json
+
+    Raises:
+        ValueError: 未知的编解码器名称
+        ImportError: 对应的第三方库没有安装
+    """
+    if isinstance(codec, JsonCodec):
+        return codec
+    _codec = codecs.get((codec or "json").lower())
+    if _codec is None:
+        raise ValueError(f"unknown json codec {codec}, choose from {', '.join(codecs)}")
+    try:
+        return _codec()
+    except ImportError as exc:
+        raise ImportError(f"json codec {codec} requires `pip install {_codec.name}`") from exc
@@ -0,0 +1,171 @@
+import inspect
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from karas.util.Listener import _FIELD, _INSTANCE, _MISSING, _field_names
+
+# 字典树中标记命令结尾的键, 不会与任何字符冲突
+_END = ""
+# 按顺序从命令参数中取值的参数注解
+ARGUMENT_TYPES = (str, int, float)
+# 参数的取值方式, 其余与Listener相同
+_COMMAND = 2
+_ARGUMENT = 3
+
+
+class Command:
+    """
+    Command:
+        消息命中的命令, 命令监听函数中注解为Command的参数会传入该对象
+
+        name: 注册时的命令名
+        trigger: 消息中实际使用的命令(包括前缀, 可能是别名)
+        text: 命令之后的文本
+        args: text按空白分割后的参数
+    """
+    __slots__ = ("name", "trigger", "text", "args")
+
+    def __init__(self, name: str, trigger: str, text: str) -> None:
+        self.name = name
+        self.trigger = trigger
+        self.text = text
+        self.args = tuple(text.split())
+
+    def __repr__(self) -> str:
+        return f"<Command {self.trigger} args={self.args}>"
+
+
+class CommandHandler:
+    """
+    CommandHandler:
+        注册的命令与处理它的函数, 函数的参数在注册时按消息类型解析为字段名, 与Listener相同
+
+        消息类型未知时, 在分发时按字段值的类型查找参数
+    """
+    __slots__ = ("name", "func", "isCoroutine", "params", "_binds")
+
+    def __init__(self, name: str, func: Callable, type_: Optional[str] = None) -> None:
+        self.name = name
+        self.func = func
+        self.isCoroutine = inspect.iscoroutinefunction(func)
+        # (参数名, 注解, 默认值), 没有默认值时为inspect.Parameter.empty
+        self.params: List[Tuple[str, Any, Any]] = [
+            (_name, _param.annotation, _param.default)
+            for _name, _param in inspect.signature(func).parameters.items()
+        ]
+        self._binds = self._compile(_field_names(type_))
+
+    def _compile(self, names: Optional[Dict[Any, str]]) -> Optional[List[Tuple[str, int, Any, Any]]]:
+        """(参数名, 取值方式, 字段名或者类, 默认值)"""
+        if names is None:
+            return None
+        _binds = []
+        for _name, _type, _default in self.params:
+            if _type is Command:
+                _binds.append((_name, _COMMAND, None, _default))
+            elif _type in ARGUMENT_TYPES:
+                _binds.append((_name, _ARGUMENT, _type, _default))
+            elif _type in names:
+                _binds.append((_name, _FIELD, names[_type], _default))
+            elif inspect.isclass(_type):
+                _binds.append((_name, _INSTANCE, _type, _default))
+        return _binds
+
+    def bind(self, command: "Command", message: Any, bot: Any = None) -> Optional[Dict[str, Any]]:
+        """
+        按注解取得处理函数的参数: Command为命中的命令, str, int与float按顺序从命令参数中取值并转换,
+        其余与监听函数相同. 参数不足或者无法转换时返回None
+        """
+        _binds = self._binds
+        if _binds is None:
+            _binds = self._compile({_t: _k for _k, _t in message._field_types()})
+        _args = command.args
+        _next = 0
+        _o = {}
+        for _name, _kind, _arg, _default in _binds:
+            if _kind is _FIELD:
+                _v = getattr(message, _arg, _MISSING)
+                if _v is not _MISSING:
+                    _o[_name] = _v
+            elif _kind is _ARGUMENT:
+                if _next < len(_args):
+                    try:
+                        _o[_name] = _arg(_args[_next])
+                    except ValueError:
+                        return None
+                    _next += 1
+                elif _default is inspect.Parameter.empty:
+                    return None
+            elif _kind is _COMMAND:
+                _o[_name] = command
+            elif bot is not None and isinstance(bot, _arg):
+                _o[_name] = bot
+        return _o
+
+
+class CommandRouter:
+    """
+    CommandRouter:
+        由命令名与别名建立的字典树, 从消息文本的开头匹配最长的命令, 命令之后必须是空白或者文本的结尾
+
+        匹配的耗时只与命令的长度有关, 与注册的命令数量无关, 文本的第一个字符不是任何命令的开头时立即返回
+    """
+
+    def __init__(self, type_: Optional[str] = None) -> None:
+        """
+        Args:
+            type_ (Optional[str]): 该路由所属的消息类型, 用于在注册时解析处理函数的参数
+        """
+        self.type = type_
+        self._root: Dict[str, Dict] = {}
+        # 触发词 -> 处理函数
+        self.triggers: Dict[str, CommandHandler] = {}
+
+    def add(self, name: str, func: Callable, aliases: Iterable[str] = (), prefix: str = "") -> CommandHandler:
+        """注册一个命令
+
+        Args:
+            name (str): 命令名
+            func (Callable): 处理该命令的函数
+            aliases (Iterable[str]): 命令的别名
+            prefix (str): 命令名与别名共同的前缀, 例如/
+
+        Raises:
+            ValueError: 命令为空, 包含空白或者已经被注册
+        """
+        _handler = CommandHandler(name, func, self.type)
+        _triggers = [f"{prefix}{_name}" for _name in (name, *aliases)]
+        for _trigger in _triggers:
+            if not _trigger or any(_char.isspace() for _char in _trigger):
+                raise ValueError(f"invalid command {_trigger!r}")
+            if _trigger in self.triggers:
+                raise ValueError(f"command {_trigger!r} is already registered by {self.triggers[_trigger].func.__name__}")
+        for _trigger in _triggers:
+            _node = self._root
+            for _char in _trigger:
+                _node = _node.setdefault(_char, {})
+            _node[_END] = _handler
+            self.triggers[_trigger] = _handler
+        return _handler
+
+    def match(self, text: str) -> Optional[Tuple[CommandHandler, Command]]:
+        """找到text开头的命令
+
+        Returns:
+            Optional[Tuple[CommandHandler, Command]]: 处理函数与命中的命令, 没有命中时为None
+        """
+        _node = self._root
+        _found = None
+        _length = len(text)
+        for _i, _char in enumerate(text):
+            _node = _node.get(_char)
+            if _node is None:
+                break
+            _handler = _node.get(_END)
+            if _handler is not None and (_i + 1 == _length or text[_i + 1].isspace()):
+                _found = _handler, _i + 1
+        if _found is None:
+            return None
+        _handler, _end = _found
+        return _handler, Command(_handler.name, text[:_end], text[_end:].strip())
+
+    def __len__(self) -> int:
+        return len(self.triggers)
@@ -0,0 +1,160 @@
+import asyncio
+from itertools import count
+from time import time
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from karas.util.metrics import LatencyHistogram, merge_snapshots
+
+
+class SyncCorrelator:
+    """
+    SyncCorrelator:
+        根据syncId将服务端的响应交给正在等待的调用者
+
+        调用者需要在发送命令之前通过allocate分配syncId并register登记, 读取websocket的任务收到响应后调用resolve,
+        没有人等待的响应(例如固定syncId的accept/reject)会被直接丢弃
+
+        syncId由连接纪元和单调递增的计数器组成, 同一连接内不会重复, 重新连接后调用renew开始新的纪元
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop = None) -> None:
+        self._loop = loop
+        # syncId -> (future, command, 登记时间, 发送的帧)
+        self._pending: Dict[str, Tuple[asyncio.Future, str, float, Optional[Dict]]] = {}
+        self._prefix = ""
+        self._counter = count()
+        self.dropped = 0
+        self.timeouts = 0
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.renew()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop or asyncio.get_event_loop()
+
+    def renew(self) -> None:
+        """开始一个新的连接纪元"""
+        self._prefix = f"{int(time() * 1000):x}."
+        self._counter = count()
+
+    def allocate(self) -> str:
+        """分配一个当前连接内唯一的syncId"""
+        return self._prefix + str(next(self._counter))
+
+    def register(self, syncId: str, command: str = "", frame: Optional[Dict] = None) -> asyncio.Future:
+        """登记一个等待响应的syncId
+
+        Args:
+            syncId (str): 本次命令使用的syncId
+            command (str): 命令字, 用于统计耗时
+            frame (Optional[Dict]): 发送的帧, 断线重连时用于重发
+
+        Returns:
+            asyncio.Future: 收到响应后会被设置结果的Future
+        """
+        _loop = self.loop
+        _future = _loop.create_future()
+        self._pending[syncId] = (_future, command, _loop.time(), frame)
+        return _future
+
+    def resolve(self, syncId: str, data: Dict) -> bool:
+        """将响应交给等待该syncId的调用者
+
+        Returns:
+            bool: 是否有调用者在等待该响应
+        """
+        _entry = self._pending.pop(syncId, None)
+        if _entry is None:
+            self.dropped += 1
+            return False
+        _future, _command, _start, _ = _entry
+        _histogram = self.latency.get(_command)
+        if _histogram is None:
+            _histogram = self.latency[_command] = LatencyHistogram()
+        _histogram.record(self.loop.time() - _start)
+        if not _future.done():
+            _future.set_result(data)
+        return True
+
+    def discard(self, syncId: str) -> Optional[asyncio.Future]:
+        """放弃等待syncId, 之后到达的响应会被丢弃"""
+        _entry = self._pending.pop(syncId, None)
+        return _entry and _entry[0]
+
+    def expire(self, syncId: str) -> None:
+        """等待syncId超时, 清除登记并计数"""
+        if self._pending.pop(syncId, None) is not None:
+            self.timeouts += 1
+
+    def fail(self, syncId: str, exc: BaseException) -> None:
+        """让等待syncId的调用者抛出exc"""
+        _entry = self._pending.pop(syncId, None)
+        if _entry is not None and not _entry[0].done():
+            _entry[0].set_exception(exc)
+
+    def fail_all(self, exc: BaseException) -> None:
+        """让所有等待中的调用者抛出exc"""
+        _pending, self._pending = self._pending, {}
+        for _future, _, _, _ in _pending.values():
+            if not _future.done():
+                _future.set_exception(exc)
+
+    def entries(self) -> Iterator[Tuple[str, str, Optional[Dict]]]:
+        """按登记顺序给出所有等待中的(syncId, command, frame)"""
+        return ((syncId, _command, _frame) for syncId, (_, _command, _, _frame) in list(self._pending.items()))
+
+    @property
+    def inflight(self) -> int:
+        """等待响应中的命令数量"""
+        return len(self._pending)
+
+    @property
+    def oldest(self) -> float:
+        """最早发出且仍未收到响应的命令已等待的秒数"""
+        # dict保持插入顺序, 第一个即是最早登记的
+        for _, _, _start, _ in self._pending.values():
+            return self.loop.time() - _start
+        return 0.
+
+    def stats(self) -> Dict:
+        """以字典形式返回当前的统计数据"""
+        _by_command = {}
+        for _, _command, _, _ in self._pending.values():
+            _by_command[_command] = _by_command.get(_command, 0) + 1
+        return {
+            "inflight": self.inflight,
+            "inflightByCommand": _by_command,
+            "oldest": self.oldest,
+            "dropped": self.dropped,
+            "timeouts": self.timeouts,
+            "latency": {_command: _h.snapshot() for _command, _h in self.latency.items()}
+        }
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, syncId: str) -> bool:
+        return syncId in self._pending
+
+
+def merge_stats(stats: Iterable[Dict]) -> Dict:
+    """合并多个SyncCorrelator.stats()的结果, 用于同一个bot的多条连接"""
+    _merged = {
+        "inflight": 0,
+        "inflightByCommand": {},
+        "oldest": 0.,
+        "dropped": 0,
+        "timeouts": 0,
+        "latency": {}
+    }
+    _latency: Dict[str, list] = {}
+    for _stats in stats:
+        for _key in ("inflight", "dropped", "timeouts"):
+            _merged[_key] += _stats[_key]
+        _merged["oldest"] = max(_merged["oldest"], _stats["oldest"])
+        for _command, _count in _stats["inflightByCommand"].items():
+            _merged["inflightByCommand"][_command] = _merged["inflightByCommand"].get(_command, 0) + _count
+        for _command, _snapshot in _stats["latency"].items():
+            _latency.setdefault(_command, []).append(_snapshot)
+    _merged["latency"] = {_command: merge_snapshots(_snapshots) for _command, _snapshots in _latency.items()}
+    return _merged
@@ -0,0 +1,210 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+POLICIES = ("block", "drop-oldest", "drop-by-type", "priority")
+
+
+class EventQueue:
+    """
+    EventQueue:
+        websocket读取与事件分发之间的有界队列, 队列满时按照policy处理新到的事件:
+
+            block: 等待队列有空位, 读取会暂停, 由tcp把压力传回服务端
+            drop-oldest: 丢弃最早的事件
+            drop-by-type: 新事件属于dropTypes时直接丢弃, 否则丢弃最早的dropTypes事件, 没有可丢弃的事件时等待
+            priority: 按priorities从高到低分发, 队列满时丢弃优先级最低的事件中最早的一个, 新事件优先级更低时丢弃新事件
+
+        keepTypes中的事件在任何policy下都不会被丢弃, 没有其他事件可以丢弃时超出maxsize放入队列(block时仍然等待)
+    """
+
+    def __init__(
+            self,
+            maxsize: int = 10000,
+            policy: str = "drop-oldest",
+            dropTypes: Iterable[str] = (),
+            priorities: Optional[Dict[str, int]] = None,
+            keepTypes: Iterable[str] = (),
+            loop: asyncio.AbstractEventLoop = None
+    ) -> None:
+        """
+        Args:
+            maxsize (int): 队列最多容纳的事件数量
+            policy (str): 队列满时的处理方式, block, drop-oldest, drop-by-type或priority
+            dropTypes (Iterable[str]): drop-by-type时允许丢弃的事件类型, 例如GroupMessage
+            priorities (Optional[Dict[str, int]]): priority时各事件类型的优先级, 数值越大越先分发, 未给出的为0
+            keepTypes (Iterable[str]): 不能丢弃的事件类型, 例如bot上下线与好友申请
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"unknown event queue policy {policy}, choose from {', '.join(POLICIES)}")
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.dropTypes = frozenset(dropTypes)
+        self.priorities = dict(priorities or {})
+        self.keepTypes = frozenset(keepTypes)
+        self._loop = loop
+        # 分组 -> (序号, 事件类型, 事件), 分组由policy决定, 同一分组内按到达顺序排列
+        self._buckets: Dict[int, Deque[Tuple[int, str, Any]]] = {}
+        self._size = 0
+        self._seq = 0
+        self._getters: Deque[asyncio.Future] = deque()
+        self._putters: Deque[asyncio.Future] = deque()
+        self.maxQueued = 0
+        self.enqueued = 0
+        self.blocked = 0
+        self.dropped = 0
+        self.droppedByType: Dict[str, int] = {}
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop or asyncio.get_event_loop()
+
+    def _key(self, type_: str) -> int:
+        if self.policy == "priority":
+            return self.priorities.get(type_, 0)
+        if self.policy == "drop-by-type":
+            # 可丢弃的事件单独放在0组, 便于找到其中最早的一个
+            return int(type_ not in self.dropTypes or type_ in self.keepTypes)
+        return 0
+
+    def _drop(self, type_: str) -> None:
+        self.dropped += 1
+        self.droppedByType[type_] = self.droppedByType.get(type_, 0) + 1
+
+    def _evictable(self, key: int) -> Optional[int]:
+        """分组中最早的可以丢弃的事件的位置, 没有时为None"""
+        for _index, (_, _type, _) in enumerate(self._buckets[key]):
+            if _type not in self.keepTypes:
+                return _index
+        return None
+
+    def _evict(self, key: int) -> bool:
+        """丢弃分组中最早的可以丢弃的事件"""
+        _index = self._evictable(key)
+        if _index is None:
+            return False
+        _bucket = self._buckets[key]
+        _, _type, _ = _bucket[_index]
+        del _bucket[_index]
+        self._size -= 1
+        self._drop(_type)
+        return True
+
+    def _oldest(self) -> int:
+        return min((_bucket[0][0], _key) for _key, _bucket in self._buckets.items() if _bucket)[1]
+
+    def _oldest_evictable(self) -> Optional[int]:
+        _oldest = None
+        for _key, _bucket in self._buckets.items():
+            _index = self._evictable(_key) if _bucket else None
+            if _index is not None and (_oldest is None or _bucket[_index][0] < _oldest[0]):
+                _oldest = _bucket[_index][0], _key
+        return _oldest and _oldest[1]
+
+    def _lowest_evictable(self) -> Optional[int]:
+        return min((_key for _key, _bucket in self._buckets.items()
+                    if _bucket and self._evictable(_key) is not None), default=None)
+
+    def _make_room(self, type_: str) -> Optional[bool]:
+        """队列已满时按照policy腾出空位
+
+        Returns:
+            Optional[bool]: True表示可以放入新事件, False表示应当丢弃新事件, None表示需要等待
+        """
+        _keep = type_ in self.keepTypes
+        if self.policy == "drop-oldest":
+            _oldest = self._oldest_evictable()
+            if _oldest is not None:
+                return self._evict(_oldest)
+            return _keep
+        if self.policy == "drop-by-type":
+            if type_ in self.dropTypes and not _keep:
+                return False
+            # 0组只有可以丢弃的事件
+            if self._buckets.get(0):
+                return self._evict(0)
+            return True if _keep else None
+        if self.policy == "priority":
+            _lowest = self._lowest_evictable()
+            if _lowest is None:
+                return _keep
+            if not _keep and self._key(type_) < _lowest:
+                return False
+            return self._evict(_lowest)
+        return None
+
+    async def put(self, item: Any, type_: str) -> bool:
+        """放入一个事件
+
+        Args:
+            item (Any): 事件
+            type_ (str): 事件类型
+
+        Returns:
+            bool: 事件是否进入了队列, 被丢弃时为False
+        """
+        if self._size >= self.maxsize:
+            _room = self._make_room(type_)
+            if _room is False:
+                self._drop(type_)
+                return False
+            if _room is None:
+                self.blocked += 1
+                while self._size >= self.maxsize:
+                    _putter = self.loop.create_future()
+                    self._putters.append(_putter)
+                    try:
+                        await _putter
+                    finally:
+                        _putter.cancel()
+        _key = self._key(type_)
+        _bucket = self._buckets.get(_key)
+        if _bucket is None:
+            _bucket = self._buckets[_key] = deque()
+        _bucket.append((self._seq, type_, item))
+        self._seq += 1
+        self._size += 1
+        self.enqueued += 1
+        if self._size > self.maxQueued:
+            self.maxQueued = self._size
+        self._wakeup(self._getters)
+        return True
+
+    async def get(self) -> Any:
+        """取出下一个要分发的事件, 队列为空时等待"""
+        while not self._size:
+            _getter = self.loop.create_future()
+            self._getters.append(_getter)
+            try:
+                await _getter
+            finally:
+                _getter.cancel()
+        _key = max(_key for _key, _bucket in self._buckets.items() if _bucket) \
+            if self.policy == "priority" else self._oldest()
+        _, _, _item = self._buckets[_key].popleft()
+        self._size -= 1
+        self._wakeup(self._putters)
+        return _item
+
+    @staticmethod
+    def _wakeup(waiters: Deque[asyncio.Future]) -> None:
+        while waiters:
+            _waiter = waiters.popleft()
+            if not _waiter.done():
+                _waiter.set_result(None)
+                break
+
+    def stats(self) -> Dict:
+        """以字典形式返回当前的统计数据"""
+        return {
+            "policy": self.policy,
+            "queued": self._size,
+            "maxQueued": self.maxQueued,
+            "enqueued": self.enqueued,
+            "blocked": self.blocked,
+            "dropped": self.dropped,
+            "droppedByType": dict(self.droppedByType)
+        }
+
+    def __len__(self) -> int:
+        return self._size
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Awaitable, Callable
+
+
+class Heartbeat:
+    """
+    Heartbeat:
+        只在连接空闲超过interval秒时才发送ping, 有数据往来时不会产生任何额外的帧
+        ping发出后pongTimeout秒内没有收到任何数据(包括pong)则认为对端已经失联, 调用onTimeout
+    """
+
+    def __init__(
+            self,
+            ping: Callable[[], Awaitable],
+            onTimeout: Callable[[], Awaitable],
+            interval: float = 30.,
+            pongTimeout: float = 10.,
+            loop: asyncio.AbstractEventLoop = None
+    ) -> None:
+        """
+        Args:
+            ping: 发送一次ping的协程函数
+            onTimeout: 对端失联时调用的协程函数
+            interval (float): 空闲多少秒后发送ping
+            pongTimeout (float): 等待pong的秒数
+        """
+        self._ping = ping
+        self._onTimeout = onTimeout
+        self.interval = interval
+        self.pongTimeout = pongTimeout
+        self._loop = loop or asyncio.get_event_loop()
+        self._last = self._loop.time()
+        self.pings = 0
+        self.timeouts = 0
+
+    def feed(self) -> None:
+        """收到任意数据时调用, 标记连接仍然存活"""
+        self._last = self._loop.time()
+
+    @property
+    def idle(self) -> float:
+        """距离上一次收到数据的秒数"""
+        return self._loop.time() - self._last
+
+    async def run(self) -> None:
+        while True:
+            _idle = self.idle
+            if _idle < self.interval:
+                await asyncio.sleep(self.interval - _idle)
+                continue
+            _sent = self._loop.time()
+            if not await self._try_ping():
+                # 连接不可用, 交给重连处理
+                await asyncio.sleep(self.interval)
+                continue
+            self.pings += 1
+            await asyncio.sleep(self.pongTimeout)
+            if self._last < _sent:
+                self.timeouts += 1
+                await self._onTimeout()
+                self.feed()
+
+    async def _try_ping(self) -> bool:
+        try:
+            await self._ping()
+        except (ConnectionResetError, RuntimeError):
+            return False
+        return True
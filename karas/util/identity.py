@@ -0,0 +1,139 @@
+from contextvars import ContextVar
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from karas.event import EventBase
+    from karas.sender import Friend, Group, Member, ReceptorBase
+
+# 正在使用的IdentityMap, 转换Group, Member与Friend字段时从这里取得已有的对象
+IDENTITY_MAP: ContextVar[Optional["IdentityMap"]] = ContextVar("IDENTITY_MAP", default=None)
+
+
+def _permission(event: "EventBase") -> Any:
+    # 权限变更事件的current是权限类
+    return event.current() if isinstance(event.current, type) else event.current
+
+
+# 事件类型 -> (对象所在的字段, 要修改的属性, 从事件取得新值的函数)
+_UPDATES: Dict[str, Tuple[str, str, Callable[["EventBase"], Any]]] = {
+    "MemberCardChangeEvent": ("member", "memberName", attrgetter("current")),
+    "MemberSpecialTitleChangeEvent": ("member", "specialTitle", attrgetter("current")),
+    "MemberPermissionChangeEvent": ("member", "permission", _permission),
+    "MemberMuteEvent": ("member", "muteTimeRemaining", attrgetter("durationSeconds")),
+    "MemberUnmuteEvent": ("member", "muteTimeRemaining", lambda event: 0),
+    "GroupNameChangeEvent": ("group", "name", attrgetter("current")),
+    "BotGroupPermissionChangeEvent": ("group", "permission", _permission),
+    "FriendNickChangedEvent": ("friend", "nickname", attrgetter("to")),
+}
+# 之后不会再收到的对象, 从IdentityMap中移除
+_MEMBER_LEAVES = frozenset(("MemberLeaveEventKick", "MemberLeaveEventQuit"))
+_GROUP_LEAVES = frozenset(("BotLeaveEventActive", "BotLeaveEventKick", "BotLeaveEventDisband"))
+
+# 即使没有监听函数也需要处理的事件
+IDENTITY_EVENTS = frozenset((*_UPDATES, *_MEMBER_LEAVES, *_GROUP_LEAVES))
+
+
+def _member_key(data: Dict) -> Optional[Tuple[int, int]]:
+    _group = data.get("group")
+    if not isinstance(_group, dict) or "id" not in _group or "id" not in data:
+        return None
+    return _group["id"], data["id"]
+
+
+class IdentityMap:
+    """
+    IdentityMap:
+        按id复用Group, Member与Friend对象, 同一个群的同一个成员在每条消息中都是同一个Member对象,
+        监听函数可以在对象上保存状态
+
+        再次收到时用新数据更新已有的对象, 群名片, 群名等变更事件也会直接修改对象,
+        成员退群或者bot退群后移除对应的对象
+    """
+
+    def __init__(self) -> None:
+        self.groups: Dict[int, "Group"] = {}
+        # (群号, 成员QQ号) -> Member
+        self.members: Dict[Tuple[int, int], "Member"] = {}
+        self.friends: Dict[int, "Friend"] = {}
+        self._tables = {"Group": self.groups, "Member": self.members, "Friend": self.friends}
+        self.hits = 0
+        self.misses = 0
+
+    def group(self, id: int) -> Optional["Group"]:
+        return self.groups.get(id)
+
+    def member(self, groupId: int, id: int) -> Optional["Member"]:
+        return self.members.get((groupId, id))
+
+    def friend(self, id: int) -> Optional["Friend"]:
+        return self.friends.get(id)
+
+    def intern(self, type_: type, data: Dict) -> "ReceptorBase":
+        """返回data对应的已有对象并用data更新它, 没有时创建并保存
+
+        Args:
+            type_ (type): Group, Member或Friend
+            data (Dict): 收到的原始数据
+        """
+        if IDENTITY_MAP.get() is self:
+            return self._intern(type_, data)
+        # Member中的group同样需要复用
+        _token = IDENTITY_MAP.set(self)
+        try:
+            return self._intern(type_, data)
+        finally:
+            IDENTITY_MAP.reset(_token)
+
+    def _intern(self, type_: type, data: Dict) -> "ReceptorBase":
+        """intern, IDENTITY_MAP已经是该对象时使用"""
+        _table = self._tables.get(type_.type)
+        _key = _member_key(data) if _table is self.members else data.get("id")
+        if _table is None or _key is None:
+            return type_(**data)
+        _object = _table.get(_key)
+        if _object is None:
+            self.misses += 1
+            _object = _table[_key] = type_(**data)
+        else:
+            self.hits += 1
+            _object._update(data)
+        return _object
+
+    def forget_group(self, id: int) -> None:
+        """移除群以及该群的所有成员"""
+        self.groups.pop(id, None)
+        for _key in [_key for _key in self.members if _key[0] == id]:
+            del self.members[_key]
+
+    def apply(self, event: "EventBase") -> None:
+        """按变更事件修改已有的对象, 需要在IDENTITY_MAP为该对象时调用"""
+        _type = event.type
+        _update = _UPDATES.get(_type)
+        if _update is not None:
+            _field, _attribute, _value = _update
+            _object = getattr(event, _field, None)
+            if _object is not None:
+                setattr(_object, _attribute, _value(event))
+        elif _type in _MEMBER_LEAVES:
+            _member = event.member
+            self.members.pop((_member.group.id, _member.id), None)
+        elif _type in _GROUP_LEAVES:
+            self.forget_group(event.group.id)
+
+    def clear(self) -> None:
+        for _table in self._tables.values():
+            _table.clear()
+
+    def stats(self) -> Dict:
+        """以字典形式返回当前的统计数据"""
+        return {
+            "groups": len(self.groups),
+            "members": len(self.members),
+            "friends": len(self.friends),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def __len__(self) -> int:
+        return len(self.groups) + len(self.members) + len(self.friends)
@@ -0,0 +1,209 @@
+"""
+关键词规则
+
+KeywordMatcher将所有关键词编译成一个Aho-Corasick自动机, 对文本扫描一遍即可得到所有命中的关键词,
+耗时与关键词的数量无关. KeywordRules从规则文件加载关键词, 文件修改后自动重新加载
+
+规则文件为utf-8文本, 每行一条规则, 关键词与值之间用tab分隔, 值可以省略, 空行与#开头的行会被忽略:
+
+    # 违禁词
+    违禁词
+    广告\tban
+    早安\t早上好!
+"""
+import os
+from time import monotonic
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+
+class KeywordMatch(NamedTuple):
+    keyword: str
+    value: Any
+    # 在文本(ignoreCase时为小写后的文本)中的位置
+    start: int
+    end: int
+
+
+class KeywordMatches(List[KeywordMatch]):
+    """
+    KeywordMatches:
+        一段文本命中的所有关键词, 按结束位置排列
+
+        作为listen的filter时, 监听函数中注解为KeywordMatches的参数会传入该对象
+    """
+
+    @property
+    def keywords(self) -> List[str]:
+        """命中的关键词, 去除重复并保持顺序"""
+        return list(dict.fromkeys(_match.keyword for _match in self))
+
+    @property
+    def values(self) -> List[Any]:
+        """命中的关键词的值, 去除重复并保持顺序"""
+        return list(dict.fromkeys(_match.value for _match in self))
+
+
+def _message_text(message: Any) -> str:
+    _chain = getattr(message, "messageChain", None)
+    return _chain and _chain.to_text() or ""
+
+
+class KeywordMatcher:
+    """
+    KeywordMatcher:
+        由关键词编译成的Aho-Corasick自动机, find_all对文本扫描一遍找出所有命中的关键词(包括重叠的)
+
+        对象可以直接作为listen的filter, 消息的文本(to_text)命中任一关键词时才调用监听函数
+    """
+
+    def __init__(self, keywords: Union[Iterable[str], Dict[str, Any]], ignoreCase: bool = True) -> None:
+        """
+        Args:
+            keywords (Union[Iterable[str], Dict[str, Any]]): 关键词, 或者关键词 -> 值, 例如自动回复的内容
+            ignoreCase (bool): 是否忽略大小写
+        """
+        self.ignoreCase = ignoreCase
+        # 每个状态的转移, 失败时跳转的状态, 以及到达该状态时命中的(关键词, 值, 长度)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[Tuple[str, Any, int], ...]] = [()]
+        _keywords = keywords if isinstance(keywords, dict) else dict.fromkeys(keywords)
+        for _keyword, _value in _keywords.items():
+            if _keyword:
+                self._add(_keyword, _value)
+        self._build()
+        self.size = sum(1 for _keyword in _keywords if _keyword)
+
+    def _add(self, keyword: str, value: Any) -> None:
+        _key = keyword.lower() if self.ignoreCase else keyword
+        _state = 0
+        for _char in _key:
+            _next = self._goto[_state].get(_char)
+            if _next is None:
+                _next = len(self._goto)
+                self._goto[_state][_char] = _next
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            _state = _next
+        self._out[_state] += ((keyword, value, len(_key)),)
+
+    def _build(self) -> None:
+        """按广度优先计算失败跳转, 并把失败状态命中的关键词合并到当前状态"""
+        _goto, _fail, _out = self._goto, self._fail, self._out
+        _queue = list(_goto[0].values())
+        for _state in _queue:
+            for _char, _next in _goto[_state].items():
+                _queue.append(_next)
+                _f = _fail[_state]
+                while _f and _char not in _goto[_f]:
+                    _f = _fail[_f]
+                _fail[_next] = _goto[_f].get(_char, 0)
+                _out[_next] += _out[_fail[_next]]
+
+    def find_all(self, text: str) -> KeywordMatches:
+        """找出text中所有命中的关键词"""
+        _matches = KeywordMatches()
+        if not text:
+            return _matches
+        if self.ignoreCase:
+            text = text.lower()
+        _goto, _fail, _out = self._goto, self._fail, self._out
+        _state = 0
+        for _i, _char in enumerate(text):
+            while _state and _char not in _goto[_state]:
+                _state = _fail[_state]
+            _state = _goto[_state].get(_char, 0)
+            if _out[_state]:
+                for _keyword, _value, _length in _out[_state]:
+                    _matches.append(KeywordMatch(_keyword, _value, _i + 1 - _length, _i + 1))
+        return _matches
+
+    def __call__(self, message: Any) -> KeywordMatches:
+        """作为listen的filter, 返回消息文本命中的关键词"""
+        return self.find_all(_message_text(message))
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def read_rules(path: str) -> Dict[str, Optional[str]]:
+    """读取规则文件, 返回关键词 -> 值, 同一个关键词出现多次时使用最后一条"""
+    _rules: Dict[str, Optional[str]] = {}
+    with open(path, encoding="utf-8") as _file:
+        for _line in _file:
+            _line = _line.rstrip("\r\n")
+            if not _line.strip() or _line.startswith("#"):
+                continue
+            _keyword, _, _value = _line.partition("\t")
+            _keyword = _keyword.strip()
+            if _keyword:
+                _rules[_keyword] = _value if _ else None
+    return _rules
+
+
+class KeywordRules:
+    """
+    KeywordRules:
+        从规则文件加载的关键词规则, 每隔reloadInterval秒检查一次文件的修改时间, 文件被修改后重新编译
+
+        重新加载失败(例如文件被删除)时继续使用之前的规则, 错误保存在lastError中
+    """
+
+    def __init__(self, path: str, ignoreCase: bool = True, reloadInterval: Optional[float] = 5.) -> None:
+        """
+        Args:
+            path (str): 规则文件的路径
+            ignoreCase (bool): 是否忽略大小写
+            reloadInterval (Optional[float]): 检查文件是否被修改的间隔秒数, 为None时只在调用reload时重新加载
+        """
+        self.path = path
+        self.ignoreCase = ignoreCase
+        self.reloadInterval = reloadInterval
+        self.lastError: Optional[Exception] = None
+        self.reloads = 0
+        self._mtime = os.stat(path).st_mtime_ns
+        self._matcher = KeywordMatcher(read_rules(path), ignoreCase=ignoreCase)
+        self._checked = monotonic()
+
+    @property
+    def matcher(self) -> KeywordMatcher:
+        """当前使用的自动机, 到了检查时间时先检查文件是否被修改"""
+        if self.reloadInterval is not None and monotonic() - self._checked >= self.reloadInterval:
+            self.reload()
+        return self._matcher
+
+    def reload(self, force: bool = False) -> bool:
+        """文件被修改时重新加载
+
+        Args:
+            force (bool): 不检查修改时间, 总是重新加载
+
+        Returns:
+            bool: 是否重新加载了规则
+        """
+        self._checked = monotonic()
+        try:
+            _mtime = os.stat(self.path).st_mtime_ns
+            if not force and _mtime == self._mtime:
+                return False
+            # 先编译新的规则再替换, 替换前正在匹配的消息继续使用旧的规则
+            self._matcher = KeywordMatcher(read_rules(self.path), ignoreCase=self.ignoreCase)
+            self._mtime = _mtime
+        except (OSError, UnicodeDecodeError) as exc:
+            self.lastError = exc
+            return False
+        self.lastError = None
+        self.reloads += 1
+        return True
+
+    def find_all(self, text: str) -> KeywordMatches:
+        """找出text中所有命中的关键词"""
+        return self.matcher.find_all(text)
+
+    def __call__(self, message: Any) -> KeywordMatches:
+        """作为listen的filter, 返回消息文本命中的关键词"""
+        return self.matcher.find_all(_message_text(message))
+
+    def __len__(self) -> int:
+        return len(self._matcher)
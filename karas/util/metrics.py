@@ -0,0 +1,54 @@
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence
+
+# 单位为秒, 最后一个桶收纳所有超过上限的值
+DEFAULT_BUCKETS = (.001, .002, .005, .01, .02, .05, .1, .2, .5, 1., 2., 5., 10.)
+
+
+class LatencyHistogram:
+    """
+    LatencyHistogram:
+        固定桶的耗时直方图, 记录一次的开销只有一次二分查找
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.
+        self.max = 0.
+
+    def record(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.count and self.total / self.count
+
+    def snapshot(self) -> Dict:
+        """以字典形式返回当前的统计数据, 桶的键为其上限(秒)"""
+        _labels = [str(_b) for _b in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "max": self.max,
+            "buckets": dict(zip(_labels, self.counts))
+        }
+
+
+def merge_snapshots(snapshots: Iterable[Dict]) -> Dict:
+    """合并多个使用相同桶的LatencyHistogram.snapshot()"""
+    _merged = {"count": 0, "mean": 0., "max": 0., "buckets": {}}
+    _total = 0.
+    for _snapshot in snapshots:
+        _merged["count"] += _snapshot["count"]
+        _total += _snapshot["mean"] * _snapshot["count"]
+        _merged["max"] = max(_merged["max"], _snapshot["max"])
+        for _label, _count in _snapshot["buckets"].items():
+            _merged["buckets"][_label] = _merged["buckets"].get(_label, 0) + _count
+    _merged["mean"] = _merged["count"] and _total / _merged["count"]
+    return _merged
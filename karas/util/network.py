@@ -1,7 +1,8 @@
 import asyncio
 import inspect
+import json
 import traceback
-from typing import Optional, Union
+from typing import Any, Callable, Optional, Union
 import aiohttp
 from aiohttp.web_exceptions import HTTPRequestTimeout
 from functools import wraps
@@ -9,7 +10,15 @@ from karas.sender import ReceptorBase
 from karas.exceptions import BotBaseException, ConnectException, FunctionException
 
 
-def error_throw(func):
+def error_throw(func: Callable = None, retryConnect: bool = False):
+    """
+    Args:
+        retryConnect (bool): 遇到ConnectException时按reconnectPolicy重新调用, 只用于建立连接,
+            命令的ConnectException直接抛出, 重新调用可能导致命令被重复执行
+    """
+    if func is None:
+        return lambda _func: error_throw(_func, retryConnect=retryConnect)
+
     @wraps(func)
     async def _wrapper(obj, *args, **kwargs):
         try:
@@ -18,16 +27,20 @@ def error_throw(func):
             else:
                 return func(obj, *args, **kwargs)
         except ConnectException as ce:
+            if not retryConnect:
+                obj.logging.error(traceback.format_exc())
+                raise
             obj.logging.error(f"cannot connect host {obj.host},try again")
-            for step in range(1, 11):
-                obj.logging.warning(f"try connect {obj.host} {step}/10")
+            _retries = obj.reconnectPolicy.retries
+            for step, delay in enumerate(obj.reconnectPolicy.delays(), 1):
+                obj.logging.warning(f"try connect {obj.host} {step}/{_retries or '-'} in {delay:.1f}s")
+                await asyncio.sleep(delay)
                 try:
                     return await func(obj, *args, **kwargs)
                 except ConnectException:
-                    await asyncio.sleep(8)
+                    continue
                 except Exception:
                     traceback.print_exc()
-                    await asyncio.sleep(5)
             obj.logging.error("connect fail, closing...")
             exc_ = traceback.format_exc()
             obj.logging.error(exc_)
@@ -37,7 +50,7 @@ def error_throw(func):
             obj.logging.error("Function Error")
             exc_ = traceback.format_exc()
             obj.logging.error(exc_)
-            pass
+            raise
         except BotBaseException as be:
             exc_ = traceback.format_exc()
             obj.logging.error(exc_)
@@ -91,6 +104,35 @@ def wrap_data_json(
     }
 
 
+class EncodedFrame(dict):
+    """content已经编码好的帧, 用于向大量对象发送相同的内容时避免重复编码
+
+    字典部分只有syncId等字段(content为None), 用于登记与断线重发, 实际发送的是text
+    """
+    __slots__ = ("text",)
+
+
+def wrap_encoded_frame(
+        command: str, syncId: Union[int, str],
+        encodedContent: str,
+        subCommand: Optional[str] = None,
+        dumps: Callable[[Any], str] = json.dumps) -> EncodedFrame:
+    """包装content已经编码好的帧
+
+    Args:
+        command (str): 命令字
+        syncId (Union[int, str]): 消息同步的字段
+        encodedContent (str): 已经编码成json的content
+        subCommand (Optional[str], optional): 子命令字, 可空. Defaults to None.
+        dumps (Callable[[Any], str]): 编码其余字段使用的函数. Defaults to json.dumps.
+    """
+    _frame = EncodedFrame(wrap_data_json(command=command, syncId=syncId, subCommand=subCommand))
+    _frame.text = '{"syncId":%s,"command":%s,"subCommand":%s,"content":%s}' % (
+        dumps(syncId), dumps(command), dumps(subCommand), encodedContent
+    )
+    return _frame
+
+
 class URL_Route:
     url_gen: str
 
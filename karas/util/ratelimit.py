@@ -0,0 +1,143 @@
+import asyncio
+from typing import Dict, Hashable, Optional, Tuple
+
+from karas.util.metrics import LatencyHistogram
+
+
+class TokenBucket:
+    """
+    TokenBucket:
+        令牌桶, 每秒补充rate个令牌, 最多存放burst个
+
+        acquire采用预约的方式: 令牌不足时先记账(令牌数可以为负)再等待, 等待的调用者按到达顺序依次放行, 不需要加锁
+    """
+
+    def __init__(self, rate: float, burst: int = 1, loop: asyncio.AbstractEventLoop = None) -> None:
+        """
+        Args:
+            rate (float): 每秒补充的令牌数
+            burst (int): 令牌桶的容量, 即空闲后允许连续发送的数量
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._loop = loop
+        self._tokens = float(self.burst)
+        self._updated = self.loop.time()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop or asyncio.get_event_loop()
+
+    def _refill(self) -> float:
+        _now = self.loop.time()
+        self._tokens = min(self.burst, self._tokens + (_now - self._updated) * self.rate)
+        self._updated = _now
+        return _now
+
+    def reserve(self) -> float:
+        """取走一个令牌, 返回需要等待的秒数"""
+        self._refill()
+        self._tokens -= 1
+        return 0. if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> float:
+        """等待直到取得一个令牌, 返回实际等待的秒数"""
+        _delay = self.reserve()
+        if _delay:
+            await asyncio.sleep(_delay)
+        return _delay
+
+    @property
+    def full(self) -> bool:
+        """令牌桶是否已经补满, 补满的桶与新建的桶等价"""
+        self._refill()
+        return self._tokens >= self.burst
+
+
+class RateLimiter:
+    """
+    RateLimiter:
+        发送消息的限速器, 由一个全局令牌桶和每个发送对象各自的令牌桶组成
+        先等待对象的令牌再等待全局的令牌, 某个群刷屏时不会占用其他群的额度
+    """
+
+    # 对象令牌桶数量超过该值时清理已经补满的桶
+    PRUNE_THRESHOLD = 1024
+
+    def __init__(
+            self,
+            rate: Optional[float] = None,
+            burst: int = 1,
+            groupRate: Optional[float] = None,
+            groupBurst: int = 1,
+            friendRate: Optional[float] = None,
+            friendBurst: int = 1,
+            loop: asyncio.AbstractEventLoop = None
+    ) -> None:
+        """
+        Args:
+            rate (Optional[float]): 所有消息合计每秒最多发送的条数, 为None时不限制
+            burst (int): 全局允许连续发送的条数
+            groupRate (Optional[float]): 每个群每秒最多发送的条数, 为None时不限制
+            groupBurst (int): 每个群允许连续发送的条数
+            friendRate (Optional[float]): 每个好友(包括临时会话)每秒最多发送的条数, 为None时不限制
+            friendBurst (int): 每个好友允许连续发送的条数
+        """
+        self._loop = loop
+        self._global = rate and TokenBucket(rate, burst, loop)
+        self._limits: Dict[str, Tuple[Optional[float], int]] = {
+            "group": (groupRate, groupBurst),
+            "friend": (friendRate, friendBurst),
+            "temp": (friendRate, friendBurst),
+        }
+        self._buckets: Dict[Tuple[str, Hashable], TokenBucket] = {}
+        self.delayed = 0
+        self.delay = LatencyHistogram()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._global or any(_rate for _rate, _ in self._limits.values()))
+
+    def _bucket(self, kind: str, target: Hashable) -> Optional[TokenBucket]:
+        _rate, _burst = self._limits.get(kind, (None, 1))
+        if not _rate:
+            return None
+        _bucket = self._buckets.get((kind, target))
+        if _bucket is None:
+            if len(self._buckets) >= self.PRUNE_THRESHOLD:
+                self._prune()
+            _bucket = self._buckets[(kind, target)] = TokenBucket(_rate, _burst, self._loop)
+        return _bucket
+
+    def _prune(self) -> None:
+        for _key in [_key for _key, _bucket in self._buckets.items() if _bucket.full]:
+            del self._buckets[_key]
+
+    async def acquire(self, kind: str, target: Hashable) -> float:
+        """等待直到允许向target发送一条消息
+
+        Args:
+            kind (str): 发送对象的类型, group, friend或temp
+            target (Hashable): 发送对象的id
+
+        Returns:
+            float: 本次发送被延迟的秒数
+        """
+        _delay = 0.
+        _bucket = self._bucket(kind, target)
+        if _bucket is not None:
+            _delay += await _bucket.acquire()
+        if self._global:
+            _delay += await self._global.acquire()
+        if _delay:
+            self.delayed += 1
+        self.delay.record(_delay)
+        return _delay
+
+    def stats(self) -> Dict:
+        """以字典形式返回当前的统计数据"""
+        return {
+            "delayed": self.delayed,
+            "buckets": len(self._buckets),
+            "delay": self.delay.snapshot()
+        }
@@ -0,0 +1,46 @@
+from random import random
+from typing import Iterator, Optional
+
+
+class Backoff:
+    """
+    Backoff:
+        带随机抖动的指数退避, 用于断线重连
+
+        第n次重试前等待 min(maximum, base * factor ** n) 秒, 再随机减少至多jitter比例,
+        避免大量bot在服务端重启后同时重连
+    """
+
+    def __init__(
+            self,
+            base: float = 1.,
+            maximum: float = 60.,
+            factor: float = 2.,
+            jitter: float = .5,
+            retries: Optional[int] = 10
+    ) -> None:
+        """
+        Args:
+            base (float): 第一次重试前等待的秒数
+            maximum (float): 等待秒数的上限
+            factor (float): 每次重试后等待时间的倍数
+            jitter (float): 随机减少等待时间的最大比例, 0~1
+            retries (Optional[int]): 最大重试次数, 为None时无限重试
+        """
+        self.base = base
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.retries = retries
+
+    def delays(self) -> Iterator[float]:
+        """依次给出每次重试前需要等待的秒数, 次数用尽后结束"""
+        _delay = self.base
+        _attempt = 0
+        while self.retries is None or _attempt < self.retries:
+            yield _delay * (1 - self.jitter * random())
+            _delay = min(self.maximum, _delay * self.factor)
+            _attempt += 1
+
+    def __str__(self) -> str:
+        return f"Backoff(base={self.base}, maximum={self.maximum}, retries={self.retries or 'unbounded'})"
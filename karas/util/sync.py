@@ -36,8 +36,8 @@ def async_to_sync(obj, name):
 
 
 def async_to_sync_wrap(cls):
-    attrs = [attr for attr in cls.__dict__ if not attr.startswith("_") and (
-        inspect.iscoroutinefunction(getattr(cls, attr)) or inspect.isasyncgenfunction(getattr(cls, attr)))]
+    # 异步生成器无法在同步代码中运行到结束, 不进行包装, 需要在协程中使用async for
+    attrs = [attr for attr in cls.__dict__ if not attr.startswith("_") and inspect.iscoroutinefunction(getattr(cls, attr))]
     for attr in attrs:
         async_to_sync(cls, attr)
     return cls
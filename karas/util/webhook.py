@@ -0,0 +1,182 @@
+import asyncio
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from aiohttp import web
+
+from karas.util.network import EncodedFrame
+
+if TYPE_CHECKING:
+    from karas import Yurine
+
+# 可以作为内联回复的命令(命令字或者"命令字.子命令字"), mirai-api-http不返回内联回复的执行结果,
+# 需要返回数据的命令(about, friendList, groupConfig.get等)在没有命令连接时无法使用
+INLINE_COMMANDS = frozenset((
+    "sendFriendMessage",
+    "sendGroupMessage",
+    "sendTempMessage",
+    "sendNudge",
+    "recall",
+    "deleteFriend",
+    "mute",
+    "unmute",
+    "kick",
+    "quit",
+    "muteAll",
+    "unmuteAll",
+    "setEssence",
+    "groupConfig.set",
+    "memberInfo.update",
+    "memberAdmin",
+    "file_delete",
+    "file_move",
+    "file_rename",
+    "anno_delete",
+    "resp_newFriendRequestEvent",
+    "resp_memberJoinRequestEvent",
+    "resp_botInvitedJoinGroupRequestEvent",
+))
+
+
+class InlineReply:
+    """
+    InlineReply:
+        一次webhook请求的内联回复, 处理该事件的函数发出的第一条命令会作为请求的响应交给mirai-api-http执行
+    """
+    __slots__ = ("_loop", "_future", "_dispatched", "_tasks")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._future = loop.create_future()
+        # 事件经过事件队列, 分发(或者被丢弃)之后才知道有哪些处理它的任务
+        self._dispatched = loop.create_future()
+        self._tasks: List[asyncio.Task] = []
+
+    def dispatched(self) -> None:
+        """事件已经分发或者被丢弃"""
+        if not self._dispatched.done():
+            self._dispatched.set_result(None)
+
+    def track(self, task: asyncio.Task) -> None:
+        """登记处理该事件的任务, 所有任务结束后不再等待回复"""
+        self._tasks.append(task)
+
+    def claim(self, frame: Dict) -> bool:
+        """将命令作为内联回复, 已经有回复或者请求已经返回时失败"""
+        if self._future.done():
+            return False
+        self._future.set_result(frame)
+        return True
+
+    async def wait(self, timeout: float) -> Optional[Dict]:
+        """等待内联回复, 处理函数全部结束或者超时后返回None"""
+        _deadline = self._loop.time() + timeout
+        if not self._dispatched.done():
+            await asyncio.wait([self._dispatched, self._future], timeout=timeout,
+                               return_when=asyncio.FIRST_COMPLETED)
+        while not self._future.done():
+            _running = [_task for _task in self._tasks if not _task.done()]
+            _remaining = _deadline - self._loop.time()
+            if not _running or _remaining <= 0:
+                break
+            await asyncio.wait([self._future, *_running], timeout=_remaining,
+                               return_when=asyncio.FIRST_COMPLETED)
+        if self._future.done():
+            return self._future.result()
+        self._future.cancel()
+        return None
+
+
+# 正在处理的webhook请求, 监听函数的任务创建时会复制该上下文
+INLINE_REPLY: ContextVar[Optional[InlineReply]] = ContextVar("INLINE_REPLY", default=None)
+
+
+class WebhookServer:
+    """
+    WebhookServer:
+        接收mirai-api-http webhook推送的http服务, 多个bot可以共用一个服务, 按请求头中的bot(或qq)区分账号
+
+        mirai-api-http的webhook适配器需要将destinations设置为该服务的地址, 如果设置了authorization,
+        需要在extraHeaders中添加相同的Authorization请求头
+    """
+
+    def __init__(
+            self,
+            port: int = 8000,
+            host: str = "0.0.0.0",
+            path: str = "/",
+            authorization: Optional[str] = None,
+            replyTimeout: float = 1.
+    ) -> None:
+        """
+        Args:
+            port (int): 监听的端口
+            host (str): 监听的地址
+            path (str): 接收推送的路径
+            authorization (Optional[str]): 请求头Authorization必须等于该值, 为None时不校验
+            replyTimeout (float): 等待监听函数给出内联回复的最长秒数
+        """
+        self.port = port
+        self.host = host
+        self.path = path
+        self.authorization = authorization
+        self.replyTimeout = replyTimeout
+        self._bots: Dict[int, "Yurine"] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self.received = 0
+        self.replied = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._runner is not None
+
+    def register(self, bot: "Yurine") -> None:
+        self._bots[bot.account] = bot
+
+    def unregister(self, bot: "Yurine") -> None:
+        if self._bots.get(bot.account) is bot:
+            del self._bots[bot.account]
+
+    def _find_bot(self, request: web.Request) -> Optional["Yurine"]:
+        _account = request.headers.get("bot") or request.headers.get("qq")
+        if _account is None:
+            # 只有一个bot时可以不区分账号
+            return next(iter(self._bots.values())) if len(self._bots) == 1 else None
+        try:
+            return self._bots.get(int(_account))
+        except ValueError:
+            return None
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        if self.authorization is not None and request.headers.get("Authorization") != self.authorization:
+            raise web.HTTPUnauthorized()
+        _bot = self._find_bot(request)
+        if _bot is None:
+            raise web.HTTPNotFound(text="unknown bot")
+        try:
+            _data = _bot.codec.loads(await request.read())
+        except ValueError:
+            raise web.HTTPBadRequest(text="invalid json")
+        self.received += 1
+        _reply = await _bot._webhook_event(_data, self.replyTimeout)
+        if _reply is None:
+            return web.Response(status=204)
+        self.replied += 1
+        return web.Response(
+            text=_reply.text if isinstance(_reply, EncodedFrame) else _bot.codec.dumps(_reply),
+            content_type="application/json"
+        )
+
+    async def start(self) -> None:
+        if self._runner is not None:
+            return
+        _app = web.Application()
+        _app.router.add_post(self.path, self._handle)
+        self._runner = web.AppRunner(_app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
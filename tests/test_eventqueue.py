@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+
+from karas import Yurine
+from karas.util.eventqueue import EventQueue
+
+# 在任何policy下都必须分发的事件
+KEPT = [
+    "BotOnlineEvent",
+    "BotOfflineEventActive",
+    "BotOfflineEventForce",
+    "NewFriendRequestEvent",
+    "MemberJoinRequestEvent",
+    "MemberCardChangeEvent",
+    "MemberLeaveEventKick",
+]
+
+
+async def _drain(queue: EventQueue) -> list:
+    _items = []
+    while len(queue):
+        _items.append(await queue.get())
+    return _items
+
+
+class EventQueueKeepTypesTest(unittest.IsolatedAsyncioTestCase):
+
+    async def _fill(self, queue: EventQueue) -> list:
+        for _ in range(queue.maxsize):
+            self.assertTrue(await queue.put("GroupMessage", "GroupMessage"))
+        # 队列已满, 之后的事件与普通消息交替到达
+        for _type in KEPT:
+            self.assertTrue(await queue.put(_type, _type))
+            await queue.put("GroupMessage", "GroupMessage")
+        return await _drain(queue)
+
+    async def test_drop_oldest(self):
+        _items = await self._fill(EventQueue(maxsize=4, policy="drop-oldest", keepTypes=KEPT))
+        self.assertEqual([_i for _i in _items if _i != "GroupMessage"], KEPT)
+
+    async def test_drop_by_type(self):
+        _queue = EventQueue(maxsize=4, policy="drop-by-type", dropTypes=["GroupMessage", *KEPT], keepTypes=KEPT)
+        _items = await self._fill(_queue)
+        self.assertEqual([_i for _i in _items if _i != "GroupMessage"], KEPT)
+
+    async def test_priority(self):
+        _queue = EventQueue(maxsize=4, policy="priority", priorities={"GroupMessage": 1}, keepTypes=KEPT)
+        _items = await self._fill(_queue)
+        self.assertEqual(sorted(_i for _i in _items if _i != "GroupMessage"), sorted(KEPT))
+
+    async def test_full_of_kept_events(self):
+        _queue = EventQueue(maxsize=2, policy="drop-oldest", keepTypes=KEPT)
+        for _type in KEPT:
+            self.assertTrue(await _queue.put(_type, _type))
+        self.assertFalse(await _queue.put("GroupMessage", "GroupMessage"))
+        self.assertEqual(await _drain(_queue), KEPT)
+
+
+class YurineEventQueueTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_state_request_identity_events_delivered(self):
+        for _policy in ("drop-oldest", "drop-by-type", "priority"):
+            _bot = Yurine(
+                host="127.0.0.1", port=8080, account=1, verifyKey="k", loop=asyncio.get_running_loop(),
+                eventQueueSize=3, eventQueuePolicy=_policy, eventDropTypes=["GroupMessage"]
+            )
+            for _type in ("GroupMessage", *KEPT):
+                _bot.listen(_type)(lambda: None)
+            for _ in range(10):
+                await _bot._enqueue_event(None, {"type": "GroupMessage"})
+            for _type in KEPT:
+                await _bot._enqueue_event(None, {"type": _type})
+                await _bot._enqueue_event(None, {"type": "GroupMessage"})
+            _types = [_data["type"] for _, _data, _ in await _drain(_bot._events)]
+            self.assertEqual([_t for _t in _types if _t != "GroupMessage"], KEPT, _policy)
+            self.assertGreater(_bot.eventStats["dropped"], 0)
+            _bot.karas.listeners.clear()
+
+
+if __name__ == "__main__":
+    unittest.main()